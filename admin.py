@@ -1,18 +1,24 @@
 import os
-import sys
 import datetime
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import messagebox
 import pandas as pd
-from fpdf import FPDF
-import subprocess
 import platform
 
 # tkcalendar for date pickers
 from tkcalendar import DateEntry
 
-# Global attendance file; both modules use the same file.
-ATTENDANCE_FILE = "attendance.csv"
+# Attendance database; both modules use the same store.
+from attendance_store import AttendanceStore, ATTENDANCE_DB, COLUMNS, TS_FORMAT
+from attendance_index import AttendanceIndex
+from paged_view import PagedTreeview
+from exporters import ExportJob
+from app import open_screen
+from attendance_summary import SummaryEngine, DAILY_COLUMNS, MONTHLY_COLUMNS
+
+# How often the admin panel picks up attendance appended by ams.py
+REFRESH_MS = 5000
 
 # Admin credentials
 ADMIN_EMAIL = "admin"
@@ -28,25 +34,54 @@ COLOR_BUTTON_RED    = "#E74C3C"
 COLOR_BUTTON_GREEN  = "#27AE60"
 
 class AdminApp:
-    def __init__(self, root):
+    def __init__(self, root, shell=None):
         self.root = root
-        # DataFrame currently displayed (full or filtered)
-        self.displayed_df = pd.DataFrame(columns=["Name", "Timestamp", "Type"])
+        self.shell = shell
+        self.frame = tk.Frame(root, bg=COLOR_PRIMARY)
+        self.logged_in = False
+        self.store = AttendanceStore(ATTENDANCE_DB)
+        # Precomputed per-day / per-month summaries kept up to date by ams.py;
+        # opened (a first run rebuilds them) by the loader thread at login
+        self.summaries = None
+        self.loaded_summaries = None
+        # "Records", "Daily Summary" or "Monthly Summary"
+        self.view = "Records"
+        # Filter currently displayed (full log or a date range / name prefix)
+        self.filter = dict(start=None, end=None, name_prefix=None)
+        # In-memory index answering filters; loaded in the background at
+        # login, pages come straight from the store until it is ready
+        self.index = None
+        self.index_loader = None
+        self.loaded_index = None
+        self.selection = None
+        # Background export in progress, if any
+        self.export_job = None
 
-        self.root.title("Admin Login")
-        self.root.geometry("800x500")
-        self.root.configure(bg=COLOR_PRIMARY)
         self.create_header()
         self.create_login_frame()
+        if shell is None:
+            self.frame.pack(fill=tk.BOTH, expand=True)
+            self.on_show()
+
+    def on_show(self):
+        self.root.title("Admin Panel" if self.logged_in else "Admin Login")
+        self.root.geometry("800x500")
+
+    def on_hide(self):
+        pass
+
+    def shutdown(self):
+        if self.export_job is not None:
+            self.export_job.cancel()
 
     def create_header(self):
-        header = tk.Frame(self.root, bg=COLOR_SECONDARY, height=50)
+        header = tk.Frame(self.frame, bg=COLOR_SECONDARY, height=50)
         header.pack(fill=tk.X)
         tk.Label(header, text="AMS", font=("Arial", 24, "bold"), fg=COLOR_WHITE, bg=COLOR_SECONDARY).pack(side=tk.LEFT, padx=20)
         tk.Label(header, text="ATTENDANCE MONITORING SYSTEM", font=("Arial", 14), fg=COLOR_WHITE, bg=COLOR_SECONDARY).pack(side=tk.LEFT)
 
     def create_login_frame(self):
-        frame = tk.Frame(self.root, bg=COLOR_LIGHT_BG, padx=30, pady=30)
+        frame = tk.Frame(self.frame, bg=COLOR_LIGHT_BG, padx=30, pady=30)
         frame.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
 
         tk.Label(frame, text="Admin Login", font=("Arial", 18, "bold"), bg=COLOR_LIGHT_BG).grid(row=0, column=0, columnspan=2, pady=(0, 20))
@@ -67,29 +102,36 @@ class AdminApp:
             messagebox.showerror("Login Failed", "Invalid credentials.")
 
     def show_admin_panel(self):
-        for w in self.root.winfo_children():
+        for w in self.frame.winfo_children():
             w.destroy()
 
+        self.logged_in = True
         self.root.title("Admin Panel")
-        self.root.configure(bg=COLOR_PRIMARY)
+        self.frame.configure(bg=COLOR_PRIMARY)
 
-        side = tk.Frame(self.root, bg=COLOR_SECONDARY, width=180)
+        side = tk.Frame(self.frame, bg=COLOR_SECONDARY, width=180)
         side.pack(side=tk.LEFT, fill=tk.Y)
         tk.Label(side, text="AMS", font=("Arial", 20, "bold"), fg=COLOR_WHITE, bg=COLOR_SECONDARY).pack(pady=20)
         tk.Button(side, text="Attendance", width=16, bg=COLOR_SECONDARY, fg=COLOR_WHITE, command=self.open_attendance).pack(pady=5)
         tk.Button(side, text="User", width=16, bg=COLOR_SECONDARY, fg=COLOR_WHITE, command=self.open_user).pack(pady=5)
-        tk.Button(side, text="Logout", width=16, bg=COLOR_BUTTON_RED, fg=COLOR_WHITE, command=self.root.destroy).pack(side=tk.BOTTOM, pady=20)
+        tk.Button(side, text="Logout", width=16, bg=COLOR_BUTTON_RED, fg=COLOR_WHITE, command=self.logout).pack(side=tk.BOTTOM, pady=20)
 
-        main = tk.Frame(self.root, bg=COLOR_LIGHT_BG)
+        main = tk.Frame(self.frame, bg=COLOR_LIGHT_BG)
         main.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
-        tk.Label(main, text="Attendance Records", font=("Arial", 16, "bold"), bg=COLOR_LIGHT_BG).pack(pady=10)
+        top = tk.Frame(main, bg=COLOR_LIGHT_BG)
+        top.pack(fill=tk.X, pady=10)
+        tk.Label(top, text="Attendance Records", font=("Arial", 16, "bold"), bg=COLOR_LIGHT_BG).pack(side=tk.LEFT, padx=10)
+        self.view_var = tk.StringVar(value=self.view)
+        tk.OptionMenu(top, self.view_var, "Records", "Daily Summary", "Monthly Summary",
+                      command=self.switch_view).pack(side=tk.RIGHT, padx=10)
 
-        # Treeview
-        self.tree = ttk.Treeview(main, columns=("Name", "Timestamp", "Type"), show="headings")
-        for col in ("Name", "Timestamp", "Type"):
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=200, anchor=tk.CENTER)
-        self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        # Paged table: only the visible rows are queried and inserted
+        self.table_frame = tk.Frame(main, bg=COLOR_LIGHT_BG)
+        self.table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.table = None
+        self.build_table()
+        self.count_label = tk.Label(main, text="", bg=COLOR_LIGHT_BG)
+        self.count_label.pack()
 
         # Date filter
         f = tk.Frame(main, bg=COLOR_LIGHT_BG)
@@ -100,97 +142,207 @@ class AdminApp:
         tk.Label(f, text="End Date:", bg=COLOR_LIGHT_BG).grid(row=0, column=2)
         self.end_cal = DateEntry(f, date_pattern='yyyy-mm-dd')
         self.end_cal.grid(row=0, column=3, padx=5)
-        tk.Button(f, text="Filter", bg=COLOR_SECONDARY, fg=COLOR_WHITE, command=self.apply_date_filter).grid(row=0, column=4, padx=5)
-        tk.Button(f, text="Reset", bg=COLOR_BUTTON_GREEN, fg=COLOR_WHITE, command=self.load_attendance).grid(row=0, column=5, padx=5)
+        tk.Label(f, text="Name:", bg=COLOR_LIGHT_BG).grid(row=0, column=4)
+        self.name_filter = tk.Entry(f, width=16)
+        self.name_filter.grid(row=0, column=5, padx=5)
+        tk.Button(f, text="Filter", bg=COLOR_SECONDARY, fg=COLOR_WHITE, command=self.apply_date_filter).grid(row=0, column=6, padx=5)
+        tk.Button(f, text="Reset", bg=COLOR_BUTTON_GREEN, fg=COLOR_WHITE, command=self.load_attendance).grid(row=0, column=7, padx=5)
 
         # Load and export frame
+        self.index_loader = threading.Thread(target=self.load_index, daemon=True)
+        self.index_loader.start()
         self.load_attendance()
+        self.root.after(200, self.wait_for_index)
+        self.root.after(REFRESH_MS, self.tail_attendance)
         ef = tk.Frame(main, bg=COLOR_LIGHT_BG)
         ef.pack(pady=10)
         tk.Button(ef, text="Export CSV", bg=COLOR_BUTTON_RED, fg=COLOR_WHITE, command=self.export_csv).pack(side=tk.LEFT, padx=5)
         tk.Button(ef, text="Export Excel", bg=COLOR_BUTTON_RED, fg=COLOR_WHITE, command=self.export_excel).pack(side=tk.LEFT, padx=5)
         tk.Button(ef, text="Export PDF", bg=COLOR_BUTTON_RED, fg=COLOR_WHITE, command=self.export_pdf).pack(side=tk.LEFT, padx=5)
+        self.export_label = tk.Label(ef, text="", bg=COLOR_LIGHT_BG)
+        self.export_label.pack(side=tk.LEFT, padx=5)
+        self.cancel_btn = tk.Button(ef, text="Cancel", command=self.cancel_export, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
 
-    def load_attendance(self):
-        # Populate tree with full data and store it
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        if not os.path.exists(ATTENDANCE_FILE):
-            self.displayed_df = pd.DataFrame(columns=["Name","Timestamp","Type"])
+    def load_index(self):
+        # Loader thread: parsing the whole log, or rebuilding the summaries
+        # on first run, takes seconds at millions of rows. The summaries get
+        # their own connection so a rebuild does not hold the store's lock
+        # while the table pages from it.
+        try:
+            self.loaded_summaries = SummaryEngine(AttendanceStore(ATTENDANCE_DB, import_from=None))
+        except Exception:
+            # The summary views stay empty
+            pass
+        try:
+            self.loaded_index = AttendanceIndex(self.store)
+        except Exception:
+            # Paging from the store keeps working without the index
+            pass
+
+    def wait_for_index(self):
+        if self.index_loader.is_alive():
+            self.root.after(200, self.wait_for_index)
+            return
+        if not self.table.winfo_exists():
             return
-        df = pd.read_csv(ATTENDANCE_FILE, header=None, names=["Name","Timestamp","Type"] )
-        df["Timestamp"] = pd.to_datetime(df["Timestamp"])
-        self.displayed_df = df.copy()
-        for _, row in df.iterrows():
-            ts = row["Timestamp"].strftime("%Y-%m-%d %H:%M:%S")
-            self.tree.insert("", tk.END, values=(row["Name"], ts, row["Type"]))
+        self.summaries = self.loaded_summaries
+        if self.loaded_index is not None:
+            self.index = self.loaded_index
+        self.selection = None
+        offset = self.table.offset
+        self.table.refresh()
+        self.table.scroll_to(offset)
+        self.count_label.config(text=f"{self.table.total} {'records' if self.view == 'Records' else 'rows'}")
+
+    def build_table(self):
+        if self.table is not None:
+            self.table.destroy()
+        columns = {"Records": COLUMNS, "Daily Summary": DAILY_COLUMNS,
+                   "Monthly Summary": MONTHLY_COLUMNS}[self.view]
+        self.table = PagedTreeview(self.table_frame, columns, self.fetch_page, self.count_rows, bg=COLOR_LIGHT_BG)
+        self.table.pack(fill=tk.BOTH, expand=True)
+
+    def switch_view(self, view):
+        self.view = view
+        self.build_table()
+        self.refresh_table()
+
+    def summary_table(self):
+        return "daily" if self.view == "Daily Summary" else "monthly"
+
+    def summary_filter(self):
+        # The records filter expressed as summary keys ("YYYY-MM-DD" / "YYYY-MM")
+        n = 10 if self.view == "Daily Summary" else 7
+        start, end = self.filter["start"], self.filter["end"]
+        return dict(start=None if start is None else start.strftime(TS_FORMAT)[:n],
+                    end=None if end is None else end.strftime(TS_FORMAT)[:n],
+                    name_prefix=self.filter["name_prefix"])
+
+    def load_attendance(self):
+        # Show the full log
+        self.filter = dict(start=None, end=None, name_prefix=None)
+        self.name_filter.delete(0, tk.END)
+        self.refresh_table()
 
     def apply_date_filter(self):
-        # Filter underlying data and update tree & displayed_df
+        # Filtering happens in the query; the table re-fetches its first page
         start = pd.Timestamp(self.start_cal.get_date())
         end = pd.Timestamp(self.end_cal.get_date()) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-        if not os.path.exists(ATTENDANCE_FILE):
+        self.filter = dict(start=start, end=end, name_prefix=self.name_filter.get().strip() or None)
+        self.refresh_table()
+
+    def refresh_table(self):
+        if self.index is not None:
+            self.index.refresh()
+        self.selection = None
+        self.table.refresh()
+        self.count_label.config(text=f"{self.table.total} {'records' if self.view == 'Records' else 'rows'}")
+
+    def tail_attendance(self):
+        # Pick up new records incrementally; redraw only if something arrived
+        if not self.table.winfo_exists():
             return
-        df = pd.read_csv(ATTENDANCE_FILE, header=None, names=["Name","Timestamp","Type"] )
-        df["Timestamp"] = pd.to_datetime(df["Timestamp"])
-        mask = (df["Timestamp"] >= start) & (df["Timestamp"] <= end)
-        filtered = df.loc[mask]
-        self.displayed_df = filtered.copy()
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for _, row in filtered.iterrows():
-            ts = row["Timestamp"].strftime("%Y-%m-%d %H:%M:%S")
-            self.tree.insert("", tk.END, values=(row["Name"], ts, row["Type"]))
+        if self.index is not None and self.index.refresh():
+            self.selection = None
+            offset = self.table.offset
+            self.table.refresh()
+            self.table.scroll_to(offset)
+            self.count_label.config(text=f"{self.table.total} {'records' if self.view == 'Records' else 'rows'}")
+        self.root.after(REFRESH_MS, self.tail_attendance)
+
+    def selected(self, order_by="Timestamp", descending=False):
+        # Positions matching the filter, cached per sort order
+        key = (order_by, descending)
+        if self.selection is None or self.selection[0] != key:
+            self.selection = (key, self.index.select(order_by=order_by, descending=descending, **self.filter))
+        return self.selection[1]
+
+    def fetch_page(self, offset, limit, order_by, descending):
+        if self.view != "Records":
+            if self.summaries is None:
+                return []
+            fetch = self.summaries.daily if self.view == "Daily Summary" else self.summaries.monthly
+            return fetch(limit=limit, offset=offset, descending=descending, **self.summary_filter())
+        if self.index is None:
+            return self.store.query(limit=limit, offset=offset, order_by=order_by, descending=descending,
+                                    **self.filter)
+        return self.index.rows(self.selected(order_by, descending)[offset:offset + limit])
+
+    def count_rows(self):
+        if self.view != "Records":
+            if self.summaries is None:
+                return 0
+            return self.summaries.count(self.summary_table(), **self.summary_filter())
+        if self.index is None:
+            return self.store.count(**self.filter)
+        return len(self.selected(self.table.order_by, self.table.descending))
 
     def export_csv(self):
-        # Export only displayed_df
-        if self.displayed_df is None or self.displayed_df.empty:
-            messagebox.showwarning("No Data", "Nothing to export.")
-            return
-        path = os.path.join(os.path.expanduser("~"), "Desktop",
-                            f"Attendance_{datetime.datetime.now():%Y%m%d_%H%M%S}.csv")
-        self.displayed_df.to_csv(path, index=False)
-        messagebox.showinfo("Export", f"CSV saved to {path}")
+        self.start_export("csv")
 
     def export_excel(self):
-        # Export only displayed_df
-        if self.displayed_df is None or self.displayed_df.empty:
-            messagebox.showwarning("No Data", "Nothing to export.")
-            return
-        path = os.path.join(os.path.expanduser("~"), "Desktop",
-                            f"Attendance_{datetime.datetime.now():%Y%m%d_%H%M%S}.xlsx")
-        self.displayed_df.to_excel(path, index=False)
-        messagebox.showinfo("Export", f"Excel saved to {path}")
+        self.start_export("xlsx")
 
     def export_pdf(self):
-        # Export only displayed_df
-        if self.displayed_df is None or self.displayed_df.empty:
+        self.start_export("pdf")
+
+    def start_export(self, fmt):
+        # Export only the filtered records, streamed from the store off the UI thread
+        if self.export_job is not None and self.export_job.is_alive():
+            messagebox.showwarning("Export", "An export is already running.")
+            return
+        if self.view != "Records" and self.summaries is None:
+            messagebox.showinfo("Export", "The summaries are still loading.")
+            return
+        if not self.count_rows():
             messagebox.showwarning("No Data", "Nothing to export.")
             return
         path = os.path.join(os.path.expanduser("~"), "Desktop",
-                            f"Attendance_{datetime.datetime.now():%Y%m%d_%H%M%S}.pdf")
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=12)
-        col_w = pdf.w / 3
-        for col in ["Name", "Timestamp", "Type"]:
-            pdf.cell(col_w, 10, col, 1)
-        pdf.ln()
-        for _, row in self.displayed_df.iterrows():
-            pdf.cell(col_w, 10, str(row["Name"]), 1)
-            pdf.cell(col_w, 10, row["Timestamp"].strftime("%Y-%m-%d %H:%M:%S"), 1)
-            pdf.cell(col_w, 10, str(row["Type"]), 1)
-            pdf.ln()
-        pdf.output(path)
-        messagebox.showinfo("Export", f"PDF saved to {path}")
+                            f"Attendance_{datetime.datetime.now():%Y%m%d_%H%M%S}.{fmt}")
+        if self.view == "Records":
+            self.export_job = ExportJob.for_records(self.store, fmt, path, **self.filter)
+        else:
+            self.export_job = ExportJob.for_summary(self.summaries, self.summary_table(), fmt, path,
+                                                    **self.summary_filter())
+        self.export_job.start()
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.poll_export()
+
+    def poll_export(self):
+        job = self.export_job
+        if job.is_alive():
+            self.export_label.config(text=f"Exporting... {job.progress:.0%}")
+            self.root.after(200, self.poll_export)
+            return
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.export_label.config(text="")
+        if job.cancelled.is_set():
+            messagebox.showinfo("Export", "Export cancelled.")
+        elif job.error is not None:
+            messagebox.showerror("Export", f"Export failed: {job.error}")
+        else:
+            messagebox.showinfo("Export", f"{job.done} records saved to {job.path}")
+
+    def cancel_export(self):
+        if self.export_job is not None:
+            self.export_job.cancel()
 
     def open_attendance(self):
-        subprocess.Popen([sys.executable, "ams.py"])
-        self.root.destroy()
+        open_screen(self.shell, "attendance", "ams.py")
+        if self.shell is None:
+            self.root.destroy()
 
     def open_user(self):
-        subprocess.Popen([sys.executable, "user.py"])
-        self.root.destroy()
+        open_screen(self.shell, "user", "user.py")
+        if self.shell is None:
+            self.root.destroy()
+
+    def logout(self):
+        if self.shell is not None:
+            self.shell.quit()
+        else:
+            self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
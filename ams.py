@@ -1,56 +1,25 @@
+from startup import profile
 import os
-import sys
 import cv2
-import time
-import csv
 import numpy as np
 import datetime
 import tkinter as tk
 from tkinter import messagebox
 from PIL import Image, ImageTk
-import torch
-from facenet_pytorch import MTCNN, InceptionResnetV1
-import pandas as pd
-from fpdf import FPDF
-import subprocess
-
-# Global attendance file
-ATTENDANCE_FILE = "attendance.csv"
-
-# Face recognition setup
-mtcnn = MTCNN(image_size=160, margin=0)
-resnet = InceptionResnetV1(pretrained='vggface2').eval()
-
-# Load embeddings once
-
-def process_dataset(path):
-    embeddings = {}
-    for img_name in os.listdir(path):
-        if img_name.lower().endswith(('.png','jpg','jpeg')):
-            img = Image.open(os.path.join(path, img_name))
-            face = mtcnn(img)
-            if face is not None:
-                emb = resnet(face.unsqueeze(0))
-                embeddings[os.path.splitext(img_name)[0]] = emb.detach().numpy()
-    return embeddings
-
-embeddings_dict = process_dataset("dataset")
-
-# Recognition helper
-def recognize_face(face_emb, db, threshold=0.9):
-    best, dist = None, float('inf')
-    for name, db_emb in db.items():
-        d = np.linalg.norm(face_emb.detach().numpy() - db_emb)
-        if d < dist:
-            best, dist = name, d
-    return (best, dist) if dist < threshold else (None, dist)
-
-# Attendance logging
-def mark_attendance(name, typ):
-    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(ATTENDANCE_FILE, 'a', newline='') as f:
-        csv.writer(f).writerow([name, ts, typ])
-    messagebox.showinfo("Recorded", f"{typ} for {name} at {ts}")
+import threading
+import queue
+import config
+from pipeline import InferenceWorker, RateMeter
+from metrics import metrics
+from camera import Camera
+from app import open_screen
+import recognition
+from recognition import (FaceAnalyzer, DATASET_DIR, models_ready, refresh_gallery,
+                         mark_attendance, writer)
+# torch and facenet_pytorch are imported by the model loader thread
+profile.mark("imports done")
+
+recognition.start_loading()
 
 class FaceAttendanceApp:
     COLOR_HEADER_BG = "#3498DB"
@@ -59,14 +28,16 @@ class FaceAttendanceApp:
     COLOR_BTN_OUT   = "#E74C3C"
     COLOR_BTN_AGAIN = "#B0B0B0"
 
-    def __init__(self, root):
+    def __init__(self, root, shell=None):
         self.root = root
+        self.shell = shell
         self.current_name = None
+        self.frame = tk.Frame(root)
+        # Pending root.after() callbacks, cancelled while the screen is hidden
+        self.jobs = {}
 
-        self.root.title("Attendance Monitoring System")
-        self.root.geometry("1280x720")
         # Header
-        hdr = tk.Frame(root, bg=self.COLOR_HEADER_BG, height=60)
+        hdr = tk.Frame(self.frame, bg=self.COLOR_HEADER_BG, height=60)
         hdr.pack(fill=tk.X)
         tk.Label(hdr,
                  text="ATTENDANCE MONITORING SYSTEM",
@@ -79,26 +50,30 @@ class FaceAttendanceApp:
                   command=self.open_admin).pack(side=tk.RIGHT, padx=20)
 
         # Date/time label
-        self.dt_label = tk.Label(root,
+        self.dt_label = tk.Label(self.frame,
                                  text=datetime.datetime.now().strftime("%B %d, %Y   %I:%M %p"),
                                  font=("Arial", 14))
         self.dt_label.pack(pady=10)
-        self.update_clock()
 
         # Video frame (smaller)
-        self.video_frame = tk.Frame(root, bg="black", height=360)
+        self.video_frame = tk.Frame(self.frame, bg="black", height=360)
         self.video_frame.pack(fill=tk.X, padx=20, pady=10)
         self.video_label = tk.Label(self.video_frame)
         self.video_label.pack()
 
         # Name/info label
-        self.name_label = tk.Label(root,
-                                   text="No face detected",
+        self.name_label = tk.Label(self.frame,
+                                   text="Loading face models...",
                                    font=("Arial",16))
         self.name_label.pack(pady=10)
+        self.fps_label = tk.Label(self.frame, text="", font=("Arial", 10), fg="#707070")
+        self.fps_label.pack()
+        # Non-modal confirmation of recorded attendance
+        self.status_label = tk.Label(self.frame, text="", font=("Arial", 12))
+        self.status_label.pack()
 
         # Buttons
-        btn_f = tk.Frame(root)
+        btn_f = tk.Frame(self.frame)
         btn_f.pack(pady=20)
         tk.Button(btn_f,
                   text="Time In",
@@ -121,71 +96,196 @@ class FaceAttendanceApp:
                   font=("Arial",14),
                   width=12,
                   command=self.reset_detection).grid(row=0, column=2, padx=15)
+        # Hands-free mode: sustained recognitions are logged without a click
+        self.auto_var = tk.BooleanVar(value=bool(config.AUTO_ATTENDANCE))
+        tk.Checkbutton(btn_f,
+                       text="Auto",
+                       variable=self.auto_var,
+                       font=("Arial",14),
+                       command=self.toggle_auto).grid(row=0, column=3, padx=15)
 
-        # Webcam init with smaller resolution
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 360)
+        # Webcam: shared with the other screens inside the app shell,
+        # otherwise opened at the smaller preview resolution
+        self.camera = shell.camera if shell is not None else Camera(config.CAMERA_SOURCES[0], 640, 360)
+        self.grabber = None
+        self.worker = None
+        # Recognition works on full camera frames (detection itself is
+        # downscaled, see AMS_DETECT_WIDTH); boxes are scaled to the preview
+        self.analyzer = FaceAnalyzer()
+        self.auto = recognition.auto_attendance()
+        self.auto_on = self.auto_var.get()
+        self.preview_meter = RateMeter()
+        self.preview_interval = max(1, int(1000 / config.PREVIEW_FPS))
+        self.result_seq = 0
+        self.dataset_mtime = os.stat(DATASET_DIR).st_mtime_ns if os.path.isdir(DATASET_DIR) else None
+        # Background refresh_gallery thread, if one has run
+        self.refresher = None
 
+        if shell is None:
+            self.frame.pack(fill=tk.BOTH, expand=True)
+            self.on_show()
+            self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def schedule(self, ms, fn):
+        self.jobs[fn.__name__] = self.root.after(ms, fn)
+
+    def on_show(self):
+        self.root.title("Attendance Monitoring System")
+        self.root.geometry("1280x720")
+        # Capture and recognition run off the Tk thread; update_video only renders
+        # Paint the window before the (slow) camera open
+        self.root.update_idletasks()
+        profile.mark("window shown")
+        metrics.start()
+        with profile.stage("camera open"):
+            self.grabber = self.camera.acquire()
+        self.worker = InferenceWorker(self.grabber.frames, self.analyze, config.RECOGNITION_FPS)
+        self.worker.start()
+        self.result_seq = 0
+        self.update_clock()
+        self.wait_for_models()
+        self.watch_dataset()
         self.update_video()
-        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.poll_attendance()
+
+    def on_hide(self):
+        for job in self.jobs.values():
+            self.root.after_cancel(job)
+        self.jobs = {}
+        if self.worker is not None:
+            # Wait out the frame in flight: a worker started by the next
+            # on_show must not share the analyzer with this one
+            self.worker.stop()
+            self.worker.join()
+            self.worker = None
+            self.camera.release()
+
+    def shutdown(self):
+        self.on_hide()
+        writer.stop()
+
+
+    def analyze(self, frame):
+        # Inference thread: recognition, plus logging in hands-free mode
+        faces = self.analyzer(frame)
+        if self.auto_on:
+            for name, typ in self.auto.observe(faces):
+                mark_attendance(name, typ, self.camera.name)
+        return faces
+
+    def toggle_auto(self):
+        # Read by the inference thread, so kept outside the Tk variable
+        self.auto_on = self.auto_var.get()
+
+    def poll_attendance(self):
+        # Show results reported by the attendance writer thread
+        try:
+            while True:
+                ok, (name, ts, typ, _), err = writer.results.get_nowait()
+                if ok:
+                    self.status_label.config(text=f"{typ} for {name} at {ts}", fg=self.COLOR_BTN_IN)
+                else:
+                    self.status_label.config(text=f"Could not record {typ} for {name}: {err}",
+                                             fg=self.COLOR_BTN_OUT)
+        except queue.Empty:
+            pass
+        self.schedule(200, self.poll_attendance)
 
     def update_clock(self):
         self.dt_label.config(text=datetime.datetime.now().strftime("%B %d, %Y   %I:%M %p"))
-        self.root.after(60000, self.update_clock)
+        self.schedule(60000, self.update_clock)
+
+    def wait_for_models(self):
+        # The preview runs while the models load; recognition starts once they are ready
+        if recognition.models_error is not None:
+            self.name_label.config(text=f"Face models failed to load: {recognition.models_error}")
+        elif models_ready.is_set():
+            self.name_label.config(text="No face detected")
+        else:
+            self.schedule(100, self.wait_for_models)
+
+    def watch_dataset(self):
+        # Adding, renaming or removing an image bumps the folder mtime
+        mtime = os.stat(DATASET_DIR).st_mtime_ns if os.path.isdir(DATASET_DIR) else None
+        # One sync at a time: overlapping ones would race on the cache files.
+        # A change made meanwhile is picked up on the next tick.
+        busy = self.refresher is not None and self.refresher.is_alive()
+        if mtime != self.dataset_mtime and models_ready.is_set() and not busy:
+            self.dataset_mtime = mtime
+            self.refresher = threading.Thread(target=refresh_gallery, args=(recognition.gallery, DATASET_DIR),
+                                              daemon=True)
+            self.refresher.start()
+        self.schedule(config.GALLERY_REFRESH_MS, self.watch_dataset)
 
     def update_video(self):
-        ret, frame = self.cap.read()
-        if not ret:
-            self.root.after(10, self.update_video)
+        # Tk thread: render the newest frame with the latest recognition result
+        _, frame = self.grabber.frames.get()
+        if frame is not None:
+            profile.mark("first frame")
+            seq, faces = self.worker.results.get()
+            if seq != self.result_seq:
+                self.result_seq = seq
+                self.show_result(faces)
+            with metrics.stage("render"):
+                sx, sy = 640 / frame.shape[1], 360 / frame.shape[0]
+                frame = cv2.resize(frame, (640, 360))
+                for face in faces or []:
+                    x1,y1,x2,y2 = map(int, face.box * np.array([sx, sy, sx, sy]))
+                    color = (0,255,0) if face.name else (0,0,255)
+                    label = face.name.split(",")[0] if face.name else "Unknown"
+                    cv2.rectangle(frame,(x1,y1),(x2,y2),color,2)
+                    cv2.putText(frame, label, (x1, max(y1 - 6, 12)),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
+
+                imgtk = ImageTk.PhotoImage(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+                self.video_label.imgtk = imgtk
+                self.video_label.config(image=imgtk)
+            self.preview_meter.tick()
+            stats = self.analyzer.stats
+            self.fps_label.config(text=f"Camera {self.grabber.meter.fps:.1f} fps   "
+                                       f"Preview {self.preview_meter.fps:.1f} fps   "
+                                       f"Recognition {self.worker.meter.fps:.1f} fps   "
+                                       f"Embeddings {stats['embeddings_run']} run / "
+                                       f"{stats['embeddings_skipped']} skipped")
+        self.schedule(self.preview_interval, self.update_video)
+
+    def show_result(self, faces):
+        if not models_ready.is_set():
             return
-        # Resize frame to 640x360
-        frame = cv2.resize(frame, (640, 360))
-
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        pil = Image.fromarray(rgb)
-        boxes, _ = mtcnn.detect(pil)
-
-        if boxes is not None and len(boxes):
-            face = mtcnn(pil)
-            if face is not None:
-                emb = resnet(face.unsqueeze(0))
-                name, dist = recognize_face(emb, embeddings_dict)
-                if name:
-                    self.current_name = name
-                    self.name_label.config(text=f"{name} detected")
-                    x1,y1,x2,y2 = map(int, boxes[0])
-                    cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
-                else:
-                    self.name_label.config(text="Unknown face")
-            else:
-                self.name_label.config(text="Face not aligned")
-        else:
+        if not faces:
             self.current_name = None
             self.name_label.config(text="No face detected")
-
-        imgtk = ImageTk.PhotoImage(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
-        self.video_label.imgtk = imgtk
-        self.video_label.config(image=imgtk)
-        self.root.after(10, self.update_video)
+            return
+        # Faces are largest first; the closest recognized person is the one
+        # Time In/Time Out records
+        names = [f.name for f in faces if f.name]
+        if names:
+            self.current_name = names[0]
+            self.name_label.config(text="; ".join(names) + " detected")
+        else:
+            self.name_label.config(text="Unknown face" if len(faces) == 1 else "Unknown faces")
 
     def record(self, typ):
         if not self.current_name:
             messagebox.showwarning("No one","No recognized face to record.")
             return
-        mark_attendance(self.current_name, typ)
+        mark_attendance(self.current_name, typ, self.camera.name)
 
     def reset_detection(self):
         self.current_name = None
         self.name_label.config(text="No face detected")
 
     def open_admin(self):
-        script = os.path.join(os.path.dirname(__file__), "admin.py")
-        subprocess.Popen([sys.executable, script])
-        self.on_close()
+        open_screen(self.shell, "admin", "admin.py")
+        if self.shell is None:
+            self.on_close()
 
     def on_close(self):
-        self.cap.release()
+        if self.shell is not None:
+            self.shell.quit()
+            return
+        self.shutdown()
+        self.camera.close()
         self.root.destroy()
 
 if __name__ == "__main__":
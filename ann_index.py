@@ -0,0 +1,135 @@
+import numpy as np
+from gallery import Gallery, as_embeddings, l2_normalize
+
+
+def spherical_kmeans(x, k, iters=10, seed=0):
+    # x is L2-normalized; centroids are re-normalized means (cosine k-means)
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(iters):
+        assign = (x @ centroids.T).argmax(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        counts = np.bincount(assign, minlength=k)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty clusters from random points
+            sums[empty] = x[rng.choice(len(x), int(empty.sum()), replace=False)]
+        centroids = l2_normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """Approximate nearest-neighbour search over an inverted-file index.
+
+    Embeddings are partitioned by a spherical k-means coarse quantizer into
+    ``nlist`` lists, each kept as its own contiguous ``Gallery``. A query
+    scores the centroids, then scans only the ``nprobe`` closest lists, so
+    cost grows with ``nprobe / nlist`` of the gallery instead of all of it.
+    Offers the same match/match_batch/topk/add/remove interface as Gallery.
+    """
+
+    def __init__(self, nlist=0, nprobe=8, train_size_per_list=40, seed=0, backend=None):
+        self.backend = backend
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size_per_list = train_size_per_list
+        self.seed = seed
+        self.centroids = None
+        self.lists = []
+        self.where = {}
+
+    @classmethod
+    def from_dict(cls, embeddings, **params):
+        index = cls(**params)
+        names = list(embeddings)
+        if names:
+            index.build(names, np.concatenate([as_embeddings(embeddings[n]) for n in names]))
+        return index
+
+    def build(self, names, embeddings):
+        x = l2_normalize(as_embeddings(embeddings))
+        nlist = self.nlist or max(1, int(np.sqrt(len(x))))
+        nlist = min(nlist, len(x))
+        rng = np.random.default_rng(self.seed)
+        sample = x
+        if len(x) > nlist * self.train_size_per_list:
+            sample = x[rng.choice(len(x), nlist * self.train_size_per_list, replace=False)]
+        self.centroids = spherical_kmeans(sample, nlist, seed=self.seed)
+        assign = self._assign(x)
+        self.lists = []
+        self.where = {}
+        for c in range(nlist):
+            rows = np.flatnonzero(assign == c)
+            self.lists.append(Gallery([names[i] for i in rows], x[rows], dim=x.shape[1], backend=self.backend))
+            for i in rows:
+                self.where[names[i]] = c
+
+    def _assign(self, x):
+        return (x @ self.centroids.T).argmax(axis=1)
+
+    def __len__(self):
+        return len(self.where)
+
+    def __contains__(self, name):
+        return name in self.where
+
+    @property
+    def names(self):
+        return [n for g in self.lists for n in g.names]
+
+    @property
+    def dim(self):
+        return 0 if self.centroids is None else self.centroids.shape[1]
+
+    def check_backend(self, backend):
+        if backend is not None and self.backend is not None and backend != self.backend:
+            raise ValueError(f"cannot mix {backend} embeddings into a {self.backend} index")
+
+    def add(self, name, emb, backend=None):
+        self.check_backend(backend)
+        emb = l2_normalize(as_embeddings(emb))
+        if self.centroids is None:
+            self.build([name], emb)
+            return
+        if name in self.where:
+            self.remove(name)
+        c = int(self._assign(emb)[0])
+        self.lists[c].add(name, emb)
+        self.where[name] = c
+
+    def remove(self, name):
+        self.lists[self.where.pop(name)].remove(name)
+
+    def _search(self, probe, k):
+        probe = l2_normalize(as_embeddings(probe))[:1]
+        nprobe = min(self.nprobe, len(self.lists))
+        coarse = (probe @ self.centroids.T)[0]
+        probes = np.argpartition(-coarse, nprobe - 1)[:nprobe]
+        names, dists = [], []
+        for c in probes:
+            g = self.lists[c]
+            if len(g):
+                names.extend(g.names)
+                dists.append(g.distances(probe)[0])
+        if not names:
+            return []
+        dists = np.concatenate(dists)
+        k = min(k, len(dists))
+        idx = np.argpartition(dists, k - 1)[:k]
+        idx = idx[np.argsort(dists[idx])]
+        return [(names[i], float(dists[i])) for i in idx]
+
+    def topk(self, probe, k=5):
+        return self._search(probe, k) if len(self) else []
+
+    def match_batch(self, probes, threshold=0.9):
+        out = []
+        for probe in as_embeddings(probes):
+            hit = self.topk(probe, 1)
+            name, dist = hit[0] if hit else (None, float('inf'))
+            out.append((name, dist) if dist < threshold else (None, dist))
+        return out
+
+    def match(self, probe, threshold=0.9):
+        return self.match_batch(probe, threshold)[0]
@@ -0,0 +1,89 @@
+# Must stay the first import: importing startup starts the cold-start clock
+# that the screens' profile.mark() calls measure from
+from startup import profile  # noqa: F401
+import os
+import sys
+import time
+import importlib
+import threading
+import subprocess
+import tkinter as tk
+
+import config
+from camera import Camera
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Screen name -> (module, class); modules are imported on first use
+SCREENS = {
+    "admin": ("admin", "AdminApp"),
+    "attendance": ("ams", "FaceAttendanceApp"),
+    "user": ("user", "UserRegistration"),
+    "userlist": ("userlist", "UserListApp"),
+}
+
+
+def open_screen(shell, name, script):
+    # Switch screens inside the shell, or launch the standalone script
+    if shell is not None:
+        shell.show(name)
+    else:
+        subprocess.Popen([sys.executable, os.path.join(HERE, script)])
+
+
+class AppShell:
+    """Hosts every screen as a frame of one Tk window in one process.
+
+    Screens are created on first visit and kept, so the models, the gallery
+    and the shared camera are loaded once; switching screens only hides one
+    frame and shows another. Each screen provides ``frame``, ``on_show``,
+    ``on_hide`` and ``shutdown``. ``switch_times`` records how long every
+    switch took, up to the new screen being laid out.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.camera = Camera(config.CAMERA_SOURCES[0], keep_open=True)
+        self.screens = {}
+        self.current = None
+        self.switch_times = []
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
+
+    def screen(self, name):
+        if name not in self.screens:
+            module, cls = SCREENS[name]
+            self.screens[name] = getattr(importlib.import_module(module), cls)(self.root, shell=self)
+        return self.screens[name]
+
+    def preload(self, name):
+        # Import a screen's module in the background (for the attendance
+        # screen this starts loading the models) without building it yet
+        module, _ = SCREENS[name]
+        threading.Thread(target=importlib.import_module, args=(module,), daemon=True).start()
+
+    def show(self, name):
+        started = time.perf_counter()
+        if self.current is not None:
+            self.current.on_hide()
+            self.current.frame.pack_forget()
+        self.current = self.screen(name)
+        self.current.frame.pack(fill=tk.BOTH, expand=True)
+        self.current.on_show()
+        self.root.update_idletasks()
+        self.switch_times.append((name, time.perf_counter() - started))
+
+    def quit(self):
+        if self.current is not None:
+            self.current.on_hide()
+        for screen in self.screens.values():
+            screen.shutdown()
+        self.camera.close()
+        self.root.destroy()
+
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    shell = AppShell(root)
+    shell.show("admin")
+    shell.preload("attendance")
+    root.mainloop()
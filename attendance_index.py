@@ -0,0 +1,110 @@
+import numpy as np
+
+from attendance_store import TS_FORMAT
+
+
+def to_epoch(ts):
+    # datetime / pandas Timestamp / "YYYY-MM-DD HH:MM:SS" -> int64 seconds
+    return int(np.datetime64(ts, 's').astype(np.int64))
+
+
+def parse_epochs(strings):
+    try:
+        return np.array(strings, dtype='datetime64[s]').astype(np.int64)
+    except ValueError:
+        # A malformed legacy row: parse one by one and mark bad ones
+        out = np.empty(len(strings), dtype=np.int64)
+        for i, s in enumerate(strings):
+            try:
+                out[i] = to_epoch(s)
+            except ValueError:
+                out[i] = np.iinfo(np.int64).min
+        return out
+
+
+class AttendanceIndex:
+    """Time-sorted, columnar in-memory copy of the attendance log.
+
+    Columns are numpy arrays (int64 epoch seconds, int32 name codes, int8
+    type codes, row ids) kept sorted by (timestamp, id). The log is loaded
+    once; ``refresh`` then tails only rows appended since the last call.
+    Date ranges are found with binary search on the timestamp column and
+    per-person filters are a vectorized compare on the name codes.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.ts = np.zeros(0, dtype=np.int64)
+        self.name_codes = np.zeros(0, dtype=np.int32)
+        self.type_codes = np.zeros(0, dtype=np.int8)
+        self.names, self.name_code = [], {}
+        self.types, self.type_code = [], {}
+        self.name_rank = np.zeros(0, dtype=np.int32)
+        self.last_id = 0
+        self.refresh()
+
+    def __len__(self):
+        return len(self.ts)
+
+    def _code(self, value, values, codes):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def refresh(self):
+        # Append rows written since the last refresh; returns how many
+        added = 0
+        for chunk in self.store.records_after(self.last_id):
+            ids, names, stamps, types = zip(*chunk)
+            ids = np.array(ids, dtype=np.int64)
+            ts = parse_epochs(stamps)
+            ncodes = np.array([self._code(n, self.names, self.name_code) for n in names], dtype=np.int32)
+            tcodes = np.array([self._code(t, self.types, self.type_code) for t in types], dtype=np.int8)
+            in_order = not len(self.ts) or ts.min() >= self.ts[-1]
+            self.ids = np.concatenate([self.ids, ids])
+            self.ts = np.concatenate([self.ts, ts])
+            self.name_codes = np.concatenate([self.name_codes, ncodes])
+            self.type_codes = np.concatenate([self.type_codes, tcodes])
+            if not in_order or not np.all(ts[1:] >= ts[:-1]):
+                order = np.lexsort((self.ids, self.ts))
+                self.ids, self.ts = self.ids[order], self.ts[order]
+                self.name_codes, self.type_codes = self.name_codes[order], self.type_codes[order]
+            self.last_id = int(ids[-1])
+            added += len(ids)
+        if added:
+            # Alphabetical rank of each name code, for sorting by name
+            self.name_rank = np.argsort(np.argsort(np.array(self.names, dtype=object))).astype(np.int32)
+        return added
+
+    def range(self, start=None, end=None):
+        # Positions [lo, hi) with start <= ts <= end
+        lo = 0 if start is None else int(np.searchsorted(self.ts, to_epoch(start), 'left'))
+        hi = len(self.ts) if end is None else int(np.searchsorted(self.ts, to_epoch(end), 'right'))
+        return lo, max(lo, hi)
+
+    def select(self, start=None, end=None, name=None, name_prefix=None,
+               order_by="Timestamp", descending=False):
+        # Positions of matching rows in the requested order
+        lo, hi = self.range(start, end)
+        pos = np.arange(lo, hi)
+        if name is not None or name_prefix:
+            if name is not None:
+                wanted = [self.name_code[name]] if name in self.name_code else []
+            else:
+                wanted = [c for c, n in enumerate(self.names) if n.startswith(name_prefix)]
+            pos = pos[np.isin(self.name_codes[lo:hi], wanted)]
+        if order_by == "Name":
+            pos = pos[np.lexsort((pos, self.name_rank[self.name_codes[pos]]))]
+        elif order_by == "Type":
+            type_rank = np.argsort(np.argsort(np.array(self.types, dtype=object)))
+            pos = pos[np.lexsort((pos, type_rank[self.type_codes[pos]]))]
+        return pos[::-1] if descending else pos
+
+    def rows(self, positions):
+        # Materialize (Name, Timestamp, Type) tuples for a handful of positions
+        stamps = self.ts[positions].astype('datetime64[s]').astype(object)
+        return [(self.names[n], t.strftime(TS_FORMAT) if t is not None else "", self.types[k])
+                for n, t, k in zip(self.name_codes[positions], stamps, self.type_codes[positions])]
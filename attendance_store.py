@@ -0,0 +1,197 @@
+import os
+import sys
+import csv
+import sqlite3
+import datetime
+import threading
+
+# Attendance database shared by ams.py and admin.py
+ATTENDANCE_DB = "attendance.db"
+# Legacy flat log, imported once into a new database
+ATTENDANCE_FILE = "attendance.csv"
+
+COLUMNS = ["Name", "Timestamp", "Type"]
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attendance (
+    id   INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    ts   TEXT NOT NULL,
+    type TEXT NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attendance_ts ON attendance(ts);
+CREATE INDEX IF NOT EXISTS idx_attendance_name_ts ON attendance(name, ts);
+CREATE INDEX IF NOT EXISTS idx_attendance_type_ts ON attendance(type, ts);
+"""
+
+# Sortable display columns -> SQL columns (each backed by an index)
+SORT_COLUMNS = {"Name": "name", "Timestamp": "ts", "Type": "type"}
+
+
+def format_ts(ts):
+    if isinstance(ts, (datetime.datetime, datetime.date)):
+        return ts.strftime(TS_FORMAT)
+    return str(ts)
+
+
+class AttendanceStore:
+    """SQLite-backed attendance log.
+
+    Timestamps are stored as ``YYYY-MM-DD HH:MM:SS`` text, which sorts
+    chronologically, so date-range queries are served from the ``ts`` index
+    and per-person ranges from ``(name, ts)``. The database runs in WAL mode
+    so the kiosk can append while the admin panel reads.
+    """
+
+    def __init__(self, path=ATTENDANCE_DB, import_from=ATTENDANCE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        is_new = not os.path.exists(path)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Commits are batched, so an fsync per commit is affordable
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.executescript(SCHEMA)
+        self.migrate()
+        if is_new and import_from and os.path.exists(import_from):
+            self.import_csv(import_from)
+
+    def migrate(self):
+        # Databases created before events were tagged with their camera
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(attendance)")]
+        if "source" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE attendance ADD COLUMN source TEXT")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def add(self, name, ts, typ, source=None):
+        self.add_many([(name, ts, typ, source)])
+
+    def add_many(self, rows):
+        # One transaction (one commit) per batch; rows are (name, ts, type)
+        # or (name, ts, type, source)
+        rows = [(r[0], format_ts(r[1]), r[2], r[3] if len(r) > 3 else None) for r in rows]
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT INTO attendance (name, ts, type, source) VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def _where(self, start, end, name, name_prefix=None):
+        clauses, args = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            args.append(format_ts(start))
+        if end is not None:
+            clauses.append("ts <= ?")
+            args.append(format_ts(end))
+        if name is not None:
+            clauses.append("name = ?")
+            args.append(name)
+        if name_prefix:
+            # Range form of LIKE 'prefix%' so the name index can be used
+            clauses.append("name >= ? AND name < ?")
+            args += [name_prefix, name_prefix + "\uffff"]
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def query(self, start=None, end=None, name=None, limit=None, offset=0,
+              order_by="Timestamp", descending=False, name_prefix=None):
+        # Rows as (Name, Timestamp, Type), optionally within [start, end];
+        # sorting, filtering and paging (limit/offset) all happen in SQL
+        where, args = self._where(start, end, name, name_prefix)
+        col = SORT_COLUMNS[order_by]
+        direction = "DESC" if descending else "ASC"
+        order = f"{col} {direction}" if col == "ts" else f"{col} {direction}, ts {direction}"
+        sql = f"SELECT name, ts, type FROM attendance{where} ORDER BY {order}, id {direction}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            args += [limit, offset]
+        with self.lock:
+            return self.conn.execute(sql, args).fetchall()
+
+    def count(self, start=None, end=None, name=None, name_prefix=None):
+        where, args = self._where(start, end, name, name_prefix)
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM attendance{where}", args).fetchone()[0]
+
+    def iter_rows(self, start=None, end=None, name=None, chunk_size=10000, name_prefix=None):
+        # Stream a range in chunks without holding it all in memory. Uses its
+        # own connection (a consistent WAL snapshot) so writers are not held up.
+        where, args = self._where(start, end, name, name_prefix)
+        sql = f"SELECT name, ts, type FROM attendance{where} ORDER BY ts, id"
+        conn = sqlite3.connect(self.path)
+        try:
+            cur = conn.execute(sql, args)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def records_after(self, last_id=0, chunk_size=50000):
+        # (id, name, ts, type) of rows appended after `last_id`, in chunks
+        conn = sqlite3.connect(self.path)
+        try:
+            cur = conn.execute("SELECT id, name, ts, type FROM attendance WHERE id > ? ORDER BY id", (last_id,))
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def import_csv(self, path, batch_size=10000, after_commit=None):
+        # Load a legacy "Name,Timestamp,Type[,Source]" file (no header) into
+        # the store; after_commit(rows) sees each committed batch, like
+        # AttendanceWriter's (e.g. SummaryEngine.update)
+        total = 0
+        with open(path, newline='') as f:
+            batch = []
+            for row in csv.reader(f):
+                if len(row) < 3:
+                    continue
+                batch.append(tuple(row[:4]))
+                if len(batch) >= batch_size:
+                    total += self._import_batch(batch, after_commit)
+                    batch = []
+            if batch:
+                total += self._import_batch(batch, after_commit)
+        return total
+
+    def _import_batch(self, rows, after_commit):
+        added = self.add_many(rows)
+        if after_commit is not None:
+            after_commit([(r[0], format_ts(r[1]), r[2]) for r in rows])
+        return added
+
+    def export_csv(self, path, start=None, end=None, header=True):
+        total = 0
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            if header:
+                writer.writerow(COLUMNS)
+            for rows in self.iter_rows(start, end):
+                writer.writerows(rows)
+                total += len(rows)
+        return total
+
+
+if __name__ == "__main__":
+    # python attendance_store.py import attendance.csv
+    # python attendance_store.py export out.csv [start] [end]
+    if len(sys.argv) < 3 or sys.argv[1] not in ("import", "export"):
+        sys.exit("usage: attendance_store.py import|export FILE.csv [start] [end]")
+    store = AttendanceStore(import_from=None)
+    if sys.argv[1] == "import":
+        # Keep the daily/monthly summaries in step with the imported rows
+        from attendance_summary import SummaryEngine
+        summaries = SummaryEngine(store)
+        print(f"imported {store.import_csv(sys.argv[2], after_commit=summaries.update)} rows into {store.path}")
+    else:
+        print(f"exported {store.export_csv(sys.argv[2], *sys.argv[3:5])} rows to {sys.argv[2]}")
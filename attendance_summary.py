@@ -0,0 +1,146 @@
+import sqlite3
+import datetime
+import itertools
+
+SUMMARY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_summary (
+    name           TEXT NOT NULL,
+    day            TEXT NOT NULL,
+    first_in       TEXT,
+    last_out       TEXT,
+    seconds_worked INTEGER NOT NULL,
+    events         INTEGER NOT NULL,
+    PRIMARY KEY (name, day)
+);
+CREATE INDEX IF NOT EXISTS idx_daily_day ON daily_summary(day);
+CREATE TABLE IF NOT EXISTS monthly_summary (
+    name           TEXT NOT NULL,
+    month          TEXT NOT NULL,
+    days_present   INTEGER NOT NULL,
+    seconds_worked INTEGER NOT NULL,
+    PRIMARY KEY (name, month)
+);
+CREATE INDEX IF NOT EXISTS idx_monthly_month ON monthly_summary(month);
+"""
+
+DAILY_COLUMNS = ["Name", "Date", "First In", "Last Out", "Hours", "Events"]
+MONTHLY_COLUMNS = ["Name", "Month", "Days Present", "Hours"]
+
+MONTHLY_SQL = """
+INSERT OR REPLACE INTO monthly_summary (name, month, days_present, seconds_worked)
+SELECT name, substr(day, 1, 7), SUM(first_in IS NOT NULL), SUM(seconds_worked)
+FROM daily_summary {where} GROUP BY name, substr(day, 1, 7)
+"""
+
+
+def summarize_day(events):
+    """Pair one person's (ts, type) events for one day, in time order.
+
+    A Time In opens a stint (repeated Ins while open keep the first), the
+    next Time Out closes it; an Out with nothing open is ignored. Returns
+    (first_in, last_out, seconds_worked, events).
+    """
+    first_in = last_out = opened = None
+    worked = 0
+    for ts, typ in events:
+        if typ == "Time In":
+            first_in = first_in or ts
+            if opened is None:
+                opened = ts
+        elif typ == "Time Out":
+            last_out = ts
+            if opened is not None:
+                delta = datetime.datetime.fromisoformat(ts) - datetime.datetime.fromisoformat(opened)
+                worked += int(delta.total_seconds())
+                opened = None
+    return first_in, last_out, worked, len(events)
+
+
+class SummaryEngine:
+    """Materialized daily and monthly attendance summaries in the store's database.
+
+    ``update(events)`` is called with each committed batch and recomputes
+    only the (person, day) and (person, month) rows those events touch,
+    reading that day's events through the ``(name, ts)`` index.
+    ``rebuild()`` recomputes everything from the raw log.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        with store.lock:
+            store.conn.executescript(SUMMARY_SCHEMA)
+            empty = store.conn.execute("SELECT COUNT(*) FROM daily_summary").fetchone()[0] == 0
+        if empty and store.count():
+            self.rebuild()
+
+    def update(self, events):
+        conn = self.store.conn
+        days = {(name, ts[:10]) for name, ts, *_ in events}
+        with self.store.lock, conn:
+            for name, day in days:
+                rows = conn.execute("SELECT ts, type FROM attendance WHERE name = ? AND ts >= ? AND ts <= ? "
+                                    "ORDER BY ts, id", (name, day + " 00:00:00", day + " 23:59:59")).fetchall()
+                conn.execute("INSERT OR REPLACE INTO daily_summary VALUES (?, ?, ?, ?, ?, ?)",
+                             (name, day) + summarize_day(rows))
+            for name, month in {(name, day[:7]) for name, day in days}:
+                conn.execute(MONTHLY_SQL.format(where="WHERE name = ? AND day >= ? AND day <= ?"),
+                             (name, month + "-01", month + "-31"))
+
+    def rebuild(self, chunk_size=50000):
+        # Full recompute, streaming the log person by person
+        read = sqlite3.connect(self.store.path)
+        try:
+            cur = read.execute("SELECT name, ts, type FROM attendance ORDER BY name, ts, id")
+            rows = itertools.chain.from_iterable(iter(lambda: cur.fetchmany(chunk_size), []))
+            out = []
+            with self.store.lock, self.store.conn as conn:
+                conn.execute("DELETE FROM daily_summary")
+                conn.execute("DELETE FROM monthly_summary")
+                for (name, day), group in itertools.groupby(rows, key=lambda r: (r[0], r[1][:10])):
+                    out.append((name, day) + summarize_day([(ts, typ) for _, ts, typ in group]))
+                    if len(out) >= chunk_size:
+                        conn.executemany("INSERT INTO daily_summary VALUES (?, ?, ?, ?, ?, ?)", out)
+                        out = []
+                conn.executemany("INSERT INTO daily_summary VALUES (?, ?, ?, ?, ?, ?)", out)
+                conn.execute(MONTHLY_SQL.format(where=""))
+        finally:
+            read.close()
+
+    def _where(self, col, start, end, name_prefix):
+        clauses, args = [], []
+        if start is not None:
+            clauses.append(f"{col} >= ?")
+            args.append(start)
+        if end is not None:
+            clauses.append(f"{col} <= ?")
+            args.append(end)
+        if name_prefix:
+            clauses.append("name >= ? AND name < ?")
+            args += [name_prefix, name_prefix + "\uffff"]
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def daily(self, start=None, end=None, name_prefix=None, limit=-1, offset=0, descending=False):
+        # (Name, Date, First In, Last Out, Hours, Events); start/end are "YYYY-MM-DD"
+        where, args = self._where("day", start, end, name_prefix)
+        direction = "DESC" if descending else "ASC"
+        with self.store.lock:
+            rows = self.store.conn.execute(
+                f"SELECT name, day, first_in, last_out, seconds_worked, events FROM daily_summary{where} "
+                f"ORDER BY day {direction}, name {direction} LIMIT ? OFFSET ?", args + [limit, offset]).fetchall()
+        return [(n, d, (fi or "")[11:], (lo or "")[11:], round(s / 3600, 2), e) for n, d, fi, lo, s, e in rows]
+
+    def monthly(self, start=None, end=None, name_prefix=None, limit=-1, offset=0, descending=False):
+        # (Name, Month, Days Present, Hours); start/end are "YYYY-MM"
+        where, args = self._where("month", start, end, name_prefix)
+        direction = "DESC" if descending else "ASC"
+        with self.store.lock:
+            rows = self.store.conn.execute(
+                f"SELECT name, month, days_present, seconds_worked FROM monthly_summary{where} "
+                f"ORDER BY month {direction}, name {direction} LIMIT ? OFFSET ?", args + [limit, offset]).fetchall()
+        return [(n, m, d, round(s / 3600, 2)) for n, m, d, s in rows]
+
+    def count(self, table, start=None, end=None, name_prefix=None):
+        col = {"daily": "day", "monthly": "month"}[table]
+        where, args = self._where(col, start, end, name_prefix)
+        with self.store.lock:
+            return self.store.conn.execute(f"SELECT COUNT(*) FROM {table}_summary{where}", args).fetchone()[0]
@@ -0,0 +1,172 @@
+import os
+import glob
+import json
+import time
+import queue
+import datetime
+import threading
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from attendance_store import TS_FORMAT
+
+# Events accepted but not yet committed to the store; every process writes
+# its own attendance.<pid>.journal next to this path
+ATTENDANCE_JOURNAL = "attendance.journal"
+
+
+def try_lock(f):
+    # Non-blocking exclusive lock, held until f is closed
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+class AttendanceWriter(threading.Thread):
+    """Write-behind queue between the recognition loop and the attendance store.
+
+    ``submit`` never waits on the database: it appends the event to a small
+    journal file and queues it. The writer thread commits queued events in
+    batches, every ``flush_interval`` seconds or once ``batch_size`` events
+    are waiting, fsyncing the journal first. The journal is truncated when
+    everything in it is committed. Each process keeps its own journal,
+    locked while it runs, so processes sharing the store (the app, the
+    service, multicam.py) never truncate or replay each other's pending
+    events; on start-up the journals of processes that are gone are
+    replayed and removed.
+    Each committed (or failed) event is reported on ``results`` as
+    ``(ok, (name, ts, typ, source), error)`` for the UI to poll, and every committed
+    batch is passed to ``after_commit`` (e.g. to update summaries).
+    """
+
+    def __init__(self, store, journal_path=ATTENDANCE_JOURNAL, flush_interval=1.0, batch_size=50,
+                 after_commit=None):
+        super().__init__(daemon=True)
+        self.store = store
+        self.after_commit = after_commit
+        stem, ext = os.path.splitext(journal_path)
+        self.journal_pattern = f"{stem}.*{ext}"
+        self.legacy_journal = journal_path
+        self.journal_path = f"{stem}.{os.getpid()}{ext}"
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.pending = queue.Queue()
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+        self.running = threading.Event()
+        self.running.set()
+        # Set after a failed commit: the journal then keeps everything until
+        # the next start-up replay
+        self.keep_journal = False
+        self.replayed = self.replay()
+        self.journal = open(self.journal_path, 'a', encoding='utf-8')
+        try_lock(self.journal)
+
+    def replay(self):
+        # Commit whatever processes that are gone journaled but never
+        # committed; a journal still locked belongs to a running process.
+        # Events already in the store (same name, second and type) are
+        # skipped. Journals written before events carried a source have 3 fields.
+        paths = sorted(set(glob.glob(self.journal_pattern)) | {self.legacy_journal})
+        events, seen = [], set()
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, 'a+', encoding='utf-8') as f:
+                if not try_lock(f):
+                    continue
+                f.seek(0)
+                found = []
+                for line in f:
+                    try:
+                        event = tuple(json.loads(line))
+                        name, ts, typ = event[:3]
+                    except ValueError:
+                        continue  # torn last line
+                    if (name, ts, typ) not in seen and (name, ts, typ) not in self.store.query(ts, ts, name):
+                        seen.add((name, ts, typ))
+                        found.append(event + (None,) * (4 - len(event)))
+                # Committed before the journal goes, so a crash here only repeats the replay
+                if found:
+                    self.store.add_many(found)
+                    events.extend(found)
+                f.truncate(0)
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        if events and self.after_commit is not None:
+            self.after_commit(events)
+        return len(events)
+
+    def submit(self, name, typ, ts=None, source=None):
+        ts = ts or datetime.datetime.now().strftime(TS_FORMAT)
+        event = (name, ts, typ, source)
+        with self.lock:
+            self.journal.write(json.dumps(event) + "\n")
+            self.journal.flush()
+            self.pending.put(event)
+        return ts
+
+    def run(self):
+        while self.running.is_set() or not self.pending.empty():
+            batch = self.collect()
+            if batch:
+                self.commit(batch)
+
+    def collect(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or (not self.running.is_set() and self.pending.empty()):
+                break
+            try:
+                batch.append(self.pending.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def commit(self, batch):
+        with self.lock:
+            os.fsync(self.journal.fileno())
+        try:
+            self.store.add_many(batch)
+        except Exception as e:
+            # Leave the journal alone so the events are retried on next start
+            self.keep_journal = True
+            for event in batch:
+                self.results.put((False, event, e))
+            return
+        if self.after_commit is not None:
+            try:
+                self.after_commit(batch)
+            except Exception:
+                # Derived data only; summaries can be rebuilt from the log
+                pass
+        for event in batch:
+            self.results.put((True, event, None))
+        with self.lock:
+            if self.pending.empty() and not self.keep_journal:
+                self.journal.truncate(0)
+                self.journal.seek(0)
+
+    def stop(self, timeout=5):
+        # Flush everything still queued, then close the journal
+        self.running.clear()
+        self.join(timeout)
+        self.journal.close()
+        if not self.keep_journal and self.pending.empty():
+            try:
+                os.remove(self.journal_path)
+            except OSError:
+                pass
@@ -0,0 +1,85 @@
+import time
+import datetime
+from collections import Counter, deque
+
+
+class AutoAttendance:
+    """Hands-free attendance from per-frame recognitions.
+
+    Every tracked face keeps its last ``window`` votes (the person it was
+    matched to, or None when unknown). Only fresh embeddings vote: results
+    the analyser repeats from a track's cached identity (``fresh`` False)
+    are ignored, so one misrecognition is one vote however long it is
+    cached. A track commits one event once a single person holds at least
+    ``min_votes`` of those votes. A person already logged
+    within ``cooldown`` seconds, on any track, is suppressed; the
+    in-memory last-seen index behind that also decides the event type in
+    "toggle" mode (Time In, then Time Out, ...). ``last_event(name)`` may
+    return the person's last event type today from the store, for people
+    not yet seen by this process.
+    """
+
+    def __init__(self, window=4, min_votes=2, cooldown=300.0, mode="toggle", last_event=None,
+                 track_ttl=5.0):
+        if mode not in ("toggle", "in", "out"):
+            raise ValueError(f"unknown auto attendance mode {mode!r}, expected toggle, in or out")
+        self.window = window
+        self.min_votes = min(min_votes, window)
+        self.cooldown = cooldown
+        self.mode = mode
+        self.last_event = last_event
+        self.track_ttl = track_ttl
+        self.votes = {}
+        self.track_seen = {}
+        self.committed = set()
+        # person -> (monotonic time, event type, date) of their last logged event
+        self.last_logged = {}
+        self.stats = {"events": 0, "suppressed": 0}
+
+    def observe(self, faces, now=None):
+        """Feed one analysed frame; returns the [(name, type)] events to record."""
+        now = time.monotonic() if now is None else now
+        events = []
+        for face in faces or []:
+            if face.track is None:
+                continue
+            self.track_seen[face.track] = now
+            if face.track in self.committed or not getattr(face, "fresh", True):
+                continue
+            votes = self.votes.setdefault(face.track, deque(maxlen=self.window))
+            votes.append(face.name)
+            counts = Counter(v for v in votes if v)
+            if not counts:
+                continue
+            name, count = counts.most_common(1)[0]
+            if count < self.min_votes:
+                continue
+            self.committed.add(face.track)
+            last = self.last_logged.get(name)
+            if last is not None and now - last[0] < self.cooldown:
+                self.stats["suppressed"] += 1
+                continue
+            typ = self.next_type(name, last)
+            self.last_logged[name] = (now, typ, datetime.date.today())
+            self.stats["events"] += 1
+            events.append((name, typ))
+        self.expire(now)
+        return events
+
+    def next_type(self, name, last):
+        if self.mode == "in":
+            return "Time In"
+        if self.mode == "out":
+            return "Time Out"
+        if last is not None and last[2] == datetime.date.today():
+            previous = last[1]
+        else:
+            previous = self.last_event(name) if self.last_event is not None else None
+        return "Time Out" if previous == "Time In" else "Time In"
+
+    def expire(self, now):
+        # Forget tracks that left the frame
+        for track in [t for t, seen in self.track_seen.items() if now - seen > self.track_ttl]:
+            del self.track_seen[track]
+            self.votes.pop(track, None)
+            self.committed.discard(track)
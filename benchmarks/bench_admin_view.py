@@ -0,0 +1,74 @@
+"""Time to open and filter the admin attendance table at 10k, 100k and 1M records.
+
+"old" is the data work load_attendance/apply_date_filter did before the
+paged table (read_csv + to_datetime + iterrows over every record, before
+any Treeview inserts); "paged" is what PagedTreeview now asks the store
+for: a row count plus one block of rows.
+
+    python benchmarks/bench_admin_view.py [--sizes 10000 100000 1000000]
+"""
+import os
+import sys
+import csv
+import time
+import argparse
+import tempfile
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from attendance_store import AttendanceStore
+from bench_store import synthetic_rows
+
+BLOCK = 200
+
+
+def old_open(path, start=None, end=None):
+    df = pd.read_csv(path, header=None, names=["Name", "Timestamp", "Type"])
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"])
+    if start is not None:
+        df = df.loc[(df["Timestamp"] >= start) & (df["Timestamp"] <= end)]
+    return [(r["Name"], r["Timestamp"].strftime("%Y-%m-%d %H:%M:%S"), r["Type"]) for _, r in df.iterrows()]
+
+
+def paged_open(store, offset=0, **kw):
+    order = dict(order_by=kw.pop("order_by", "Timestamp"), descending=kw.pop("descending", False))
+    total = store.count(**kw)
+    return total, store.query(limit=BLOCK, offset=offset, **order, **kw)
+
+
+def ms(fn, *args, **kw):
+    t0 = time.perf_counter()
+    fn(*args, **kw)
+    return (time.perf_counter() - t0) * 1e3
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    ap.add_argument("--skip-old-above", type=int, default=1000000,
+                    help="skip the (slow) old path for larger logs")
+    args = ap.parse_args()
+
+    start, end = pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-31 23:59:59")
+    print(f"{'records':>8} {'old open':>9} {'paged open':>11} {'old filter':>11} {'paged filter':>13} "
+          f"{'sort name':>10} {'jump middle':>12}  (ms)")
+    for n in args.sizes:
+        tmp = tempfile.mkdtemp()
+        path = os.path.join(tmp, "attendance.csv")
+        with open(path, "w", newline="") as f:
+            csv.writer(f).writerows(synthetic_rows(n, 300, 730))
+        store = AttendanceStore(os.path.join(tmp, "attendance.db"), path)
+
+        run_old = n <= args.skip_old_above
+        o_open = ms(old_open, path) if run_old else float('nan')
+        o_filter = ms(old_open, path, start, end) if run_old else float('nan')
+        p_open = ms(paged_open, store)
+        p_filter = ms(paged_open, store, start=start, end=end, name_prefix="Person 1")
+        p_sort = ms(paged_open, store, order_by="Name", descending=True)
+        p_jump = ms(paged_open, store, offset=n // 2)
+        print(f"{n:>8} {o_open:>9.0f} {p_open:>11.1f} {o_filter:>11.0f} {p_filter:>13.1f} "
+              f"{p_sort:>10.1f} {p_jump:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Recall@1 and query latency of IVFIndex against exact Gallery search.
+
+    python benchmarks/bench_ann.py [--size 100000] [--nprobe 1 4 8 16 32]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from gallery import Gallery, l2_normalize
+from ann_index import IVFIndex
+
+
+def synthetic_gallery(n, dim, rng, clusters=256):
+    # Face embeddings are not uniform on the sphere; draw identities around
+    # a set of cluster centres so the coarse quantizer has structure to use
+    centres = l2_normalize(rng.standard_normal((clusters, dim)).astype(np.float32))
+    noise = rng.standard_normal((n, dim)).astype(np.float32) * (2.4 / np.sqrt(dim))
+    return l2_normalize(centres[rng.integers(0, clusters, n)] + noise)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", type=int, default=100000)
+    ap.add_argument("--dim", type=int, default=512)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--nlist", type=int, default=0)
+    ap.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    x = synthetic_gallery(args.size, args.dim, rng)
+    names = [f"person{i}" for i in range(args.size)]
+    targets = rng.choice(args.size, args.queries, replace=False)
+    queries = l2_normalize(x[targets] + 0.02 * rng.standard_normal((args.queries, args.dim)).astype(np.float32))
+
+    exact = Gallery(names, x)
+    t0 = time.perf_counter()
+    truth = [exact.topk(q, 1)[0][0] for q in queries]
+    t_exact = (time.perf_counter() - t0) / args.queries
+
+    t0 = time.perf_counter()
+    index = IVFIndex(nlist=args.nlist)
+    index.build(names, x)
+    t_build = time.perf_counter() - t0
+    print(f"{args.size} identities, dim {args.dim}, {len(index.lists)} lists (built in {t_build:.1f}s)")
+    print(f"{'search':>10} {'recall@1':>9} {'ms/query':>9} {'speedup':>8}")
+    print(f"{'exact':>10} {1.0:>9.3f} {t_exact * 1e3:>9.3f} {1.0:>7.1f}x")
+    for nprobe in args.nprobe:
+        index.nprobe = nprobe
+        t0 = time.perf_counter()
+        found = [index.topk(q, 1)[0][0] for q in queries]
+        t = (time.perf_counter() - t0) / args.queries
+        recall = np.mean([a == b for a, b in zip(found, truth)])
+        print(f"{'nprobe=' + str(nprobe):>10} {recall:>9.3f} {t * 1e3:>9.3f} {t_exact / t:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Accuracy and latency of each embedding backend on the dataset/ images.
+
+Every dataset image is enrolled as-is; probes are the same faces after a
+horizontal flip and brightness/blur jitter. Reports load time, RSS growth,
+per-face latency, rank-1 identification and genuine/impostor distances
+(useful for calibrating a backend's match threshold).
+
+    python benchmarks/bench_backends.py [--images dataset] [--backends facenet tflite]
+"""
+import os
+import sys
+import time
+import resource
+import argparse
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+import torch
+from facenet_pytorch import MTCNN
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from embedders import BACKENDS
+from gallery import Gallery
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg')
+
+
+def jitter(img):
+    img = ImageOps.mirror(img)
+    img = ImageEnhance.Brightness(img).enhance(0.8)
+    return img.filter(ImageFilter.GaussianBlur(1))
+
+
+def rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def crops(mtcnn, folder):
+    names, enrol, probe = [], [], []
+    for fname in sorted(os.listdir(folder)):
+        if not fname.lower().endswith(IMAGE_EXTS):
+            continue
+        img = Image.open(os.path.join(folder, fname)).convert("RGB")
+        a, b = mtcnn(img), mtcnn(jitter(img))
+        if a is None or b is None:
+            print(f"  skipped {fname}: no face")
+            continue
+        names.append(os.path.splitext(fname)[0])
+        enrol.append(a)
+        probe.append(b)
+    return names, torch.stack(enrol), torch.stack(probe)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", default=os.path.join(os.path.dirname(__file__), "..", "dataset"))
+    ap.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    args = ap.parse_args()
+
+    torch.set_grad_enabled(False)
+    mtcnn = MTCNN(image_size=160, margin=0)
+    names, enrol, probe = crops(mtcnn, args.images)
+    print(f"{len(names)} identities")
+
+    print(f"{'backend':>8} {'load s':>7} {'+RSS MB':>8} {'ms/face':>8} {'rank-1':>7} {'genuine':>8} {'impostor':>9}")
+    for name in args.backends:
+        before = rss_mb()
+        t0 = time.perf_counter()
+        try:
+            embedder = BACKENDS[name]()
+        except ImportError as e:
+            print(f"{name:>8} unavailable: {e}")
+            continue
+        t_load = time.perf_counter() - t0
+        embedder.embed(enrol[:1])
+        t0 = time.perf_counter()
+        gallery = Gallery(names, embedder.embed(enrol), backend=embedder.name)
+        probes = embedder.embed(probe)
+        t_face = (time.perf_counter() - t0) / (2 * len(names))
+
+        d = gallery.distances(probes)
+        rank1 = np.mean(d.argmin(axis=1) == np.arange(len(names)))
+        genuine = np.diag(d).mean()
+        impostor = d[~np.eye(len(names), dtype=bool)].mean() if len(names) > 1 else float('nan')
+        print(f"{name:>8} {t_load:>7.2f} {rss_mb() - before:>8.0f} {t_face * 1e3:>8.1f} "
+              f"{rank1:>7.3f} {genuine:>8.3f} {impostor:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Latency and accuracy of the facenet CPU modes (float, int8, script).
+
+    python benchmarks/bench_cpu_modes.py [--images dataset] [--threads 1 4] [--tolerance 0.05]
+
+The gallery is embedded once with the float model; every mode then embeds
+the same crops (drift = L2 distance to the float embedding) and a
+mirrored copy of them as probes against the float gallery (rank-1, mean
+genuine distance). Latency is per face, one face at a time and in
+batches of --batch. A mode whose largest drift exceeds --tolerance is
+marked FAIL and the script exits with status 1, so it can gate switching
+AMS_FACENET_MODE on a kiosk.
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from PIL import Image
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from embedders import FacenetEmbedder, FACENET_MODES, load_detector
+from gallery import Gallery
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg')
+
+
+def crops(folder):
+    detector = load_detector()
+    names, faces = [], []
+    for fname in sorted(os.listdir(folder)):
+        if not fname.lower().endswith(IMAGE_EXTS):
+            continue
+        img = Image.open(os.path.join(folder, fname)).convert("RGB")
+        boxes, _ = detector.detect(img)
+        if boxes is None or not len(boxes):
+            print(f"  skipped {fname}: no face")
+            continue
+        names.append(os.path.splitext(fname)[0])
+        faces.append(detector.extract(img, boxes[:1], None))
+    return names, torch.cat(faces) if faces else None
+
+
+def per_face_ms(embedder, faces, batch, repeat):
+    embedder.embed(faces[:batch])
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for i in range(0, len(faces), batch):
+            embedder.embed(faces[i:i + batch])
+    return 1e3 * (time.perf_counter() - t0) / (repeat * len(faces))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", default=os.path.join(os.path.dirname(__file__), "..", "dataset"))
+    ap.add_argument("--modes", nargs="+", default=list(FACENET_MODES))
+    ap.add_argument("--threads", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    ap.add_argument("--batch", type=int, default=8)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--tolerance", type=float, default=0.05, help="largest allowed drift from float")
+    args = ap.parse_args()
+
+    names, faces = crops(args.images)
+    if faces is None:
+        sys.exit(f"no faces in {args.images}")
+    mirrored = torch.flip(faces, dims=[3])
+    reference = FacenetEmbedder("float").embed(faces)
+    gallery = Gallery(names, reference, backend="facenet")
+    print(f"{len(names)} faces, gallery embedded in float")
+
+    print(f"{'mode':>7} {'threads':>7} {'load s':>7} {'ms b1':>7} {f'ms b{args.batch}':>7} "
+          f"{'drift max':>9} {'mean':>6} {'rank-1':>7} {'genuine':>8}")
+    failed = False
+    for mode in args.modes:
+        for threads in args.threads:
+            t0 = time.perf_counter()
+            embedder = FacenetEmbedder(mode, threads)
+            t_load = time.perf_counter() - t0
+            ms1 = per_face_ms(embedder, faces, 1, args.repeat)
+            msb = per_face_ms(embedder, faces, args.batch, args.repeat)
+            drift = np.linalg.norm(embedder.embed(faces) - reference, axis=1)
+            d = gallery.distances(embedder.embed(mirrored))
+            rank1 = np.mean(d.argmin(axis=1) == np.arange(len(names)))
+            ok = drift.max() <= args.tolerance
+            failed |= not ok
+            print(f"{mode:>7} {threads:7d} {t_load:7.2f} {ms1:7.1f} {msb:7.1f} {drift.max():9.4f} "
+                  f"{drift.mean():6.4f} {rank1:7.3f} {np.diag(d).mean():8.3f}  {'ok' if ok else 'FAIL'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
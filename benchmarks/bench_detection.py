@@ -0,0 +1,74 @@
+"""Per-stage CPU timing: detect + mtcnn(pil) (old) vs detect + extract (single pass).
+
+    python benchmarks/bench_detection.py [--images dataset] [--repeat 3]
+
+Each image is resized to the 640x360 preview size used by ams.py.
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from PIL import Image
+import torch
+from facenet_pytorch import MTCNN, InceptionResnetV1
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg')
+
+
+def load_frames(folder):
+    frames = []
+    for fname in sorted(os.listdir(folder)):
+        if fname.lower().endswith(IMAGE_EXTS):
+            frames.append(Image.open(os.path.join(folder, fname)).convert("RGB").resize((640, 360)))
+    return frames
+
+
+def clock(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", default=os.path.join(os.path.dirname(__file__), "..", "dataset"))
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    torch.set_grad_enabled(False)
+    frames = load_frames(args.images)
+    if not frames:
+        sys.exit(f"no images in {args.images}")
+    old_mtcnn = MTCNN(image_size=160, margin=0)
+    new_mtcnn = MTCNN(image_size=160, margin=0, keep_all=True)
+    resnet = InceptionResnetV1(pretrained='vggface2').eval()
+
+    stages = {k: [] for k in ("old detect", "old align", "new detect", "new align", "embed")}
+    for _ in range(args.repeat):
+        for pil in frames:
+            boxes, t = clock(lambda p: old_mtcnn.detect(p)[0], pil)
+            stages["old detect"].append(t)
+            if boxes is None:
+                continue
+            _, t = clock(old_mtcnn, pil)
+            stages["old align"].append(t)
+
+            boxes, t = clock(lambda p: new_mtcnn.detect(p)[0], pil)
+            stages["new detect"].append(t)
+            faces, t = clock(new_mtcnn.extract, pil, boxes, None)
+            stages["new align"].append(t)
+            _, t = clock(resnet, faces[:1])
+            stages["embed"].append(t)
+
+    ms = {k: 1e3 * float(np.mean(v)) if v else float('nan') for k, v in stages.items()}
+    print(f"{len(frames)} frames x {args.repeat}")
+    for k, v in ms.items():
+        print(f"{k:>12}: {v:8.2f} ms")
+    old = ms["old detect"] + ms["old align"] + ms["embed"]
+    new = ms["new detect"] + ms["new align"] + ms["embed"]
+    print(f"{'per frame':>12}: old {old:.2f} ms, new {new:.2f} ms ({100 * (old - new) / old:.0f}% saved)")
+
+
+if __name__ == "__main__":
+    main()
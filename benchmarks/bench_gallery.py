@@ -0,0 +1,56 @@
+"""Compare the old per-identity dict loop in recognize_face with Gallery.match.
+
+    python benchmarks/bench_gallery.py [--sizes 10 1000 100000] [--dim 512]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from gallery import Gallery, l2_normalize
+
+
+def dict_loop(face_emb, db, threshold=0.9):
+    # recognize_face as it was before the Gallery (probe given as an array)
+    best, dist = None, float('inf')
+    for name, db_emb in db.items():
+        d = np.linalg.norm(face_emb - db_emb)
+        if d < dist:
+            best, dist = name, d
+    return (best, dist) if dist < threshold else (None, dist)
+
+
+def timeit(fn, repeat):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    ap.add_argument("--dim", type=int, default=512)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'identities':>10} {'dict loop ms':>13} {'gallery ms':>11} {'speedup':>8}")
+    for n in args.sizes:
+        embs = l2_normalize(rng.standard_normal((n, args.dim)).astype(np.float32))
+        db = {f"person{i}": embs[i:i + 1] for i in range(n)}
+        gallery = Gallery.from_dict(db)
+        probe = embs[n // 2:n // 2 + 1] + 0.01 * rng.standard_normal((1, args.dim)).astype(np.float32)
+
+        assert dict_loop(probe, db)[0] == gallery.match(probe)[0]
+        repeat = max(3, 20000 // n)
+        t_loop = timeit(lambda: dict_loop(probe, db), repeat)
+        t_gal = timeit(lambda: gallery.match(probe), repeat)
+        print(f"{n:>10} {t_loop * 1e3:>13.3f} {t_gal * 1e3:>11.3f} {t_loop / t_gal:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
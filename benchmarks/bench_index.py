@@ -0,0 +1,59 @@
+"""Filtering with the in-memory AttendanceIndex vs SQLite and the old CSV re-parse.
+
+    python benchmarks/bench_index.py [--records 1000000]
+"""
+import os
+import sys
+import csv
+import time
+import argparse
+import tempfile
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from attendance_store import AttendanceStore
+from attendance_index import AttendanceIndex
+from bench_store import synthetic_rows, csv_filter
+
+
+def ms(fn, *args, repeat=5, **kw):
+    fn(*args, **kw)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn(*args, **kw)
+    return out, (time.perf_counter() - t0) * 1e3 / repeat
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=1000000)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "attendance.csv")
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows(synthetic_rows(args.records, 300, 730))
+    store = AttendanceStore(os.path.join(tmp, "attendance.db"), path)
+
+    t0 = time.perf_counter()
+    index = AttendanceIndex(store)
+    print(f"{args.records} records; index loaded once in {time.perf_counter() - t0:.2f}s")
+    store.add_many([("Person 1, Staff", "2026-01-01 08:00:00", "Time In")] * 100)
+    t0 = time.perf_counter()
+    added = index.refresh()
+    print(f"tailing {added} appended rows took {(time.perf_counter() - t0) * 1e3:.2f} ms")
+
+    base = pd.Timestamp("2024-06-03")
+    print(f"{'query':>18} {'rows':>7} {'CSV ms':>8} {'SQLite ms':>10} {'index ms':>9}")
+    for label, span, name in (("1 day", 1, None), ("1 month", 30, None), ("1 year", 365, None),
+                              ("1 person, 1 year", 365, "Person 7, Staff")):
+        start, end = base, base + pd.Timedelta(days=span) - pd.Timedelta(seconds=1)
+        _, t_csv = ms(csv_filter, path, start, end, repeat=1)
+        rows, t_sql = ms(store.query, start, end, name)
+        pos, t_idx = ms(index.select, start, end, name)
+        assert len(rows) == len(pos)
+        print(f"{label:>18} {len(pos):>7} {t_csv:>8.0f} {t_sql:>10.2f} {t_idx:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
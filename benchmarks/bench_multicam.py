@@ -0,0 +1,65 @@
+"""Aggregate recognition throughput as cameras are added.
+
+Replays recorded videos as 1..N simultaneous cameras (files are reused
+round-robin when there are fewer files than cameras), each paced at its
+recorded frame rate like a live camera, on a fixed pool of inference
+workers. Reports analysed frames per second in total and for the
+slowest camera, and the share of grabbed frames dropped under load.
+
+    python benchmarks/bench_multicam.py entrance.mp4 [lobby.mp4 ...] [--cameras 1 2 4 8] [--workers 2] [--seconds 20]
+
+--unpaced reads the files as fast as they decode instead.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import config
+import recognition
+from multicam import MultiCamera
+
+
+def run(videos, cameras, workers, seconds, realtime):
+    specs = [f"cam{i}={videos[i % len(videos)]}" for i in range(cameras)]
+    cams = MultiCamera(specs, workers, realtime=realtime, loop=True)
+    cams.start()
+    try:
+        # Let trackers and threads settle before measuring
+        time.sleep(min(2.0, seconds / 4))
+        before = {s["source"]: s for s in cams.stats()}
+        time.sleep(seconds)
+        after = cams.stats()
+    finally:
+        cams.stop()
+    analysed = [a["analysed"] - before[a["source"]]["analysed"] for a in after]
+    grabbed = sum(a["grabbed"] - before[a["source"]]["grabbed"] for a in after)
+    dropped = sum(a["dropped"] - before[a["source"]]["dropped"] for a in after)
+    return sum(analysed) / seconds, min(analysed) / seconds, dropped / max(grabbed, 1)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("videos", nargs="+")
+    ap.add_argument("--cameras", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--workers", type=int, default=config.INFERENCE_WORKERS)
+    ap.add_argument("--seconds", type=float, default=20)
+    ap.add_argument("--unpaced", action="store_true")
+    args = ap.parse_args()
+
+    recognition.start_loading()
+    while not recognition.models_ready.wait(0.5):
+        if recognition.models_error is not None:
+            sys.exit(f"models failed to load: {recognition.models_error}")
+
+    print(f"{args.workers} workers, {'unpaced' if args.unpaced else 'real-time'} replay")
+    print(f"{'cameras':>8} {'total fps':>10} {'min cam fps':>12} {'dropped':>8}")
+    for n in args.cameras:
+        total, slowest, dropped = run(args.videos, n, args.workers, args.seconds, not args.unpaced)
+        print(f"{n:8d} {total:10.1f} {slowest:12.1f} {dropped:8.1%}")
+    recognition.writer.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Embedding + matching throughput with 1, 4 and 8 faces per frame.
+
+Compares one ResNet call and one gallery lookup per face against a single
+batched call per frame, and reports people recognised per second.
+
+    python benchmarks/bench_multiface.py [--faces 1 4 8] [--gallery 1000]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import torch
+from facenet_pytorch import InceptionResnetV1
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from gallery import Gallery, l2_normalize
+
+
+def per_face(resnet, gallery, faces):
+    return [gallery.match(resnet(face.unsqueeze(0))) for face in faces]
+
+
+def batched(resnet, gallery, faces):
+    return gallery.match_batch(resnet(faces))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--faces", type=int, nargs="+", default=[1, 4, 8])
+    ap.add_argument("--gallery", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    torch.set_grad_enabled(False)
+    resnet = InceptionResnetV1(pretrained='vggface2').eval()
+    rng = np.random.default_rng(0)
+    gallery = Gallery([f"person{i}" for i in range(args.gallery)],
+                      l2_normalize(rng.standard_normal((args.gallery, 512)).astype(np.float32)))
+
+    print(f"{'faces':>5} {'per-face ms':>12} {'batched ms':>11} {'people/s before':>16} {'people/s after':>15}")
+    for n in args.faces:
+        faces = torch.randn(n, 3, 160, 160)
+        timings = []
+        for fn in (per_face, batched):
+            fn(resnet, gallery, faces)
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                fn(resnet, gallery, faces)
+            timings.append((time.perf_counter() - t0) / args.repeat)
+        t_loop, t_batch = timings
+        print(f"{n:>5} {t_loop * 1e3:>12.1f} {t_batch * 1e3:>11.1f} {n / t_loop:>16.1f} {n / t_batch:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Detection latency vs. recall across scales, MTCNN settings and ROI search.
+
+    python benchmarks/bench_scales.py CLIP [CLIP ...] [--every 5] [--frames 200]
+
+Frames are sampled from each recorded clip (every Nth frame, in order so
+ROI search can follow faces). The reference is MTCNN at full resolution
+with the library defaults (min_face_size 20, factor 0.709); recall is the
+share of reference faces found again (IoU >= 0.5), "extra" counts
+detections the reference does not have. Only MTCNN time is measured,
+including the downscale.
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import cv2
+from PIL import Image
+from detection import AdaptiveDetector
+from embedders import load_detector
+from tracker import iou_matrix
+
+WIDTHS = (0, 960, 640, 480, 320)
+MTCNN_SETTINGS = ((20, 0.709), (40, 0.709), (40, 0.6), (60, 0.6))
+
+
+def read_clips(paths, every, limit):
+    clips = []
+    for path in paths:
+        cap = cv2.VideoCapture(path)
+        frames, i = [], 0
+        while len(frames) < limit:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if i % every == 0:
+                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            i += 1
+        cap.release()
+        if frames:
+            clips.append((os.path.basename(path), frames))
+    return clips
+
+
+def detector_fn(mtcnn):
+    def detect(rgb):
+        boxes, probs = mtcnn.detect(Image.fromarray(rgb))
+        return (None, None) if boxes is None or not len(boxes) else (boxes, probs)
+    return detect
+
+
+def run(clips, make):
+    # -> (mean ms per frame, [boxes per frame])
+    took, found = [], []
+    for _, frames in clips:
+        detector = make()
+        for rgb in frames:
+            t0 = time.perf_counter()
+            boxes, _ = detector(rgb)
+            took.append(time.perf_counter() - t0)
+            found.append(np.zeros((0, 4)) if boxes is None else boxes[:, :4])
+    return 1e3 * float(np.mean(took)), found
+
+
+def recall(found, reference):
+    hits = total = extra = 0
+    for boxes, ref in zip(found, reference):
+        total += len(ref)
+        if not len(ref):
+            extra += len(boxes)
+            continue
+        if not len(boxes):
+            continue
+        matched = (iou_matrix(ref, boxes) >= 0.5)
+        hits += int(matched.any(axis=1).sum())
+        extra += int((~matched.any(axis=0)).sum())
+    return hits / total if total else float("nan"), extra
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("clips", nargs="+")
+    ap.add_argument("--every", type=int, default=5, help="use every Nth frame")
+    ap.add_argument("--frames", type=int, default=200, help="frames per clip")
+    args = ap.parse_args()
+
+    import torch
+    torch.set_grad_enabled(False)
+    clips = read_clips(args.clips, args.every, args.frames)
+    if not clips:
+        sys.exit("no frames could be read")
+    h, w = clips[0][1][0].shape[:2]
+    print(f"{sum(len(f) for _, f in clips)} frames from {len(clips)} clip(s), {w}x{h}")
+
+    mtcnns = {s: load_detector(*s) for s in MTCNN_SETTINGS}
+    ref_ms, reference = run(clips, lambda: AdaptiveDetector(detector_fn(mtcnns[20, 0.709]), width=0, roi=False))
+    print(f"{'width':>6} {'min face':>8} {'factor':>6} {'roi':>4} {'ms':>8} {'speedup':>7} {'recall':>7} {'extra':>6}")
+    for width in WIDTHS:
+        for (min_face, factor), mtcnn in mtcnns.items():
+            for roi in (False, True):
+                ms, found = run(clips, lambda: AdaptiveDetector(detector_fn(mtcnn), width=width, roi=roi))
+                r, extra = recall(found, reference)
+                print(f"{width or 'full':>6} {min_face:8d} {factor:6.3f} {'yes' if roi else 'no':>4} "
+                      f"{ms:8.1f} {ref_ms / ms:6.1f}x {r:7.1%} {extra:6d}")
+
+
+if __name__ == "__main__":
+    main()
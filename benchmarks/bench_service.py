@@ -0,0 +1,144 @@
+"""Load test for service.py: throughput and p50/p99 latency of /recognize.
+
+Each simulated client keeps one connection open and posts the same image
+back to back. With --spawn the service is started (and stopped) here and
+the test waits for its models to load; otherwise it targets a running one.
+
+    python benchmarks/bench_service.py --spawn [--image dataset/x.jpg] [--clients 1 4 16] [--requests 200]
+
+Without --image the first picture in dataset/ is used, so every request
+carries a real face through detection, batching and matching.
+"""
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+import argparse
+import subprocess
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+import config
+from embedding_cache import IMAGE_EXTS
+
+
+async def request(reader, writer, method, target, body=b"", content_type="image/jpeg"):
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: bench\r\nContent-Type: {content_type}\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        if key.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(connect, image, count, latencies):
+    reader, writer = await connect()
+    try:
+        for _ in range(count):
+            t0 = time.perf_counter()
+            status, _ = await request(reader, writer, "POST", "/recognize", image)
+            if status != 200:
+                raise RuntimeError(f"/recognize returned {status}")
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        writer.close()
+
+
+async def health(connect):
+    reader, writer = await connect()
+    try:
+        return (await request(reader, writer, "GET", "/health"))[1]
+    finally:
+        writer.close()
+
+
+async def wait_ready(connect, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            state = await health(connect)
+            if state["error"]:
+                sys.exit(f"service failed to load models: {state['error']}")
+            if state["models_ready"]:
+                return state
+        except OSError:
+            pass
+        await asyncio.sleep(0.5)
+    sys.exit("service did not become ready in time")
+
+
+async def run(args, connect, image):
+    state = await wait_ready(connect, args.timeout)
+    print(f"backend {state['backend']}, {state['gallery_size']} enrolled")
+    # Warm-up (first batches pay for lazy allocations)
+    await client(connect, image, 5, [])
+    print(f"{'clients':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'faces/batch':>12}")
+    for clients in args.clients:
+        before = (await health(connect))["batching"]
+        latencies = []
+        per_client = max(1, args.requests // clients)
+        t0 = time.perf_counter()
+        await asyncio.gather(*[client(connect, image, per_client, latencies) for _ in range(clients)])
+        wall = time.perf_counter() - t0
+        after = (await health(connect))["batching"]
+        batches = max(1, after["batches"] - before["batches"])
+        ms = np.array(latencies) * 1e3
+        print(f"{clients:8d} {len(latencies) / wall:8.1f} {np.percentile(ms, 50):8.1f} "
+              f"{np.percentile(ms, 99):8.1f} {(after['faces'] - before['faces']) / batches:12.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--image", help="image to post (default: first picture in dataset/)")
+    ap.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    ap.add_argument("--host", default=config.SERVICE_HOST)
+    ap.add_argument("--port", type=int, default=config.SERVICE_PORT)
+    ap.add_argument("--unix", help="connect to a Unix socket instead of TCP")
+    ap.add_argument("--spawn", action="store_true", help="start service.py for the duration of the test")
+    ap.add_argument("--timeout", type=float, default=300, help="seconds to wait for the models to load")
+    args = ap.parse_args()
+
+    path = args.image
+    if path is None:
+        dataset = os.path.join(ROOT, "dataset")
+        images = sorted(f for f in os.listdir(dataset) if f.lower().endswith(IMAGE_EXTS)) \
+            if os.path.isdir(dataset) else []
+        if not images:
+            sys.exit("no --image given and dataset/ has no pictures")
+        path = os.path.join(dataset, images[0])
+    with open(path, "rb") as f:
+        image = f.read()
+
+    if args.unix:
+        connect = lambda: asyncio.open_unix_connection(args.unix)
+    else:
+        connect = lambda: asyncio.open_connection(args.host, args.port)
+
+    proc = None
+    if args.spawn:
+        cmd = [sys.executable, os.path.join(ROOT, "service.py"), "--host", args.host, "--port", str(args.port)]
+        if args.unix:
+            cmd += ["--unix", args.unix]
+        proc = subprocess.Popen(cmd, cwd=ROOT)
+    try:
+        asyncio.run(run(args, connect, image))
+    finally:
+        if proc is not None:
+            # SIGINT lets the service flush queued attendance before exiting
+            proc.send_signal(signal.SIGINT)
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
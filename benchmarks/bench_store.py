@@ -0,0 +1,75 @@
+"""Date-range filtering: full CSV re-parse (old admin.py) vs the indexed SQLite store.
+
+    python benchmarks/bench_store.py [--records 1000000] [--people 300]
+"""
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+import datetime
+import tempfile
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from attendance_store import AttendanceStore, TS_FORMAT
+
+
+def synthetic_rows(n, people, days, seed=0):
+    # Time-ordered In/Out events spread evenly over `days`
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1, 7)
+    step = days * 86400 / n
+    for i in range(n):
+        ts = start + datetime.timedelta(seconds=int(i * step))
+        yield (f"Person {rng.randrange(people)}, Staff", ts.strftime(TS_FORMAT),
+               "Time In" if rng.random() < 0.5 else "Time Out")
+
+
+def csv_filter(path, start, end):
+    # What apply_date_filter used to do on every click
+    df = pd.read_csv(path, header=None, names=["Name", "Timestamp", "Type"])
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"])
+    return df.loc[(df["Timestamp"] >= start) & (df["Timestamp"] <= end)]
+
+
+def clock(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=1000000)
+    ap.add_argument("--people", type=int, default=300)
+    ap.add_argument("--days", type=int, default=730)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    csv_path = os.path.join(tmp, "attendance.csv")
+    with open(csv_path, "w", newline="") as f:
+        csv.writer(f).writerows(synthetic_rows(args.records, args.people, args.days))
+
+    store, t_import = clock(AttendanceStore, os.path.join(tmp, "attendance.db"), csv_path)
+    print(f"{args.records} records; CSV import into SQLite took {t_import:.1f}s "
+          f"({args.records / t_import:,.0f} rows/s in batched commits)")
+
+    plan = store.conn.execute("EXPLAIN QUERY PLAN SELECT name, ts, type FROM attendance "
+                              "WHERE ts >= ? AND ts <= ? ORDER BY ts, id", ("a", "b")).fetchall()
+    print("query plan:", "; ".join(row[-1] for row in plan))
+
+    base = pd.Timestamp("2024-06-03")
+    ranges = {"1 day": pd.Timedelta(days=1), "1 week": pd.Timedelta(days=7), "1 month": pd.Timedelta(days=30)}
+    print(f"{'range':>8} {'rows':>8} {'CSV scan ms':>12} {'SQLite ms':>10} {'speedup':>8}")
+    for label, span in ranges.items():
+        start, end = base, base + span - pd.Timedelta(seconds=1)
+        old, t_old = clock(csv_filter, csv_path, start, end)
+        new, t_new = clock(store.query, start, end)
+        assert len(old) == len(new)
+        print(f"{label:>8} {len(new):>8} {t_old * 1e3:>12.1f} {t_new * 1e3:>10.1f} {t_old / t_new:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Incremental summary update per committed batch vs full recompute.
+
+    python benchmarks/bench_summary.py [--records 1000000] [--batch 50]
+"""
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+import datetime
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from attendance_store import AttendanceStore, TS_FORMAT
+from attendance_summary import SummaryEngine
+from bench_store import synthetic_rows
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=1000000)
+    ap.add_argument("--people", type=int, default=300)
+    ap.add_argument("--batch", type=int, default=50)
+    ap.add_argument("--batches", type=int, default=20)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "attendance.csv")
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows(synthetic_rows(args.records, args.people, 730))
+    store = AttendanceStore(os.path.join(tmp, "attendance.db"), path)
+
+    t0 = time.perf_counter()
+    engine = SummaryEngine(store)
+    t_full = time.perf_counter() - t0
+    days = engine.count("daily")
+    print(f"{args.records} events -> {days} daily rows; full recompute {t_full:.2f}s")
+
+    rng = random.Random(1)
+    now = datetime.datetime(2026, 3, 2, 8)
+    t_inc = 0.0
+    for _ in range(args.batches):
+        batch = []
+        for _ in range(args.batch):
+            now += datetime.timedelta(seconds=rng.randrange(1, 120))
+            batch.append((f"Person {rng.randrange(args.people)}, Staff", now.strftime(TS_FORMAT),
+                          rng.choice(("Time In", "Time Out"))))
+        store.add_many(batch)
+        t0 = time.perf_counter()
+        engine.update(batch)
+        t_inc += time.perf_counter() - t0
+    t_inc /= args.batches
+    print(f"incremental update of a {args.batch}-event batch: {t_inc * 1e3:.2f} ms "
+          f"({t_full / t_inc:,.0f}x cheaper than recomputing)")
+
+    incremental = engine.daily()
+    engine.rebuild()
+    assert incremental == engine.daily(), "incremental summaries diverged from full recompute"
+    print("incremental result matches a full recompute")
+
+
+if __name__ == "__main__":
+    main()
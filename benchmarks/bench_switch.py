@@ -0,0 +1,120 @@
+"""Screen switch latency: one process per screen vs the app shell.
+
+"old" is what every navigation used to cost: a fresh interpreter that
+imports the screen's module and builds its window, timed up to the first
+laid-out frame and, for the attendance screen, until the models are
+loaded and the gallery is built (which the old screen did before showing
+anything; models now load lazily, so the wait is explicit). Each spawn
+runs in its own temporary directory with a copy of dataset/ and no
+embedding cache, as before the cache existed, so the real attendance.db
+and journal are never touched. "shell" is AppShell.show between screens
+that already exist in one process. The first visit to a screen is
+reported separately, since it still pays for the import.
+
+    python benchmarks/bench_switch.py [--rounds 5] [--screens admin user userlist attendance]
+
+Needs a display (and a camera for the attendance/user screens).
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+HERE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, HERE)
+from app import SCREENS
+
+# Build a screen standalone in a fresh process and exit once it is laid out
+# and any face models it started loading are ready
+SPAWN = """
+import sys, time, importlib, tkinter as tk
+sys.path.insert(0, {here!r})
+module, cls = {screen!r}
+root = tk.Tk()
+screen = getattr(importlib.import_module(module), cls)(root)
+root.update_idletasks()
+root.update()
+recognition = sys.modules.get("recognition")
+if recognition is not None:
+    recognition.start_loading()
+    while not recognition.models_ready.is_set():
+        if recognition.models_error is not None:
+            sys.exit(f"models failed to load: {{recognition.models_error}}")
+        root.update()
+        time.sleep(0.01)
+screen.shutdown()
+root.destroy()
+"""
+
+
+def workdir():
+    # A scratch copy of the app's data: dataset/ only, no cache or database
+    path = tempfile.mkdtemp(prefix="bench_switch-")
+    if os.path.isdir(os.path.join(HERE, "dataset")):
+        shutil.copytree(os.path.join(HERE, "dataset"), os.path.join(path, "dataset"))
+    return path
+
+
+def spawn_ms(name):
+    cwd = workdir()
+    try:
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", SPAWN.format(here=HERE, screen=SCREENS[name])],
+                       cwd=cwd, check=True)
+        return (time.perf_counter() - t0) * 1e3
+    finally:
+        shutil.rmtree(cwd, ignore_errors=True)
+
+
+def shell_ms(names, rounds):
+    import tkinter as tk
+    from app import AppShell
+    root = tk.Tk()
+    shell = AppShell(root)
+    try:
+        for name in names:
+            shell.show(name)
+            root.update()
+        first = {name: t * 1e3 for name, t in shell.switch_times}
+        shell.switch_times = []
+        for _ in range(rounds):
+            for name in names:
+                shell.show(name)
+                root.update()
+        warm = {}
+        for name, t in shell.switch_times:
+            warm.setdefault(name, []).append(t * 1e3)
+        return first, warm
+    finally:
+        shell.quit()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--screens", nargs="+", default=["admin", "user", "userlist", "attendance"])
+    args = ap.parse_args()
+
+    if os.name != "nt" and not os.environ.get("DISPLAY"):
+        sys.exit("no display: run this on the kiosk (or under xvfb-run)")
+
+    # The shell also runs on scratch data, never the real attendance.db
+    cwd = workdir()
+    os.chdir(cwd)
+    try:
+        first, warm = shell_ms(args.screens, args.rounds)
+    finally:
+        os.chdir(HERE)
+        shutil.rmtree(cwd, ignore_errors=True)
+    print(f"{'screen':>12} {'old spawn ms':>14} {'shell first ms':>15} {'shell warm ms':>14}")
+    for name in args.screens:
+        old = statistics.median(spawn_ms(name) for _ in range(args.rounds))
+        print(f"{name:>12} {old:14.0f} {first[name]:15.1f} {statistics.median(warm[name]):14.2f}")
+
+
+if __name__ == "__main__":
+    main()
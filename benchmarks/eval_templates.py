@@ -0,0 +1,136 @@
+"""False-accept / false-reject rates of the template modes on held-out photos.
+
+People with several captures in the dataset ("Name, Position #2.jpg", ...)
+get one capture held out as a genuine probe; the rest are enrolled. A
+share of people is left out of the gallery entirely and all of their
+captures are impostor probes. Each mode is then scored over a range of
+thresholds, averaged over several random splits:
+
+    single   only one enrolled capture per person (the old one-photo gallery)
+    mean     averaged template          medoid   most central capture
+    best     closest capture (best-of-k)
+
+FRR counts genuine probes not matched to their own person (rejected or
+matched to someone else, the latter also shown as misID); FAR counts
+impostor probes matched to anyone.
+
+    python benchmarks/eval_templates.py [--dataset dataset] [--impostors 0.2] [--rounds 5]
+"""
+import os
+import sys
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import config
+from embedding_cache import EmbeddingCache
+from embedders import get_embedder, load_detector, backend_class
+from gallery import Gallery, aggregate, person_id, as_embeddings
+
+MODES = ("single", "mean", "medoid", "best")
+
+_models = []
+
+
+def embed_image(path):
+    # Only called for photos the embedding cache has not seen
+    from PIL import Image
+    if not _models:
+        _models.extend([load_detector(), get_embedder(config.EMBEDDING_BACKEND)])
+    detector, embedder = _models
+    pil = Image.open(path).convert("RGB")
+    boxes, _ = detector.detect(pil)
+    if boxes is None or not len(boxes):
+        return None
+    largest = int(np.argmax((boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])))
+    return embedder.embed(detector.extract(pil, boxes[largest:largest + 1], None))
+
+
+def split(people, impostor_share, rng):
+    # -> enrolled {capture: emb}, genuine [(person, emb)], impostor [emb]
+    names = sorted(people)
+    rng.shuffle(names)
+    n_out = int(round(len(names) * impostor_share))
+    enrolled, genuine, impostor = {}, [], []
+    for i, person in enumerate(names):
+        captures = people[person]
+        if i < n_out:
+            impostor.extend(emb for _, emb in captures)
+            continue
+        order = rng.permutation(len(captures))
+        if len(captures) > 1:
+            held = captures[order[0]]
+            genuine.append((person, held[1]))
+            order = order[1:]
+        for j in order:
+            enrolled[captures[j][0]] = captures[j][1]
+    return enrolled, genuine, impostor
+
+
+def nearest(gallery, probes):
+    if not probes or not len(gallery):
+        return [], np.zeros(0)
+    d = gallery.distances(np.concatenate([as_embeddings(p) for p in probes]))
+    best = d.argmin(axis=1)
+    return [person_id(gallery.names[j]) for j in best], d[np.arange(len(best)), best]
+
+
+def score(enrolled, genuine, impostor, mode, thresholds):
+    if mode == "single":
+        # One capture per person, as before several captures were allowed
+        first = {}
+        for name in sorted(enrolled):
+            first.setdefault(person_id(name), enrolled[name])
+        rows = first
+    else:
+        rows = aggregate(enrolled, mode)
+    gallery = Gallery.from_dict(rows)
+    g_names, g_dist = nearest(gallery, [emb for _, emb in genuine])
+    correct = np.array([n == p for n, (p, _) in zip(g_names, genuine)], dtype=bool)
+    _, i_dist = nearest(gallery, impostor)
+    out = []
+    for t in thresholds:
+        accepted = g_dist < t
+        frr = 1.0 - (accepted & correct).mean() if len(genuine) else float("nan")
+        misid = (accepted & ~correct).mean() if len(genuine) else float("nan")
+        far = (i_dist < t).mean() if len(impostor) else float("nan")
+        out.append((frr, misid, far))
+    return np.array(out)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dataset", default="dataset")
+    ap.add_argument("--impostors", type=float, default=0.2, help="share of people left out of the gallery")
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--thresholds", type=float, nargs="+")
+    args = ap.parse_args()
+
+    base = config.MATCH_THRESHOLD or backend_class(config.EMBEDDING_BACKEND).threshold
+    thresholds = args.thresholds or [round(base * f, 3) for f in (0.7, 0.8, 0.9, 1.0, 1.1, 1.2)]
+
+    embeddings = EmbeddingCache(backend=config.EMBEDDING_BACKEND).sync(args.dataset, embed_image)
+    people = {}
+    for name in sorted(embeddings):
+        people.setdefault(person_id(name), []).append((name, embeddings[name]))
+    multi = sum(len(c) > 1 for c in people.values())
+    print(f"{len(embeddings)} photos of {len(people)} people, {multi} with several captures")
+    if not multi:
+        sys.exit("no one has more than one capture: nothing to hold out")
+
+    rng = np.random.default_rng(args.seed)
+    totals = {mode: 0 for mode in MODES}
+    for _ in range(args.rounds):
+        enrolled, genuine, impostor = split(people, args.impostors, rng)
+        for mode in MODES:
+            totals[mode] = totals[mode] + score(enrolled, genuine, impostor, mode, thresholds)
+
+    print(f"{'mode':>8} {'threshold':>10} {'FRR':>7} {'misID':>7} {'FAR':>7}")
+    for mode in MODES:
+        for t, (frr, misid, far) in zip(thresholds, totals[mode] / args.rounds):
+            print(f"{mode:>8} {t:10.3f} {frr:7.1%} {misid:7.1%} {far:7.1%}")
+
+
+if __name__ == "__main__":
+    main()
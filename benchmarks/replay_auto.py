@@ -0,0 +1,221 @@
+"""Replay recognitions through hands-free attendance and count good and false logs.
+
+Frames come from one of three places:
+
+    --video entrance.mp4 [--record frames.jsonl]   run recognition on a recording
+    --replay frames.jsonl                          reuse a recorded run (no models needed)
+    --synthetic                                    simulated visitors with noisy recognition
+
+Each frame is a timestamp and its faces as (track, name, distance,
+fresh), where fresh is False when the analyser repeated a track's cached
+identity instead of embedding the face again. The
+same stream goes through AutoAttendance (vote smoothing + cooldown) and
+through the old behaviour, where whatever name the current frame shows is
+logged (with the same cooldown). With --truth visits.csv (name,start_s,end_s
+per visit; built in for --synthetic) an event is good when it falls inside
+an unclaimed visit of that person, and false otherwise.
+
+    python benchmarks/replay_auto.py --synthetic [--minutes 30] [--error 0.1]
+"""
+import os
+import sys
+import csv
+import json
+import argparse
+from collections import namedtuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import config
+from auto_attendance import AutoAttendance
+
+# fresh: embedded for this frame rather than repeated from the track
+Face = namedtuple("Face", "track name dist fresh", defaults=(True,))
+
+
+class Naive:
+    # One click per recognized frame, as when current_name is logged directly
+    def __init__(self, cooldown):
+        self.cooldown = cooldown
+        self.last = {}
+
+    def observe(self, faces, now):
+        events = []
+        for face in faces:
+            if face.name and now - self.last.get(face.name, -np.inf) >= self.cooldown:
+                self.last[face.name] = now
+                events.append((face.name, "Time In"))
+        return events
+
+
+def video_frames(path, record=None):
+    import cv2
+    import recognition
+    recognition.start_loading()
+    while not recognition.models_ready.wait(0.5):
+        if recognition.models_error is not None:
+            sys.exit(f"models failed to load: {recognition.models_error}")
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    analyzer = recognition.FaceAnalyzer()
+    out = open(record, "w") if record else None
+    i = 0
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            t = i / fps
+            faces = [Face(f.track, f.name, float(f.dist), f.fresh) for f in analyzer(frame)]
+            if out is not None:
+                out.write(json.dumps([t, [list(f) for f in faces]]) + "\n")
+            yield t, faces
+            i += 1
+    finally:
+        cap.release()
+        if out is not None:
+            out.close()
+
+
+def replay_frames(path):
+    with open(path) as f:
+        for line in f:
+            t, faces = json.loads(line)
+            yield t, [Face(*f) for f in faces]
+
+
+def synthetic(minutes, fps, people, arrival_s, dwell_s, error, strangers, seed,
+              detect_every=config.DETECT_EVERY, reembed_every=config.REEMBED_EVERY,
+              confident=0.9 * config.TRACK_CONFIDENCE):
+    """Visitors walk past one camera; returns (frames, visits).
+
+    Identities are cached per track the way FaceAnalyzer does: a visitor
+    is embedded when first detected, on every detection while unknown or
+    not confidently matched, and every ``reembed_every`` frames otherwise;
+    all other frames repeat the cached result with fresh=False. Each
+    embedding is correct, someone else (probability error/2) or unknown
+    (error/2); strangers are not enrolled but match someone with
+    probability 2*error. Right and wrong matches get distances from the
+    same range, so a wrong match is often confident and stays cached
+    until the next re-check.
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"Person {i}, Staff" for i in range(people)]
+    visits, tracks = [], []
+    t, track = 0.0, 0
+    while t < minutes * 60:
+        t += rng.exponential(arrival_s)
+        dwell = max(1.0, rng.normal(dwell_s, dwell_s / 3))
+        track += 1
+        stranger = rng.random() < strangers
+        name = None if stranger else names[rng.integers(people)]
+        tracks.append((track, name, t, t + dwell))
+        if name:
+            visits.append((name, t, t + dwell))
+    frames = []
+    cached = {}
+    for i in range(int(minutes * 60 * fps)):
+        now = i / fps
+        detect = i % detect_every == 0
+        faces = []
+        for track, name, start, end in tracks:
+            if not start <= now <= end or (track not in cached and not detect):
+                continue
+            seen, dist, embedded = cached.get(track, (None, None, None))
+            if detect and (embedded is None or seen is None or dist > confident
+                           or i - embedded >= reembed_every):
+                r = rng.random()
+                if name is None:
+                    seen = names[rng.integers(people)] if r < 2 * error else None
+                elif r < error / 2:
+                    seen = names[rng.integers(people)]
+                elif r < error:
+                    seen = None
+                else:
+                    seen = name
+                dist = rng.uniform(0.35, 0.85) if seen else 1.2
+                cached[track] = (seen, dist, i)
+                faces.append(Face(track, seen, dist, True))
+            else:
+                faces.append(Face(track, seen, dist, False))
+        frames.append((now, faces))
+    return frames, visits
+
+
+def load_truth(path):
+    with open(path, newline="") as f:
+        return [(row[0], float(row[1]), float(row[2])) for row in csv.reader(f) if len(row) >= 3]
+
+
+def grade(events, visits, slack=2.0):
+    # Each visit can justify one event; slack allows for the voting delay
+    claimed = set()
+    good = false = 0
+    for t, name in events:
+        hit = next((i for i, (n, start, end) in enumerate(visits)
+                    if i not in claimed and n == name and start - slack <= t <= end + slack), None)
+        if hit is None:
+            false += 1
+        else:
+            claimed.add(hit)
+            good += 1
+    return good, false, len(visits) - len(claimed)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--video")
+    src.add_argument("--replay")
+    src.add_argument("--synthetic", action="store_true")
+    ap.add_argument("--record", help="with --video: save the recognitions for --replay")
+    ap.add_argument("--truth", help="CSV of name,start_s,end_s visits")
+    ap.add_argument("--window", type=int, default=config.AUTO_WINDOW)
+    ap.add_argument("--min-votes", type=int, default=config.AUTO_MIN_VOTES)
+    ap.add_argument("--cooldown", type=float, default=config.AUTO_COOLDOWN_S)
+    ap.add_argument("--minutes", type=float, default=30, help="synthetic stream length")
+    ap.add_argument("--fps", type=float, default=10, help="synthetic recognition rate")
+    ap.add_argument("--people", type=int, default=200)
+    ap.add_argument("--arrival", type=float, default=6.0, help="mean seconds between synthetic visitors")
+    ap.add_argument("--dwell", type=float, default=4.0, help="mean seconds a visitor is in view")
+    ap.add_argument("--error", type=float, default=0.1, help="per-frame misrecognition rate")
+    ap.add_argument("--strangers", type=float, default=0.1, help="share of visitors not enrolled")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--count-repeats", action="store_true",
+                    help="let repeated cached identities vote too (how voting used to work)")
+    args = ap.parse_args()
+
+    visits = load_truth(args.truth) if args.truth else None
+    if args.synthetic:
+        frames, visits = synthetic(args.minutes, args.fps, args.people, args.arrival, args.dwell,
+                                   args.error, args.strangers, args.seed)
+    elif args.video:
+        frames = video_frames(args.video, args.record)
+    else:
+        frames = replay_frames(args.replay)
+
+    auto = AutoAttendance(args.window, args.min_votes, args.cooldown, mode="in")
+    naive = Naive(args.cooldown)
+    logged = {"voting": [], "per-frame": []}
+    duration = 0.0
+    for t, faces in frames:
+        duration = t
+        votes = [f._replace(fresh=True) for f in faces] if args.count_repeats else faces
+        logged["voting"] += [(t, name) for name, _ in auto.observe(votes, now=t)]
+        logged["per-frame"] += [(t, name) for name, _ in naive.observe(faces, t)]
+
+    minutes = max(duration / 60, 1e-9)
+    print(f"{duration / 60:.1f} min replayed" + (f", {len(visits)} visits" if visits is not None else ""))
+    print(f"{'policy':>10} {'events':>7} {'per min':>8} {'good':>6} {'false':>6} {'missed':>7}")
+    for policy, events in logged.items():
+        row = f"{policy:>10} {len(events):7d} {len(events) / minutes:8.2f}"
+        if visits is not None:
+            good, false, missed = grade(events, visits)
+            row += f" {good:6d} {false:6d} {missed:7d}"
+        print(row)
+    print(f"voting suppressed {auto.stats['suppressed']} repeat sightings within the cooldown")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""End-to-end benchmark suite; needs no camera or display.
+
+    python benchmarks/run_suite.py [--video clip.mp4 ...] [--images folder ...]
+                                   [--gallery-sizes 1000 10000 100000] [--events 200000]
+                                   [--out results.json] [--compare baseline.json]
+
+Sections (--sections picks a subset):
+
+    startup   separate processes load the models with an empty, then a
+              warm embedding cache: import time, time to models ready,
+              per-stage breakdown (see startup.py), RSS
+    pipeline  video files and image folders replayed through FaceAnalyzer,
+              the analyser ams.py runs: per-frame latency, fps, per-stage
+              p50/p95/p99 (see metrics.py), tracker counters, RSS
+    matching  synthetic galleries of each size, exact and IVF: build time,
+              matrix size, match_batch latency for 1 and 8 probes, as
+              recognize_faces calls it
+    store     a synthetic attendance log: insert rate, date/name queries,
+              summary rebuild and queries
+
+Everything runs in a scratch directory holding a link to --dataset, so
+the real attendance.db and embedding cache are never touched. Synthetic
+data is seeded. Results are written as JSON (with the commit, versions
+and settings they were taken with); --compare prints every number next
+to a previous run's.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import datetime
+import resource
+import tempfile
+import subprocess
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+import config
+
+SECTIONS = ("startup", "pipeline", "matching", "store")
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg')
+
+
+def rss_mb():
+    # Peak resident set size; ru_maxrss is KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def percentiles(seconds):
+    ms = 1e3 * np.asarray(seconds, dtype=np.float64)
+    if not len(ms):
+        return {}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"mean_ms": round(float(ms.mean()), 3), "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3)}
+
+
+def clock(fn, repeat):
+    # One warm-up call, then `repeat` timed calls
+    out = fn()
+    took = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        took.append(time.perf_counter() - t0)
+    return out, took
+
+
+def startup_child():
+    # Runs in the scratch directory; prints one JSON line
+    from startup import profile
+    t0 = time.perf_counter()
+    import recognition
+    imported = time.perf_counter() - t0
+    recognition.start_loading()
+    while not recognition.models_ready.wait(0.1):
+        if recognition.models_error is not None:
+            print(json.dumps({"error": str(recognition.models_error)}))
+            return
+    recognition.writer.stop()
+    stages = {}
+    for name, _, took, _ in profile.stages:
+        stages[name + "_s"] = round(took, 3)
+    print(json.dumps({"import_s": round(imported, 3), "models_ready_s": round(profile.elapsed(), 3),
+                      "gallery_size": len(recognition.gallery.names), "rss_mb": rss_mb(), "stages": stages}))
+
+
+def bench_startup(workdir):
+    out = {}
+    for run in ("cold_cache", "warm_cache"):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--startup-child"],
+                              cwd=workdir, capture_output=True, text=True,
+                              env=dict(os.environ, AMS_STARTUP_REPORT="0"))
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+        if proc.returncode or not lines:
+            out[run] = {"error": (proc.stderr.strip().splitlines() or ["no output"])[-1]}
+            continue
+        out[run] = json.loads(lines[-1])
+        out[run]["process_s"] = round(time.perf_counter() - t0, 3)
+    return out
+
+
+def read_frames(video=None, folder=None, limit=0):
+    import cv2
+    if folder is not None:
+        for i, fname in enumerate(sorted(os.listdir(folder))):
+            if limit and i >= limit:
+                return
+            if fname.lower().endswith(IMAGE_EXTS):
+                frame = cv2.imread(os.path.join(folder, fname))
+                if frame is not None:
+                    yield frame
+        return
+    cap = cv2.VideoCapture(video)
+    i = 0
+    try:
+        while not limit or i < limit:
+            ok, frame = cap.read()
+            if not ok:
+                return
+            yield frame
+            i += 1
+    finally:
+        cap.release()
+
+
+def bench_pipeline(inputs, limit):
+    import recognition
+    from metrics import metrics
+    metrics.enabled = True
+    recognition.start_loading()
+    while not recognition.models_ready.wait(0.1):
+        if recognition.models_error is not None:
+            return {"error": str(recognition.models_error)}
+    out = {}
+    for kind, path in inputs:
+        analyzer = recognition.FaceAnalyzer()
+        metrics.stages.clear()
+        took, faces = [], 0
+        frames = read_frames(**{kind: path}, limit=limit)
+        t_all = time.perf_counter()
+        for frame in frames:
+            t0 = time.perf_counter()
+            faces += len(analyzer(frame))
+            took.append(time.perf_counter() - t0)
+        t_all = time.perf_counter() - t_all
+        stages = metrics.snapshot()["stages"]
+        out[os.path.basename(os.path.normpath(path))] = {
+            "frames": len(took), "faces": faces,
+            "fps": round(len(took) / t_all, 2) if t_all else 0.0,
+            "frame": percentiles(took),
+            "stages": {name: {k: s[k] for k in ("count", "p50_ms", "p95_ms", "p99_ms") if k in s}
+                       for name, s in stages.items()},
+            "tracker": dict(analyzer.stats), "rss_mb": rss_mb()}
+    metrics.enabled = False
+    recognition.writer.stop()
+    return out
+
+
+def bench_matching(sizes, dim, seed):
+    from gallery import Gallery, l2_normalize, person_id
+    from ann_index import IVFIndex
+    rng = np.random.default_rng(seed)
+    out = {}
+    for n in sizes:
+        embs = l2_normalize(rng.standard_normal((n, dim)).astype(np.float32))
+        rows = {f"Person {i}, Synthetic": embs[i:i + 1] for i in range(n)}
+        pick = rng.integers(n, size=8)
+        probes = l2_normalize(embs[pick] + 0.02 * rng.standard_normal((8, dim)).astype(np.float32))
+        kinds = {"exact": lambda: Gallery.from_dict(rows)}
+        if n >= 1000:
+            kinds["ivf"] = lambda: IVFIndex.from_dict(rows, nlist=config.IVF_NLIST, nprobe=config.IVF_NPROBE)
+        for kind, build in kinds.items():
+            t0 = time.perf_counter()
+            db = build()
+            t_build = time.perf_counter() - t0
+            repeat = max(5, min(200, 2000000 // n))
+            _, one = clock(lambda: [person_id(m) for m, _ in db.match_batch(probes[:1], 0.9) if m], repeat=repeat)
+            matches, batch = clock(lambda: db.match_batch(probes, 0.9), repeat=repeat)
+            out[f"{kind}_{n}"] = {"build_s": round(t_build, 3), "matrix_mb": round(n * dim * 4 / 2 ** 20, 1),
+                                  "match_1": percentiles(one), "match_8": percentiles(batch),
+                                  "recall_8": float(np.mean([m == f"Person {i}, Synthetic"
+                                                             for (m, _), i in zip(matches, pick)])),
+                                  "rss_mb": rss_mb()}
+            del db
+    return out
+
+
+def bench_store(workdir, events, people, seed):
+    from attendance_store import AttendanceStore
+    from attendance_summary import SummaryEngine
+    from bench_store import synthetic_rows
+    days = 365
+    store = AttendanceStore(os.path.join(workdir, "bench_attendance.db"), import_from=None)
+    rows = list(synthetic_rows(events, people, days, seed))
+    t0 = time.perf_counter()
+    for i in range(0, len(rows), 10000):
+        store.add_many(rows[i:i + 10000])
+    t_insert = time.perf_counter() - t0
+    out = {"events": events, "insert_per_s": round(events / t_insert)}
+    day, month = "2024-06-03", "2024-06"
+    name = rows[len(rows) // 2][0]
+    queries = {
+        "query_day": lambda: store.query(day + " 00:00:00", day + " 23:59:59"),
+        "query_month": lambda: store.query(month + "-01 00:00:00", month + "-30 23:59:59"),
+        "query_person_month": lambda: store.query(month + "-01 00:00:00", month + "-30 23:59:59", name),
+        "query_page": lambda: store.query(limit=50, offset=events // 2, descending=True),
+        "count_month": lambda: store.count(month + "-01 00:00:00", month + "-30 23:59:59"),
+    }
+    for key, fn in queries.items():
+        result, took = clock(fn, repeat=20)
+        out[key] = dict(percentiles(took), rows=result if isinstance(result, int) else len(result))
+    t0 = time.perf_counter()
+    summaries = SummaryEngine(store)
+    out["summary_rebuild_s"] = round(time.perf_counter() - t0, 3)
+    _, took = clock(lambda: summaries.daily(month + "-01", month + "-30"), repeat=20)
+    out["summary_daily_month"] = percentiles(took)
+    _, took = clock(lambda: summaries.monthly(), repeat=20)
+    out["summary_monthly_all"] = percentiles(took)
+    store.close()
+    out["rss_mb"] = rss_mb()
+    return out
+
+
+def describe(args):
+    versions = {"python": platform.python_version(), "numpy": np.__version__}
+    for mod in ("torch", "cv2", "facenet_pytorch"):
+        try:
+            versions[mod] = getattr(__import__(mod), "__version__", "?")
+        except ImportError:
+            pass
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    settings = {k: v for k, v in vars(config).items()
+                if k.isupper() and isinstance(v, (int, float, str, list))}
+    return {"time": datetime.datetime.now().isoformat(timespec="seconds"), "commit": commit,
+            "machine": platform.machine(), "system": platform.system(), "cpus": os.cpu_count(),
+            "versions": versions, "settings": settings, "args": vars(args)}
+
+
+def flatten(d, prefix=""):
+    out = {}
+    for k, v in d.items():
+        if isinstance(v, dict):
+            out.update(flatten(v, f"{prefix}{k}."))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[prefix + k] = v
+    return out
+
+
+def compare(results, path):
+    with open(path) as f:
+        old = flatten(json.load(f)["results"])
+    new = flatten(results)
+    print(f"{'metric':<60} {'baseline':>12} {'now':>12} {'change':>8}")
+    for key in sorted(new.keys() | old.keys()):
+        a, b = old.get(key), new.get(key)
+        change = f"{100 * (b - a) / a:+7.1f}%" if a and b is not None else ""
+        fmt = lambda v: "-" if v is None else f"{v:12.4g}"
+        print(f"{key:<60} {fmt(a)} {fmt(b)} {change:>8}")
+
+
+def main():
+    if "--startup-child" in sys.argv:
+        startup_child()
+        return
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sections", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    ap.add_argument("--dataset", default=os.path.join(ROOT, "dataset"))
+    ap.add_argument("--video", nargs="*", default=[], help="recorded clips for the pipeline section")
+    ap.add_argument("--images", nargs="*", default=[], help="image folders (default: the dataset)")
+    ap.add_argument("--frames", type=int, default=0, help="at most this many frames per input")
+    ap.add_argument("--gallery-sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--dim", type=int, default=512)
+    ap.add_argument("--events", type=int, default=200000)
+    ap.add_argument("--people", type=int, default=300)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--compare", help="earlier results file to compare against")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ams-bench-")
+    dataset = os.path.abspath(args.dataset)
+    try:
+        os.symlink(dataset, os.path.join(workdir, "dataset"))
+    except OSError:
+        shutil.copytree(dataset, os.path.join(workdir, "dataset"))
+    results = {}
+    here = os.getcwd()
+    out_path = os.path.abspath(args.out)
+    try:
+        if "startup" in args.sections:
+            print("startup ...", flush=True)
+            results["startup"] = bench_startup(workdir)
+        if "matching" in args.sections:
+            print("matching ...", flush=True)
+            results["matching"] = bench_matching(args.gallery_sizes, args.dim, args.seed)
+        if "store" in args.sections:
+            print("store ...", flush=True)
+            results["store"] = bench_store(workdir, args.events, args.people, args.seed)
+        if "pipeline" in args.sections:
+            print("pipeline ...", flush=True)
+            inputs = [("video", os.path.abspath(v)) for v in args.video]
+            inputs += [("folder", os.path.abspath(f)) for f in args.images or ([] if args.video else [dataset])]
+            # recognition opens attendance.db and the cache relative to the cwd
+            os.chdir(workdir)
+            results["pipeline"] = bench_pipeline(inputs, args.frames)
+    finally:
+        os.chdir(here)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(out_path, "w") as f:
+        json.dump({"meta": describe(args), "results": results}, f, indent=2)
+    print(f"results written to {out_path}")
+    if args.compare:
+        compare(results, args.compare)
+    else:
+        for key, value in sorted(flatten(results).items()):
+            print(f"{key:<60} {value:12.4g}")
+
+
+if __name__ == "__main__":
+    main()
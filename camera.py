@@ -0,0 +1,69 @@
+import threading
+import cv2
+
+from pipeline import FrameGrabber
+
+
+def parse_source(spec):
+    # "name=uri" or just "uri"; a bare integer is a device index, anything
+    # else a video file or stream URL (rtsp://...)
+    spec = str(spec).strip()
+    name, sep, uri = spec.partition("=")
+    if not sep or "://" in name:
+        name, uri = spec, spec
+    return name, int(uri) if uri.isdigit() else uri
+
+
+def open_capture(uri, width=None, height=None):
+    cap = cv2.VideoCapture(uri)
+    if width and height:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    return cap
+
+
+class Camera:
+    """One capture device shared by every screen in the process.
+
+    ``acquire()`` opens the device and starts a FrameGrabber on first use
+    and returns it; ``release()`` closes it again once the last user is
+    done, unless ``keep_open`` is set (the app shell keeps the camera warm
+    so switching screens never reopens it).
+    """
+
+    def __init__(self, source=0, width=None, height=None, keep_open=False):
+        self.name, self.source = parse_source(source)
+        self.width = width
+        self.height = height
+        self.keep_open = keep_open
+        self.lock = threading.Lock()
+        self.cap = None
+        self.grabber = None
+        self.users = 0
+
+    def acquire(self):
+        with self.lock:
+            if self.grabber is None:
+                self.cap = open_capture(self.source, self.width, self.height)
+                self.grabber = FrameGrabber(self.cap)
+                self.grabber.start()
+            self.users += 1
+            return self.grabber
+
+    def release(self):
+        with self.lock:
+            self.users = max(0, self.users - 1)
+            if self.users or self.keep_open:
+                return
+        self.close()
+
+    def close(self):
+        with self.lock:
+            grabber, cap = self.grabber, self.cap
+            self.grabber = self.cap = None
+            self.users = 0
+        if grabber is not None:
+            grabber.stop()
+            grabber.join(timeout=1)
+        if cap is not None:
+            cap.release()
@@ -0,0 +1,114 @@
+import os
+
+# Runtime settings shared by the screens; each can be overridden with an
+# AMS_* environment variable so kiosks can be tuned without code changes.
+
+
+def _env(name, default, cast=str):
+    value = os.environ.get("AMS_" + name)
+    return default if value is None else cast(value)
+
+
+# Gallery index: "exact" (brute-force matrix scan) or "ivf" (approximate,
+# for galleries with 100k+ identities)
+GALLERY_INDEX = _env("GALLERY_INDEX", "exact")
+# Galleries smaller than this always use exact search, even with "ivf"
+IVF_MIN_SIZE = _env("IVF_MIN_SIZE", 20000, int)
+# Number of inverted lists (0 = sqrt of gallery size)
+IVF_NLIST = _env("IVF_NLIST", 0, int)
+# Lists scanned per query: higher = better recall, slower
+IVF_NPROBE = _env("IVF_NPROBE", 8, int)
+
+# How often ams.py checks dataset/ for faces saved by user.py
+GALLERY_REFRESH_MS = _env("GALLERY_REFRESH_MS", 5000, int)
+
+# Camera preview redraw rate and recognition rate (0 = as fast as the CPU allows)
+PREVIEW_FPS = _env("PREVIEW_FPS", 30, float)
+RECOGNITION_FPS = _env("RECOGNITION_FPS", 0, float)
+
+# Face embedding backend: "facenet" (InceptionResnetV1, PyTorch) or
+# "tflite" (bundled embedder.tflite, lighter on RAM and startup)
+EMBEDDING_BACKEND = _env("EMBEDDING_BACKEND", "facenet")
+# Match threshold; 0 = the backend's default
+MATCH_THRESHOLD = _env("MATCH_THRESHOLD", 0, float)
+# CPU variant of the facenet model: "float", "int8" (dynamically quantized)
+# or "script" (frozen TorchScript); check a mode against float with
+# benchmarks/bench_cpu_modes.py. TORCH_THREADS > 0 fixes torch's intra-op
+# thread count (0 = torch's default, one per core).
+FACENET_MODE = _env("FACENET_MODE", "float")
+TORCH_THREADS = _env("TORCH_THREADS", 0, int)
+
+# Face tracking between frames: run MTCNN every N frames while faces are
+# tracked, and re-embed a tracked face every N frames or when its match
+# distance exceeds TRACK_CONFIDENCE x the match threshold
+DETECT_EVERY = _env("DETECT_EVERY", 3, int)
+REEMBED_EVERY = _env("REEMBED_EVERY", 15, int)
+TRACK_CONFIDENCE = _env("TRACK_CONFIDENCE", 0.75, float)
+TRACK_IOU = _env("TRACK_IOU", 0.3, float)
+TRACK_MAX_MISSES = _env("TRACK_MAX_MISSES", 3, int)
+
+# Detection runs on the frame downscaled to DETECT_WIDTH pixels (0 = full
+# resolution); faces are still aligned from the full frame. With DETECT_ROI
+# only the area around known faces is searched, at a scale that makes the
+# smallest of them about DETECT_FACE_SIZE pixels, and the whole frame every
+# DETECT_FULL_EVERY detections. MTCNN skips faces smaller than
+# MTCNN_MIN_FACE pixels (at detection scale) and shrinks its image pyramid
+# by MTCNN_FACTOR per level; larger values of either are faster.
+DETECT_WIDTH = _env("DETECT_WIDTH", 640, int)
+DETECT_ROI = _env("DETECT_ROI", 1, int)
+DETECT_ROI_MARGIN = _env("DETECT_ROI_MARGIN", 0.5, float)
+DETECT_FULL_EVERY = _env("DETECT_FULL_EVERY", 5, int)
+DETECT_FACE_SIZE = _env("DETECT_FACE_SIZE", 80, int)
+MTCNN_MIN_FACE = _env("MTCNN_MIN_FACE", 40, int)
+MTCNN_FACTOR = _env("MTCNN_FACTOR", 0.709, float)
+
+# Attendance write-behind: commit every N seconds or once N events are queued
+ATTENDANCE_FLUSH_S = _env("ATTENDANCE_FLUSH_S", 1.0, float)
+ATTENDANCE_BATCH = _env("ATTENDANCE_BATCH", 50, int)
+
+# Print a breakdown of start-up time (imports, model load, dataset
+# embedding, camera open) once the first frame is up and the models are ready
+STARTUP_REPORT = _env("STARTUP_REPORT", 1, int)
+
+# Headless recognition service (service.py): listen address, detection
+# threads, and how many faces from concurrent requests are embedded
+# together (waiting up to SERVICE_MAX_WAIT_MS for a batch to fill)
+SERVICE_HOST = _env("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = _env("SERVICE_PORT", 8765, int)
+SERVICE_DETECT_WORKERS = _env("SERVICE_DETECT_WORKERS", max(1, (os.cpu_count() or 2) // 2), int)
+SERVICE_MAX_BATCH = _env("SERVICE_MAX_BATCH", 32, int)
+SERVICE_MAX_WAIT_MS = _env("SERVICE_MAX_WAIT_MS", 2.0, float)
+
+# Video sources, comma separated: device indices, video files or stream
+# URLs, each optionally named ("lobby=rtsp://..."). The attendance screen
+# shows the first; multicam.py runs all of them on INFERENCE_WORKERS
+# shared recognition threads.
+CAMERA_SOURCES = _env("CAMERA_SOURCES", ["0"], lambda v: [s for s in v.split(",") if s.strip()])
+INFERENCE_WORKERS = _env("INFERENCE_WORKERS", 2, int)
+
+# Several captures per person ("Name, Position #2.jpg", ...) are matched as
+# "mean" (averaged template), "medoid" (most central capture) or "best"
+# (closest capture, best-of-k)
+TEMPLATE_MODE = _env("TEMPLATE_MODE", "mean")
+
+# Hands-free attendance: a tracked face is logged once one person holds
+# AUTO_MIN_VOTES of its last AUTO_WINDOW embeddings (a confidently matched
+# track is re-embedded every REEMBED_EVERY frames, so each vote is new
+# evidence rather than a repeated cached name); the same person is
+# not logged again within AUTO_COOLDOWN_S. AUTO_MODE is "toggle" (Time In,
+# then Time Out, ...), "in" or "out" (for entrance/exit cameras).
+AUTO_ATTENDANCE = _env("AUTO_ATTENDANCE", 0, int)
+AUTO_WINDOW = _env("AUTO_WINDOW", 4, int)
+AUTO_MIN_VOTES = _env("AUTO_MIN_VOTES", 2, int)
+AUTO_COOLDOWN_S = _env("AUTO_COOLDOWN_S", 300.0, float)
+AUTO_MODE = _env("AUTO_MODE", "toggle")
+
+# Per-stage latency metrics (capture, convert, detect, align, embed, match,
+# render, ...) over the last METRICS_WINDOW runs of each stage, served as
+# JSON on 127.0.0.1:METRICS_PORT/metrics (0 = no endpoint) and/or appended
+# to METRICS_LOG every METRICS_INTERVAL_S seconds; see metrics.py.
+METRICS = _env("METRICS", 0, int)
+METRICS_WINDOW = _env("METRICS_WINDOW", 1000, int)
+METRICS_PORT = _env("METRICS_PORT", 8766, int)
+METRICS_LOG = _env("METRICS_LOG", "")
+METRICS_INTERVAL_S = _env("METRICS_INTERVAL_S", 60.0, float)
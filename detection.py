@@ -0,0 +1,75 @@
+import cv2
+import numpy as np
+
+
+class AdaptiveDetector:
+    """Runs a face detector on a reduced copy of the frame.
+
+    Without known faces the whole frame is searched, downscaled to
+    ``width`` pixels wide (0 = full resolution). Once faces are found, the
+    following detections only search the region around them (their boxes
+    grown by ``margin`` of their size), scaled so the smallest face is
+    about ``face_size`` pixels across. Every ``full_every``-th detection,
+    and whenever the region comes up empty, the full frame is searched
+    again so newcomers are not missed. Boxes are returned in pixels of the
+    frame passed in, so faces can be aligned at full resolution.
+
+    ``detect(rgb)`` takes an RGB array and returns (boxes, probs) in its
+    pixels, or (None, None).
+    """
+
+    def __init__(self, detect, width=640, roi=True, margin=0.5, full_every=5, face_size=80):
+        self.detect = detect
+        self.width = width
+        self.roi = roi
+        self.margin = margin
+        self.full_every = max(1, full_every)
+        self.face_size = face_size
+        self.last = None
+        self.count = 0
+        self.stats = dict(full_searches=0, roi_searches=0, roi_misses=0)
+
+    def __call__(self, rgb):
+        h, w = rgb.shape[:2]
+        self.count += 1
+        if self.roi and self.last is not None and self.count % self.full_every:
+            region = self.region(w, h)
+            if region is not None:
+                boxes, probs = self.search(rgb, region, self.face_scale())
+                self.stats["roi_searches"] += 1
+                if boxes is not None:
+                    self.last = boxes
+                    return boxes, probs
+                self.stats["roi_misses"] += 1
+        scale = min(1.0, self.width / w) if self.width else 1.0
+        boxes, probs = self.search(rgb, (0, 0, w, h), scale)
+        self.stats["full_searches"] += 1
+        self.last = boxes
+        return boxes, probs
+
+    def region(self, w, h):
+        # Union of the last boxes, each grown by margin x its size
+        b = self.last
+        grow = np.maximum(b[:, 2] - b[:, 0], b[:, 3] - b[:, 1])[:, None] * self.margin
+        x1, y1 = np.floor(np.min(b[:, :2] - grow, axis=0)).astype(int)
+        x2, y2 = np.ceil(np.max(b[:, 2:] + grow, axis=0)).astype(int)
+        x1, y1, x2, y2 = max(0, x1), max(0, y1), min(w, x2), min(h, y2)
+        if x2 - x1 < 12 or y2 - y1 < 12:
+            return None
+        return x1, y1, x2, y2
+
+    def face_scale(self):
+        side = np.minimum(self.last[:, 2] - self.last[:, 0], self.last[:, 3] - self.last[:, 1]).min()
+        return float(np.clip(self.face_size / max(side, 1.0), 0.1, 1.0))
+
+    def search(self, rgb, region, scale):
+        x1, y1, x2, y2 = region
+        crop = rgb[y1:y2, x1:x2]
+        if scale < 1.0:
+            size = (max(1, round((x2 - x1) * scale)), max(1, round((y2 - y1) * scale)))
+            crop = cv2.resize(crop, size, interpolation=cv2.INTER_AREA)
+        boxes, probs = self.detect(np.ascontiguousarray(crop))
+        if boxes is None or not len(boxes):
+            return None, None
+        sx, sy = (x2 - x1) / crop.shape[1], (y2 - y1) / crop.shape[0]
+        return boxes * np.array([sx, sy, sx, sy]) + np.array([x1, y1, x1, y1]), probs
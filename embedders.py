@@ -0,0 +1,124 @@
+import os
+import numpy as np
+
+import config
+
+# Bundled MediaPipe image embedder (MobileNetV3, 224x224 RGB in [0, 1])
+TFLITE_MODEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedder.tflite")
+
+
+def faces_to_uint8(faces):
+    # MTCNN crops come out standardized as (x - 127.5) / 128, NCHW
+    if hasattr(faces, "detach"):
+        faces = faces.detach().cpu().numpy()
+    faces = np.asarray(faces, dtype=np.float32) * 128.0 + 127.5
+    return np.clip(faces, 0, 255).astype(np.uint8).transpose(0, 2, 3, 1)
+
+
+def load_detector(min_face_size=20, factor=0.709):
+    # MTCNN returning every face as an aligned 160x160 crop
+    from facenet_pytorch import MTCNN
+    return MTCNN(image_size=160, margin=0, keep_all=True, min_face_size=min_face_size, factor=factor)
+
+
+FACENET_MODES = ("float", "int8", "script")
+
+
+class FacenetEmbedder:
+    """InceptionResnetV1 trained on VGGFace2 (facenet-pytorch), 512-d.
+
+    ``mode`` picks the CPU variant: "float" (eager float32), "int8"
+    (dynamic int8 quantization of the linear layers) or "script" (traced,
+    frozen TorchScript with batch norm folded into the convolutions). All
+    of them run under inference mode. ``threads`` > 0 sets torch's
+    intra-op thread count, which applies to the whole process.
+    """
+
+    name = "facenet"
+    threshold = 0.9
+
+    def __init__(self, mode=config.FACENET_MODE, threads=config.TORCH_THREADS):
+        import torch
+        from facenet_pytorch import InceptionResnetV1
+        if mode not in FACENET_MODES:
+            raise ValueError(f"unknown facenet mode {mode!r}, expected one of {FACENET_MODES}")
+        if threads > 0:
+            torch.set_num_threads(threads)
+        model = InceptionResnetV1(pretrained='vggface2').eval()
+        if mode == "int8":
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif mode == "script":
+            with torch.no_grad():
+                model = torch.jit.freeze(torch.jit.trace(model, torch.zeros(1, 3, 160, 160)))
+        self.model = model
+        self.mode = mode
+        self.dim = 512
+
+    def embed(self, faces):
+        # faces: (n, 3, 160, 160) tensor from MTCNN
+        import torch
+        with torch.inference_mode():
+            return self.model(faces).numpy()
+
+
+class TFLiteEmbedder:
+    """The bundled embedder.tflite run through the TFLite interpreter.
+
+    Needs only ``tflite-runtime`` (or full TensorFlow) instead of the
+    InceptionResnetV1 weights. It is a general-purpose image embedder, not a
+    face model, so its distances live on a different scale: calibrate the
+    threshold with benchmarks/bench_backends.py.
+    """
+
+    name = "tflite"
+    threshold = 0.6
+
+    def __init__(self, model_path=TFLITE_MODEL, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            try:
+                from tensorflow.lite import Interpreter
+            except ImportError:
+                raise ImportError("the tflite backend needs tflite-runtime or tensorflow installed")
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        _, self.height, self.width, _ = self.input["shape"]
+        self.dim = int(np.prod(self.output["shape"][1:]))
+
+    def embed(self, faces):
+        import cv2
+        out = []
+        for face in faces_to_uint8(faces):
+            img = cv2.resize(face, (int(self.width), int(self.height)), interpolation=cv2.INTER_LINEAR)
+            x = img[None].astype(np.float32) / 255.0
+            if self.input["dtype"] != np.float32:
+                scale, zero = self.input["quantization"]
+                x = np.round(x / scale + zero).astype(self.input["dtype"])
+            self.interpreter.set_tensor(self.input["index"], x)
+            self.interpreter.invoke()
+            y = self.interpreter.get_tensor(self.output["index"]).astype(np.float32)
+            if self.output["dtype"] != np.float32:
+                scale, zero = self.output["quantization"]
+                y = (y - zero) * scale
+            out.append(y.reshape(-1))
+        return np.stack(out) if out else np.zeros((0, self.dim), dtype=np.float32)
+
+
+BACKENDS = {
+    FacenetEmbedder.name: FacenetEmbedder,
+    TFLiteEmbedder.name: TFLiteEmbedder,
+}
+
+
+def backend_class(name):
+    # Class attributes (name, threshold) are available without loading weights
+    if name not in BACKENDS:
+        raise ValueError(f"unknown embedding backend {name!r}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]
+
+
+def get_embedder(name):
+    return backend_class(name)()
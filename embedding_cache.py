@@ -0,0 +1,155 @@
+import os
+import json
+import uuid
+import hashlib
+import numpy as np
+
+# Image types picked up from the dataset folder (same set userlist.py shows)
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg')
+
+# Default location of the persistent embedding store
+CACHE_DIR = "cache"
+CACHE_VERSION = 2
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class EmbeddingCache:
+    """Embeddings of dataset images kept on disk between launches.
+
+    The store is one float32 matrix (``<backend>-<stamp>.npy``, memory-mapped
+    on load) plus a JSON index (``<backend>.json``) mapping each image file
+    to its mtime, size, content hash and matrix row. Files whose mtime/size are unchanged are
+    served from the matrix; touched or renamed files are matched by content
+    hash; everything else is embedded. Entries for files that are no longer
+    in the folder are dropped on the next sync. Each embedding backend has
+    its own store, so switching backends never mixes embeddings.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, backend="facenet"):
+        self.cache_dir = cache_dir
+        self.backend = backend
+        self.index_path = os.path.join(cache_dir, f"{backend}.json")
+        self.files = {}
+        self.matrix = None
+        self.matrix_name = None
+        self.stats = {}
+        self.load()
+
+    def load(self):
+        self.files, self.matrix, self.matrix_name = {}, None, None
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        if index.get("version") != CACHE_VERSION:
+            return
+        if index.get("backend") != self.backend:
+            # Never serve embeddings from another model
+            raise ValueError(f"{self.index_path} holds {index.get('backend')} embeddings, not {self.backend}")
+        try:
+            files = index["files"]
+            matrix_name = index.get("matrix")
+            matrix = None
+            if matrix_name:
+                matrix = np.load(os.path.join(self.cache_dir, matrix_name), mmap_mode='r')
+                rows = [e["row"] for e in files.values() if e["row"] is not None]
+                if rows and max(rows) >= len(matrix):
+                    return
+        except (OSError, ValueError, KeyError):
+            # Unreadable or half-written cache: start from scratch
+            return
+        self.files, self.matrix, self.matrix_name = files, matrix, matrix_name
+
+    def row(self, entry):
+        if entry is None or entry["row"] is None or self.matrix is None:
+            return None
+        return np.array(self.matrix[entry["row"]], dtype=np.float32)
+
+    def sync(self, folder, embed):
+        """Bring the cache in line with ``folder`` and return {stem: (1, D) embedding}.
+
+        ``embed(path)`` is called only for new or changed images and returns a
+        (1, D) array, or None when no face was found (which is cached too, so
+        such images are not retried every launch).
+        """
+        stats = dict(cached=0, rehashed=0, embedded=0, evicted=0)
+        # Content already embedded: entries of the previous cache (rows of
+        # self.matrix) and digests first seen in this sync (rows of ``rows``,
+        # None when faceless); the two kinds of row never mix
+        previous = {e["sha1"]: e for e in self.files.values()}
+        fresh = {}
+        files, rows, embeddings = {}, [], {}
+        names = sorted(os.listdir(folder)) if os.path.isdir(folder) else []
+        for fname in names:
+            if not fname.lower().endswith(IMAGE_EXTS):
+                continue
+            path = os.path.join(folder, fname)
+            st = os.stat(path)
+            old = self.files.get(fname)
+            if old is not None and old["mtime"] == st.st_mtime_ns and old["size"] == st.st_size:
+                digest = old["sha1"]
+                emb = self.row(old)
+                stats["cached"] += 1
+            else:
+                digest = file_digest(path)
+                if digest in fresh:
+                    row = fresh[digest]
+                    emb = None if row is None else rows[row][None].copy()
+                    stats["rehashed"] += 1
+                elif digest in previous:
+                    emb = self.row(previous[digest])
+                    stats["rehashed"] += 1
+                else:
+                    emb = embed(path)
+                    stats["embedded"] += 1
+            if emb is not None:
+                emb = np.asarray(emb, dtype=np.float32).reshape(1, -1)
+                files[fname] = dict(mtime=st.st_mtime_ns, size=st.st_size, sha1=digest, row=len(rows))
+                rows.append(emb[0])
+                embeddings[os.path.splitext(fname)[0]] = emb
+            else:
+                files[fname] = dict(mtime=st.st_mtime_ns, size=st.st_size, sha1=digest, row=None)
+            fresh.setdefault(digest, files[fname]["row"])
+        stats["evicted"] = len(set(self.files) - set(files))
+
+        changed = (stats["rehashed"] or stats["embedded"] or stats["evicted"]
+                   or len(files) != len(self.files))
+        if changed:
+            self.save(files, np.stack(rows) if rows else None)
+        self.stats = stats
+        return embeddings
+
+    def save(self, files, matrix):
+        # Write the new matrix under a fresh name, then swap the index in
+        # atomically; a crash at any point leaves the previous pair intact.
+        os.makedirs(self.cache_dir, exist_ok=True)
+        matrix_name = None
+        if matrix is not None:
+            matrix_name = f"{self.backend}-{uuid.uuid4().hex[:12]}.npy"
+            np.save(os.path.join(self.cache_dir, matrix_name), matrix.astype(np.float32))
+        tmp = self.index_path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(dict(version=CACHE_VERSION, backend=self.backend, matrix=matrix_name, files=files), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.index_path)
+
+        old_name = self.matrix_name
+        # Drop the mmap before unlinking (required on Windows)
+        self.matrix = None
+        if old_name and old_name != matrix_name:
+            try:
+                os.remove(os.path.join(self.cache_dir, old_name))
+            except OSError:
+                pass
+        self.load()
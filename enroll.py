@@ -0,0 +1,232 @@
+"""Bulk enrollment: add a folder or zip of photos to the dataset in one go.
+
+    python enroll.py PHOTOS_DIR_OR_ZIP [--workers N] [--largest] [--replace] [--report report.csv]
+    python enroll.py --reembed [--workers N]
+
+Each photo is named like the ones user.py saves ("Name, Position.jpg"),
+or several photos of one person sit in a folder named after them
+("Name, Position/*.jpg") and are enrolled as that person's captures.
+Photos are detected and embedded on a pool of processes, a few dozen per
+model call, and only those with exactly one face (or, with --largest, at
+least one) are copied into dataset/. The embedding cache the attendance
+screen loads is then written atomically, so the next launch starts with
+every new person already embedded. --reembed rebuilds the cache for the
+whole dataset (e.g. after switching AMS_EMBEDDING_BACKEND).
+"""
+import os
+import io
+import csv
+import sys
+import time
+import shutil
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import config
+from embedding_cache import EmbeddingCache, IMAGE_EXTS
+from embedders import get_embedder, load_detector
+
+DATASET_DIR = "dataset"
+
+# Per worker process, set by init_worker
+_detector = None
+_embedder = None
+
+
+def init_worker(backend, threads):
+    global _detector, _embedder
+    import torch
+    # Same detector settings as the live app, so enrollment accepts and
+    # counts the faces the attendance screen will actually see
+    _detector = load_detector(config.MTCNN_MIN_FACE, config.MTCNN_FACTOR)
+    _embedder = get_embedder(backend)
+    # Workers split the cores between them instead of each using all of
+    # them (set after the embedder, which may apply AMS_TORCH_THREADS)
+    torch.set_num_threads(threads)
+
+
+def read_image(source):
+    from PIL import Image
+    if isinstance(source, tuple):
+        archive, member = source
+        with zipfile.ZipFile(archive) as z:
+            return Image.open(io.BytesIO(z.read(member))).convert("RGB")
+    return Image.open(source).convert("RGB")
+
+
+def embed_chunk(items):
+    """Worker: [(key, source, allow_multiple)] -> [(key, status, faces_found, embedding or None)].
+
+    Detection runs per photo (sizes differ); the aligned crops of the whole
+    chunk then go through the embedder in one call. Photos with several
+    faces are refused unless ``allow_multiple``, in which case the largest
+    face is used.
+    """
+    import torch
+    out, crops = [], []
+    for key, source, allow_multiple in items:
+        try:
+            pil = read_image(source)
+        except (OSError, ValueError) as e:
+            out.append([key, f"unreadable: {e}", 0, None])
+            continue
+        boxes, _ = _detector.detect(pil)
+        found = 0 if boxes is None else len(boxes)
+        if found == 0:
+            out.append([key, "no face", 0, None])
+            continue
+        if found > 1 and not allow_multiple:
+            out.append([key, "multiple faces", found, None])
+            continue
+        largest = int(np.argmax((boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])))
+        crops.append((len(out), _detector.extract(pil, boxes[largest:largest + 1], None)))
+        out.append([key, "ok", found, None])
+    if crops:
+        embs = _embedder.embed(torch.cat([c for _, c in crops]))
+        for (i, _), emb in zip(crops, embs):
+            out[i][3] = np.asarray(emb, dtype=np.float32).reshape(1, -1)
+    return [tuple(r) for r in out]
+
+
+def capture_names(members):
+    # Loose photos keep their names; photos in a per-person folder
+    # ("Name, Position/*.jpg") become that person's captures #1, #2, ...
+    counts = {}
+    for folder, fname, source in members:
+        if not folder:
+            yield fname, source
+            continue
+        counts[folder] = counts.get(folder, 0) + 1
+        yield f"{folder} #{counts[folder]}{os.path.splitext(fname)[1].lower()}", source
+
+
+def list_photos(path):
+    # [(dataset file name, source)] from a folder (recursively) or a zip archive
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as z:
+            members = [(os.path.basename(os.path.dirname(m)), os.path.basename(m), (path, m))
+                       for m in sorted(z.namelist()) if m.lower().endswith(IMAGE_EXTS)]
+        return list(capture_names(members))
+    members = []
+    for root, _, files in sorted(os.walk(path)):
+        folder = "" if os.path.samefile(root, path) else os.path.basename(root)
+        for fname in sorted(files):
+            if fname.lower().endswith(IMAGE_EXTS):
+                members.append((folder, fname, os.path.join(root, fname)))
+    return list(capture_names(members))
+
+
+def stale_dataset_files(cache, folder):
+    # Dataset images the cache would otherwise have to embed itself
+    stale = []
+    for fname in sorted(os.listdir(folder)) if os.path.isdir(folder) else []:
+        if not fname.lower().endswith(IMAGE_EXTS):
+            continue
+        st = os.stat(os.path.join(folder, fname))
+        entry = cache.files.get(fname)
+        if entry is None or entry["mtime"] != st.st_mtime_ns or entry["size"] != st.st_size:
+            stale.append((fname, os.path.join(folder, fname)))
+    return stale
+
+
+def embed_all(items, workers, chunk_size, backend):
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    results = []
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(backend, threads)) as pool:
+        for chunk in pool.map(embed_chunk, chunks):
+            results.extend(chunk)
+            print(f"\r{len(results)}/{len(items)} photos", end="", file=sys.stderr, flush=True)
+    if items:
+        print(file=sys.stderr)
+    return results
+
+
+def copy_into(source, dest):
+    # Copy through a temporary name so the dataset never holds half a file
+    tmp = dest + ".part"
+    if isinstance(source, tuple):
+        archive, member = source
+        with zipfile.ZipFile(archive) as z, z.open(member) as src, open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+    else:
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, dest)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Enroll a folder or zip of photos into the face dataset")
+    ap.add_argument("photos", nargs="?", help="folder or .zip of 'Name, Position.jpg' photos")
+    ap.add_argument("--reembed", action="store_true", help="re-embed the whole dataset")
+    ap.add_argument("--dataset", default=DATASET_DIR)
+    ap.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    ap.add_argument("--chunk", type=int, default=32, help="photos per task (and per embedder call)")
+    ap.add_argument("--largest", action="store_true", help="enroll the largest face of group photos")
+    ap.add_argument("--replace", action="store_true", help="overwrite people already in the dataset")
+    ap.add_argument("--report", help="write a CSV of every photo's outcome")
+    args = ap.parse_args()
+    if not args.photos and not args.reembed:
+        ap.error("give a folder or zip of photos, or --reembed")
+
+    backend = config.EMBEDDING_BACKEND
+    cache = EmbeddingCache(backend=backend)
+    if args.reembed:
+        cache.files = {}
+    enrolled = {os.path.splitext(f)[0] for f in os.listdir(args.dataset)} if os.path.isdir(args.dataset) else set()
+
+    photos, skipped = [], []
+    for fname, source in list_photos(args.photos) if args.photos else []:
+        if os.path.splitext(fname)[0] in enrolled and not args.replace:
+            skipped.append((fname, "already enrolled", 0))
+        else:
+            photos.append((fname, source))
+    incoming = {os.path.splitext(fname)[0] for fname, _ in photos}
+    stale = [s for s in stale_dataset_files(cache, args.dataset) if os.path.splitext(s[0])[0] not in incoming]
+
+    started = time.perf_counter()
+    # Files already in the dataset are embedded like recognition.embed_image
+    # does (largest face), not refused as group photos
+    items = [(f, s, args.largest) for f, s in photos] + [(f, s, True) for f, s in stale]
+    results = embed_all(items, args.workers, args.chunk, backend)
+    took = time.perf_counter() - started
+    by_key = {key: (status, found, emb) for key, status, found, emb in results}
+
+    os.makedirs(args.dataset, exist_ok=True)
+    sources = dict(photos)
+    added = 0
+    for fname, source in photos:
+        if by_key[fname][0] != "ok":
+            continue
+        stem = os.path.splitext(fname)[0]
+        copy_into(source, os.path.join(args.dataset, fname))
+        # A replaced person may have been saved under another extension
+        for old in os.listdir(args.dataset):
+            if old != fname and os.path.splitext(old)[0] == stem and old.lower().endswith(IMAGE_EXTS):
+                os.remove(os.path.join(args.dataset, old))
+        added += 1
+    # Every image the sync needs to embed was embedded above; the cache
+    # index and matrix are swapped in atomically
+    embeddings = cache.sync(args.dataset, lambda path: by_key.get(os.path.basename(path), (None, 0, None))[2])
+
+    problems = [(k, s, n) for k, (s, n, _) in by_key.items() if s != "ok" and k in sources] + skipped
+    for fname, status, found in problems:
+        print(f"  {fname}: {status}" + (f" ({found})" if found > 1 else ""))
+    broken = sorted((k, s) for k, (s, _, _) in by_key.items() if s != "ok" and k not in sources)
+    for fname, status in broken:
+        print(f"  {os.path.join(args.dataset, fname)}: {status}; this capture will not be matched")
+    if args.report:
+        with open(args.report, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["File", "Status", "Faces"])
+            w.writerows((k, s, n) for k, (s, n, _) in sorted(by_key.items()))
+            w.writerows(skipped)
+    rate = len(results) / took if took else 0.0
+    print(f"{added} enrolled, {len(problems)} skipped, {len(broken)} dataset files unusable; {len(results)} photos embedded in {took:.1f}s "
+          f"({rate:.1f}/s on {args.workers} workers); gallery now has {len(embeddings)} people")
+
+
+if __name__ == "__main__":
+    main()
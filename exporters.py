@@ -0,0 +1,155 @@
+import os
+import csv
+import datetime
+import threading
+
+from attendance_store import COLUMNS
+from attendance_summary import DAILY_COLUMNS, MONTHLY_COLUMNS
+
+# Excel sheets hold at most 1,048,576 rows including the header
+EXCEL_MAX_ROWS = 1048575
+# Columns written to Excel as real datetimes rather than text
+DATETIME_COLUMNS = ("Timestamp",)
+
+
+class Cancelled(Exception):
+    pass
+
+
+def write_csv(path, columns, chunks, on_rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for rows in chunks:
+            writer.writerows(rows)
+            on_rows(len(rows))
+
+
+def write_excel(path, columns, chunks, on_rows):
+    # Write-only workbook: rows are serialized as they are appended, so
+    # memory stays flat however long the export is
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    dt_cols = [i for i, c in enumerate(columns) if c in DATETIME_COLUMNS]
+    ws, n = None, EXCEL_MAX_ROWS
+    for rows in chunks:
+        for row in rows:
+            if n == EXCEL_MAX_ROWS:
+                ws = wb.create_sheet(f"Attendance {len(wb.worksheets) + 1}")
+                ws.append(columns)
+                n = 0
+            row = list(row)
+            for i in dt_cols:
+                try:
+                    row[i] = datetime.datetime.fromisoformat(row[i])
+                except (TypeError, ValueError):
+                    # Malformed or legacy timestamp: keep the text as stored
+                    pass
+            ws.append(row)
+            n += 1
+        on_rows(len(rows))
+    if ws is None:
+        wb.create_sheet("Attendance 1").append(columns)
+    wb.save(path)
+
+
+def write_pdf(path, columns, chunks, on_rows):
+    from fpdf import FPDF
+
+    class AttendancePDF(FPDF):
+        # Column headings repeated at the top of every page
+        def header(self):
+            self.set_font("Arial", "B", 12)
+            col_w = self.w / len(columns)
+            for col in columns:
+                self.cell(col_w, 10, col, 1)
+            self.ln()
+            self.set_font("Arial", size=12)
+
+    pdf = AttendancePDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    col_w = pdf.w / len(columns)
+    for rows in chunks:
+        for row in rows:
+            for value in row:
+                pdf.cell(col_w, 10, str(value), 1)
+            pdf.ln()
+        on_rows(len(rows))
+    pdf.output(path)
+
+
+WRITERS = {"csv": write_csv, "xlsx": write_excel, "pdf": write_pdf}
+
+
+def summary_chunks(summaries, table, chunk_size, **filters):
+    fetch = summaries.daily if table == "daily" else summaries.monthly
+    offset = 0
+    while True:
+        rows = fetch(limit=chunk_size, offset=offset, **filters)
+        if not rows:
+            break
+        yield rows
+        offset += len(rows)
+
+
+class ExportJob(threading.Thread):
+    """Exports rows on a background thread.
+
+    ``source(chunk_size)`` yields the rows in chunks, which are handed to
+    the format writer; ``done``/``total`` report progress and ``cancel()``
+    stops at the next chunk and removes the partial file. ``error`` is set
+    if the export failed.
+    """
+
+    def __init__(self, fmt, path, columns, source, total, chunk_size=5000):
+        super().__init__(daemon=True)
+        self.write = WRITERS[fmt]
+        self.path = path
+        self.columns = columns
+        self.source = source
+        self.chunk_size = chunk_size
+        self.total = total
+        self.done = 0
+        self.error = None
+        self.cancelled = threading.Event()
+
+    @classmethod
+    def for_records(cls, store, fmt, path, **filters):
+        # Raw attendance records matching the admin filter, streamed from the store
+        return cls(fmt, path, COLUMNS, lambda n: store.iter_rows(chunk_size=n, **filters),
+                   store.count(**filters))
+
+    @classmethod
+    def for_summary(cls, summaries, table, fmt, path, **filters):
+        # "daily" or "monthly" summary rows
+        columns = DAILY_COLUMNS if table == "daily" else MONTHLY_COLUMNS
+        return cls(fmt, path, columns, lambda n: summary_chunks(summaries, table, n, **filters),
+                   summaries.count(table, **filters))
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else 1.0
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def chunks(self):
+        for rows in self.source(self.chunk_size):
+            if self.cancelled.is_set():
+                raise Cancelled()
+            yield rows
+
+    def on_rows(self, n):
+        self.done += n
+
+    def run(self):
+        try:
+            self.write(self.path, self.columns, self.chunks(), self.on_rows)
+        except Exception as e:
+            if not isinstance(e, Cancelled):
+                self.error = e
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
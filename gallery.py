@@ -0,0 +1,158 @@
+import re
+import numpy as np
+
+# Extra captures of one person are saved as "Name, Position #2.jpg", ...
+CAPTURE_SUFFIX = re.compile(r"\s+#\d+$")
+TEMPLATE_MODES = ("mean", "medoid", "best")
+
+
+def as_embeddings(x):
+    # Accept torch tensors or arrays of shape (D,) or (n, D); return float32 (n, D)
+    if hasattr(x, "detach"):
+        x = x.detach().cpu().numpy()
+    x = np.asarray(x, dtype=np.float32)
+    return x.reshape(1, -1) if x.ndim == 1 else x.reshape(len(x), -1)
+
+
+def l2_normalize(x):
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+def person_id(name):
+    # The identity a capture (or template) belongs to: its name without " #N"
+    return CAPTURE_SUFFIX.sub("", name)
+
+
+def aggregate(embeddings, mode="mean"):
+    """Turn {capture name: embedding} into gallery rows.
+
+    "mean" and "medoid" give one template per person (the re-normalized
+    mean of their captures, or the capture closest to all the others);
+    "best" keeps every capture as its own row, so the nearest row decides
+    (best-of-k) in the same single matrix lookup. Either way a match
+    resolves to a person through ``person_id``.
+    """
+    if mode not in TEMPLATE_MODES:
+        raise ValueError(f"unknown template mode {mode!r}, expected one of {TEMPLATE_MODES}")
+    if mode == "best":
+        return dict(embeddings)
+    groups = {}
+    for name in sorted(embeddings):
+        groups.setdefault(person_id(name), []).append(as_embeddings(embeddings[name])[0])
+    templates = {}
+    for person, rows in groups.items():
+        x = l2_normalize(np.stack(rows))
+        if len(x) > 1 and mode == "mean":
+            x = l2_normalize(x.mean(axis=0, keepdims=True))
+        elif len(x) > 1:
+            x = x[[(x @ x.T).sum(axis=1).argmax()]]
+        templates[person] = x
+    return templates
+
+
+class Gallery:
+    """Enrolled embeddings held as one contiguous, L2-normalized float32 matrix.
+
+    Distances are Euclidean between unit vectors, computed for the whole
+    gallery with a single matrix product (|a - b|^2 = 2 - 2 a.b), so the
+    0.9 threshold used by ``recognize_face`` keeps its meaning. ``backend``
+    names the embedding model; embeddings from another backend are refused.
+    """
+
+    def __init__(self, names=(), embeddings=None, dim=None, backend=None):
+        self.names = list(names)
+        self.backend = backend
+        if embeddings is None:
+            self._matrix = np.zeros((0, dim or 0), dtype=np.float32)
+        else:
+            self._matrix = l2_normalize(as_embeddings(embeddings))
+        self._size = len(self.names)
+        if len(self._matrix) != self._size:
+            raise ValueError("names and embeddings differ in length")
+        # name -> row, so membership, add and remove are O(1)
+        self.rows = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_dict(cls, embeddings, backend=None):
+        if not embeddings:
+            return cls(backend=backend)
+        names = list(embeddings)
+        return cls(names, np.concatenate([as_embeddings(embeddings[n]) for n in names]), backend=backend)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, name):
+        return name in self.rows
+
+    @property
+    def dim(self):
+        return self._matrix.shape[1]
+
+    @property
+    def matrix(self):
+        return self._matrix[:self._size]
+
+    def check_backend(self, backend):
+        if backend is not None and self.backend is not None and backend != self.backend:
+            raise ValueError(f"cannot mix {backend} embeddings into a {self.backend} gallery")
+
+    def add(self, name, emb, backend=None):
+        self.check_backend(backend)
+        emb = l2_normalize(as_embeddings(emb))
+        if self._size and emb.shape[1] != self.dim:
+            raise ValueError(f"embedding has dim {emb.shape[1]}, gallery has {self.dim}")
+        if name in self.rows:
+            self._matrix[self.rows[name]] = emb[0]
+            return
+        if self._size == len(self._matrix) or self._matrix.shape[1] != emb.shape[1]:
+            # Grow geometrically so repeated enrolment stays amortised O(1)
+            grown = np.zeros((max(16, 2 * self._size), emb.shape[1]), dtype=np.float32)
+            if self._size:
+                grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size] = emb[0]
+        self.names.append(name)
+        self.rows[name] = self._size
+        self._size += 1
+
+    def remove(self, name):
+        i = self.rows.pop(name)
+        last = self._size - 1
+        # Swap with the last row to keep the matrix contiguous
+        if i != last:
+            self._matrix[i] = self._matrix[last]
+            self.names[i] = self.names[last]
+            self.rows[self.names[i]] = i
+        self.names.pop()
+        self._size = last
+
+    def distances(self, probes):
+        probes = l2_normalize(as_embeddings(probes))
+        sims = probes @ self.matrix.T
+        return np.sqrt(np.maximum(2.0 - 2.0 * sims, 0.0))
+
+    def match_batch(self, probes, threshold=0.9):
+        probes = as_embeddings(probes)
+        if not self._size:
+            return [(None, float('inf'))] * len(probes)
+        d = self.distances(probes)
+        best = d.argmin(axis=1)
+        out = []
+        for i, j in enumerate(best):
+            dist = float(d[i, j])
+            out.append((self.names[j], dist) if dist < threshold else (None, dist))
+        return out
+
+    def match(self, probe, threshold=0.9):
+        return self.match_batch(probe, threshold)[0]
+
+    def topk(self, probe, k=5):
+        if not self._size:
+            return []
+        d = self.distances(probe)[0]
+        k = min(k, self._size)
+        idx = np.argpartition(d, k - 1)[:k]
+        idx = idx[np.argsort(d[idx])]
+        return [(self.names[j], float(d[j])) for j in idx]
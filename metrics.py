@@ -0,0 +1,152 @@
+"""Per-stage latency metrics for the recognition loop.
+
+Code times a stage with ``with metrics.stage("detect"): ...``; each stage
+keeps its last AMS_METRICS_WINDOW durations, from which the rate (fps),
+p50/p95/p99 and a coarse histogram are computed on demand. Off unless
+AMS_METRICS=1, in which case stage() is a shared no-op. ``metrics.start()``
+exports the numbers as JSON on http://127.0.0.1:AMS_METRICS_PORT/metrics
+and/or appends them to AMS_METRICS_LOG every AMS_METRICS_INTERVAL_S
+seconds.
+"""
+import json
+import time
+import datetime
+import threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import config
+
+# Histogram bucket upper edges in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_OFF = nullcontext()
+
+
+class RollingHistogram:
+    # The last ``size`` durations of one stage, with the time each ended
+    def __init__(self, size=1000):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def add(self, seconds, now):
+        with self.lock:
+            self.samples.append((now, seconds))
+            self.count += 1
+
+    def summary(self, now, rate_window=5.0):
+        with self.lock:
+            data = np.array(self.samples, dtype=np.float64).reshape(-1, 2)
+            count = self.count
+        if not len(data):
+            return {"count": count}
+        ends, ms = data[:, 0], data[:, 1] * 1e3
+        recent = ends[ends >= now - rate_window]
+        fps = (len(recent) - 1) / max(recent[-1] - recent[0], 1e-6) if len(recent) >= 2 else 0.0
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        counts = np.histogram(ms, bins=(0,) + BUCKETS_MS + (np.inf,))[0]
+        labels = [f"<{b}" for b in BUCKETS_MS] + [f">={BUCKETS_MS[-1]}"]
+        return {"count": count, "fps": round(fps, 2), "mean_ms": round(float(ms.mean()), 3),
+                "p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3),
+                "p99_ms": round(float(p99), 3), "max_ms": round(float(ms.max()), 3),
+                "histogram_ms": dict(zip(labels, counts.tolist()))}
+
+
+class Metrics:
+    def __init__(self, enabled=False, size=1000):
+        self.enabled = enabled
+        self.size = size
+        self.started = time.monotonic()
+        self.stages = {}
+        self.lock = threading.Lock()
+        self.exporting = False
+        self.server = None
+        self.logger = None
+
+    def stage(self, name):
+        if not self.enabled:
+            return _OFF
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - begin)
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        hist = self.stages.get(name)
+        if hist is None:
+            with self.lock:
+                hist = self.stages.setdefault(name, RollingHistogram(self.size))
+        hist.add(seconds, time.monotonic())
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            stages = dict(self.stages)
+        return {"time": datetime.datetime.now().isoformat(timespec="seconds"),
+                "uptime_s": round(now - self.started, 1),
+                "stages": {name: hist.summary(now) for name, hist in sorted(stages.items())}}
+
+    def start(self, port=None, log_path=None, interval=None):
+        # Idempotent; does nothing while metrics are off
+        port = config.METRICS_PORT if port is None else port
+        log_path = config.METRICS_LOG if log_path is None else log_path
+        interval = config.METRICS_INTERVAL_S if interval is None else interval
+        with self.lock:
+            if not self.enabled or self.exporting:
+                return
+            self.exporting = True
+        if log_path and self.logger is None:
+            self.logger = threading.Thread(target=self.log_every, args=(log_path, interval),
+                                           name="metrics-log", daemon=True)
+            self.logger.start()
+        if port and self.server is None:
+            try:
+                self.server = self.serve(port)
+            except OSError as e:
+                # Port taken (say by multicam.py or another kiosk): keep
+                # running without the endpoint; a later start() tries again
+                print(f"metrics: cannot serve on port {port}: {e}", flush=True)
+                with self.lock:
+                    self.exporting = False
+
+    def serve(self, port, host="127.0.0.1"):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = json.dumps(metrics.snapshot()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+    def log_every(self, path, interval):
+        while True:
+            time.sleep(interval)
+            with open(path, "a") as f:
+                f.write(json.dumps(self.snapshot()) + "\n")
+
+
+metrics = Metrics(enabled=bool(config.METRICS), size=config.METRICS_WINDOW)
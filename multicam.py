@@ -0,0 +1,130 @@
+"""Face recognition on several cameras in one process.
+
+    python multicam.py [--workers 2] [--loop] [--auto] [SOURCE ...]
+
+SOURCE is a device index, a video file or a stream URL, optionally named
+("lobby=rtsp://..."); without any, AMS_CAMERA_SOURCES is used. Every
+camera gets its own grabber thread and tracker; recognition runs on a
+shared pool of workers (see pipeline.InferencePool). With --auto every
+camera logs attendance hands-free, tagged with its name.
+"""
+import os
+import time
+import argparse
+
+import cv2
+
+import config
+import recognition
+from camera import parse_source, open_capture
+from pipeline import FrameGrabber, InferencePool
+from metrics import metrics
+
+
+def rewind(cap):
+    # End of a recorded video: start it again
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    return True
+
+
+class MultiCamera:
+    """N video sources feeding one InferencePool.
+
+    Recorded videos are read at their own frame rate when ``realtime`` is
+    set (as a live camera would deliver them), otherwise as fast as they
+    decode; with ``loop`` they restart at the end. ``on_result(name, faces)``
+    is called on the worker thread for every analysed frame. With ``auto``
+    each camera records attendance through its own AutoAttendance.
+    """
+
+    def __init__(self, specs, workers=config.INFERENCE_WORKERS, realtime=True, loop=False, on_result=None,
+                 auto=False):
+        self.pool = InferencePool(workers)
+        self.grabbers = {}
+        for spec in specs:
+            name, uri = parse_source(spec)
+            cap = open_capture(uri)
+            recorded = isinstance(uri, str) and os.path.isfile(uri)
+            fps = cap.get(cv2.CAP_PROP_FPS) if recorded and realtime else 0
+            on_eof = (rewind if loop else (lambda cap: False)) if recorded else None
+            frames = self.pool.slot()
+            self.grabbers[name] = FrameGrabber(cap, frames=frames, max_fps=fps, on_eof=on_eof)
+            analyze = recognition.FaceAnalyzer()
+            if auto:
+                analyze = self.logging(name, analyze)
+            self.pool.add(name, frames, analyze, on_result)
+
+    @staticmethod
+    def logging(name, analyzer):
+        # The pool never runs one source on two workers, so each camera's
+        # AutoAttendance is only touched by one thread at a time
+        auto = recognition.auto_attendance()
+
+        def analyze(frame):
+            faces = analyzer(frame)
+            for person, typ in auto.observe(faces):
+                recognition.mark_attendance(person, typ, name)
+            return faces
+        return analyze
+
+    def start(self):
+        recognition.start_loading()
+        self.pool.start()
+        for grabber in self.grabbers.values():
+            grabber.start()
+
+    def stop(self):
+        for grabber in self.grabbers.values():
+            grabber.stop()
+        self.pool.stop()
+        for grabber in self.grabbers.values():
+            grabber.join(timeout=1)
+            grabber.cap.release()
+
+    @property
+    def finished(self):
+        # Every source has ended (only recorded videos without loop do)
+        return all(g.finished.is_set() for g in self.grabbers.values())
+
+    def stats(self):
+        out = []
+        for source in self.pool.sources:
+            grabber = self.grabbers[source.name]
+            out.append({"source": source.name,
+                        "camera_fps": grabber.meter.fps,
+                        "analysed_fps": source.meter.fps,
+                        "grabbed": grabber.frames.seq,
+                        "analysed": source.analysed,
+                        "dropped": source.dropped})
+        return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Face recognition on several cameras")
+    ap.add_argument("sources", nargs="*", default=config.CAMERA_SOURCES)
+    ap.add_argument("--workers", type=int, default=config.INFERENCE_WORKERS)
+    ap.add_argument("--loop", action="store_true", help="restart recorded videos at the end")
+    ap.add_argument("--auto", action="store_true", default=bool(config.AUTO_ATTENDANCE),
+                    help="log attendance hands-free")
+    args = ap.parse_args()
+
+    cams = MultiCamera(args.sources, args.workers, loop=args.loop, auto=args.auto)
+    cams.start()
+    metrics.start()
+    try:
+        while not cams.finished:
+            time.sleep(2)
+            for s, source in zip(cams.stats(), cams.pool.sources):
+                _, faces = source.results.get()
+                names = ", ".join(f.name.split(",")[0] for f in faces or [] if f.name) or "-"
+                print(f"{s['source']:>12}: camera {s['camera_fps']:5.1f} fps  analysed {s['analysed_fps']:5.1f} fps  "
+                      f"dropped {s['dropped']:6d}  {names}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cams.stop()
+        recognition.writer.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class PagedTreeview(tk.Frame):
+    """Treeview that only materializes the rows currently on screen.
+
+    Rows come from ``fetch(offset, limit, order_by, descending)`` and the
+    total from ``count()``, so a log of any size costs one page query to
+    show. The scrollbar is driven by hand against the total row count;
+    clicking a heading re-sorts through ``fetch`` rather than in Tk.
+    """
+
+    def __init__(self, parent, columns, fetch, count, rows=20, block=200, **kw):
+        super().__init__(parent, **kw)
+        self.columns = columns
+        self.fetch = fetch
+        self.count = count
+        self.rows = rows
+        self.block = block
+        self.order_by = columns[1] if len(columns) > 1 else columns[0]
+        self.descending = False
+        self.offset = 0
+        self.total = 0
+        self.cache_start, self.cache = 0, []
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=rows)
+        for col in columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort(c))
+            self.tree.column(col, width=200, anchor=tk.CENTER)
+        self.scroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(1, "units"))
+
+    def refresh(self, fetch=None, count=None):
+        # New data source or filter: recount and jump back to the top
+        if fetch is not None:
+            self.fetch, self.count = fetch, count
+        self.total = self.count()
+        self.offset = 0
+        self.cache = []
+        self.render()
+
+    def sort(self, col):
+        self.descending = not self.descending if col == self.order_by else False
+        self.order_by = col
+        for c in self.columns:
+            arrow = (" ▼" if self.descending else " ▲") if c == col else ""
+            self.tree.heading(c, text=c + arrow)
+        self.cache = []
+        self.offset = 0
+        self.render()
+
+    def on_scroll(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            self.scroll_by(int(args[1]), args[2])
+
+    def scroll_by(self, n, what):
+        self.scroll_to(self.offset + n * (self.rows if what == "pages" else 3))
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.total - self.rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def window(self):
+        # Serve the visible rows from a cached block around them, fetching a
+        # new block only when scrolling leaves it
+        end = self.offset + self.rows
+        if not (self.cache_start <= self.offset and end <= self.cache_start + len(self.cache)) \
+                or not self.cache:
+            self.cache_start = max(0, self.offset - self.block // 2)
+            self.cache = self.fetch(self.cache_start, self.block, self.order_by, self.descending)
+        i = self.offset - self.cache_start
+        return self.cache[i:i + self.rows]
+
+    def render(self):
+        self.tree.delete(*self.tree.get_children())
+        for row in self.window():
+            self.tree.insert("", tk.END, values=row)
+        if self.total:
+            self.scroll.set(self.offset / self.total, min(1.0, (self.offset + self.rows) / self.total))
+        else:
+            self.scroll.set(0, 1)
@@ -0,0 +1,229 @@
+import time
+import threading
+from collections import deque
+
+from metrics import metrics
+
+
+class RateMeter:
+    # Events per second over a sliding window of the last few seconds
+    def __init__(self, window=2.0):
+        self.window = window
+        self.times = deque()
+        self.lock = threading.Lock()
+
+    def tick(self):
+        now = time.monotonic()
+        with self.lock:
+            self.times.append(now)
+            while self.times and now - self.times[0] > self.window:
+                self.times.popleft()
+
+    @property
+    def fps(self):
+        now = time.monotonic()
+        with self.lock:
+            while self.times and now - self.times[0] > self.window:
+                self.times.popleft()
+            if len(self.times) < 2:
+                return 0.0
+            return (len(self.times) - 1) / max(self.times[-1] - self.times[0], 1e-6)
+
+
+class LatestSlot:
+    # Single-item mailbox: writers overwrite, readers always see the newest value.
+    # Several slots can share one condition so a consumer can wait on all of them.
+    def __init__(self, cond=None):
+        self.cond = cond if cond is not None else threading.Condition()
+        self.lock = self.cond
+        self.value = None
+        self.seq = 0
+
+    def put(self, value):
+        with self.cond:
+            self.value = value
+            self.seq += 1
+            self.cond.notify_all()
+
+    def get(self):
+        with self.lock:
+            return self.seq, self.value
+
+    def wait_newer(self, seq, timeout=None):
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq != seq, timeout)
+            return self.seq, self.value
+
+
+class FrameGrabber(threading.Thread):
+    """Reads a capture device as fast as it delivers, keeping only the latest frame.
+
+    For recorded video, ``max_fps`` paces reading to the recording's frame
+    rate and ``on_eof(cap)`` decides what happens at the end: return True
+    to keep reading (after rewinding, say) or False to stop; ``finished``
+    is set once the grabber stops on its own.
+    """
+
+    def __init__(self, cap, transform=None, frames=None, max_fps=0, on_eof=None):
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.transform = transform
+        self.frames = frames if frames is not None else LatestSlot()
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.on_eof = on_eof
+        self.meter = RateMeter()
+        self.running = threading.Event()
+        self.running.set()
+        self.finished = threading.Event()
+
+    def run(self):
+        next_due = time.monotonic()
+        while self.running.is_set():
+            # On a live camera this includes waiting for the next frame
+            with metrics.stage("capture"):
+                ret, frame = self.cap.read()
+            if not ret:
+                if self.on_eof is not None and not self.on_eof(self.cap):
+                    break
+                time.sleep(0.01)
+                continue
+            if self.transform is not None:
+                frame = self.transform(frame)
+            if self.min_interval:
+                next_due += self.min_interval
+                delay = next_due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_due = time.monotonic()
+            self.frames.put(frame)
+            self.meter.tick()
+        self.finished.set()
+
+    def stop(self):
+        self.running.clear()
+
+
+class InferenceWorker(threading.Thread):
+    """Runs ``analyze(frame)`` on the newest grabbed frame at up to ``max_fps``.
+
+    Frames that arrive while a previous one is being analysed are skipped,
+    never queued, so recognition latency stays bounded under CPU load.
+    """
+
+    def __init__(self, frames, analyze, max_fps=0):
+        super().__init__(daemon=True)
+        self.frames = frames
+        self.analyze = analyze
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.results = LatestSlot()
+        self.meter = RateMeter()
+        self.running = threading.Event()
+        self.running.set()
+
+    def run(self):
+        seen = 0
+        while self.running.is_set():
+            started = time.monotonic()
+            seq, frame = self.frames.wait_newer(seen, timeout=0.5)
+            if seq == seen or frame is None:
+                continue
+            seen = seq
+            self.results.put(self.analyze(frame))
+            self.meter.tick()
+            rest = self.min_interval - (time.monotonic() - started)
+            if rest > 0:
+                time.sleep(rest)
+
+    def stop(self):
+        self.running.clear()
+
+
+class PoolSource:
+    # One camera feeding an InferencePool
+    def __init__(self, name, frames, analyze, on_result=None):
+        self.name = name
+        self.frames = frames
+        self.analyze = analyze
+        self.on_result = on_result
+        self.results = LatestSlot()
+        self.meter = RateMeter()
+        self.busy = False
+        self.seen = 0
+        self.analysed = 0
+        self.dropped = 0
+
+
+class InferencePool:
+    """Shared inference workers for several frame sources.
+
+    Every source keeps only its latest frame, so a camera that produces
+    faster than it can be analysed drops its older frames (counted in
+    ``dropped``) instead of queueing them. Workers take sources round-robin,
+    skipping those with no new frame or already being analysed; a source is
+    never analysed by two workers at once, so per-camera state such as a
+    tracker needs no locking, and one busy camera cannot starve the others.
+    Source frame slots must be created with ``pool.slot()``.
+    """
+
+    def __init__(self, workers=2):
+        self.cond = threading.Condition()
+        self.sources = []
+        self.cursor = 0
+        self.running = threading.Event()
+        self.threads = [threading.Thread(target=self.work, name=f"inference-{i}", daemon=True)
+                        for i in range(workers)]
+
+    def slot(self):
+        return LatestSlot(self.cond)
+
+    def add(self, name, frames, analyze, on_result=None):
+        source = PoolSource(name, frames, analyze, on_result)
+        with self.cond:
+            self.sources.append(source)
+        return source
+
+    def start(self):
+        self.running.set()
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.running.clear()
+        with self.cond:
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=1)
+
+    def next_ready(self):
+        # Called with the condition held
+        n = len(self.sources)
+        for i in range(n):
+            source = self.sources[(self.cursor + i) % n]
+            if not source.busy and source.frames.seq != source.seen and source.frames.value is not None:
+                self.cursor = (self.cursor + i + 1) % n
+                return source
+        return None
+
+    def work(self):
+        while self.running.is_set():
+            with self.cond:
+                source = self.cond.wait_for(lambda: self.next_ready() or not self.running.is_set(), 0.5)
+                if not isinstance(source, PoolSource):
+                    continue
+                source.busy = True
+                seq, frame = source.frames.seq, source.frames.value
+                if source.seen:
+                    source.dropped += seq - source.seen - 1
+                source.seen = seq
+            try:
+                result = source.analyze(frame)
+            finally:
+                with self.cond:
+                    source.busy = False
+                    source.analysed += 1
+                    self.cond.notify_all()
+            source.results.put(result)
+            source.meter.tick()
+            if source.on_result is not None:
+                source.on_result(source.name, result)
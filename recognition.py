@@ -0,0 +1,237 @@
+"""Face detection, embedding, matching and attendance logging without any UI.
+
+Shared by the Tk attendance screen (ams.py) and the headless service
+(service.py). Call start_loading() to load the models in the background.
+"""
+import cv2
+import datetime
+import numpy as np
+import threading
+from collections import namedtuple
+from PIL import Image
+
+from startup import profile
+import config
+from embedding_cache import EmbeddingCache
+from gallery import Gallery, aggregate, person_id
+from ann_index import IVFIndex
+from embedders import get_embedder, backend_class, load_detector
+from attendance_store import AttendanceStore, ATTENDANCE_DB
+from attendance_writer import AttendanceWriter
+from attendance_summary import SummaryEngine
+from tracker import FaceTracker
+from detection import AdaptiveDetector
+from auto_attendance import AutoAttendance
+from metrics import metrics
+
+with profile.stage("attendance store"):
+    # Attendance log (SQLite; an existing attendance.csv is imported on first run)
+    store = AttendanceStore(ATTENDANCE_DB)
+    # Daily/monthly summaries, updated incrementally as events are committed
+    summaries = SummaryEngine(store)
+# Events are committed in batches off the UI thread
+writer = AttendanceWriter(store, flush_interval=config.ATTENDANCE_FLUSH_S,
+                          batch_size=config.ATTENDANCE_BATCH, after_commit=summaries.update)
+writer.start()
+
+# Face recognition setup. The networks and the gallery are loaded by
+# load_models() in the background; callers skip recognition until
+# models_ready is set.
+BACKEND = config.EMBEDDING_BACKEND
+MATCH_THRESHOLD = config.MATCH_THRESHOLD or backend_class(BACKEND).threshold
+mtcnn = None
+embedder = None
+gallery = None
+# Rows the gallery was last built from, {name: (1, D)}
+templates = {}
+models_ready = threading.Event()
+models_error = None
+loader = None
+loader_lock = threading.Lock()
+
+def detect_boxes(pil):
+    # Face boxes and probabilities, largest face first
+    boxes, probs = mtcnn.detect(pil)
+    if boxes is None or not len(boxes):
+        return None, None
+    order = np.argsort(-(boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1]))
+    return boxes[order], probs[order]
+
+def align_faces(pil, boxes):
+    # Aligned (n, 3, 160, 160) crops for boxes already found by detect_boxes
+    return mtcnn.extract(pil, boxes, None)
+
+def detect_faces(pil):
+    # Single MTCNN pass: boxes, probabilities and aligned crops for every
+    # face. extract() aligns from the boxes already found instead of running
+    # detection a second time like mtcnn(pil) would.
+    boxes, probs = detect_boxes(pil)
+    if boxes is None:
+        return None, None, None
+    return boxes, probs, align_faces(pil, boxes)
+
+# Unchanged dataset images come from the on-disk embedding cache
+
+def embed_image(path):
+    img = Image.open(path).convert("RGB")
+    _, _, faces = detect_faces(img)
+    if faces is None:
+        return None
+    return embedder.embed(faces[:1])
+
+def process_dataset(path):
+    return EmbeddingCache(backend=BACKEND).sync(path, embed_image)
+
+def build_gallery(embeddings):
+    # One row per person (or per capture for best-of-k), see gallery.aggregate
+    global templates
+    templates = aggregate(embeddings, config.TEMPLATE_MODE)
+    if config.GALLERY_INDEX == "ivf" and len(templates) >= config.IVF_MIN_SIZE:
+        return IVFIndex.from_dict(templates, nlist=config.IVF_NLIST, nprobe=config.IVF_NPROBE,
+                                  backend=BACKEND)
+    return Gallery.from_dict(templates, backend=BACKEND)
+
+def refresh_gallery(db, path):
+    # Pick up faces saved/renamed/deleted by user.py and userlist.py; a
+    # person whose captures changed gets their template replaced
+    global templates
+    fresh = aggregate(process_dataset(path), config.TEMPLATE_MODE)
+    with gallery_lock:
+        for name in [n for n in db.names if n not in fresh]:
+            db.remove(name)
+        for name, emb in fresh.items():
+            if name not in db or not np.array_equal(templates.get(name), emb):
+                db.add(name, emb, backend=BACKEND)
+        templates = fresh
+
+DATASET_DIR = "dataset"
+# Guards gallery updates against matching on the inference thread
+gallery_lock = threading.Lock()
+
+def load_models():
+    global mtcnn, embedder, gallery, models_error
+    try:
+        with profile.stage("model weights"):
+            mtcnn = load_detector(config.MTCNN_MIN_FACE, config.MTCNN_FACTOR)
+            embedder = get_embedder(BACKEND)
+        with profile.stage("dataset embedding"):
+            gallery = build_gallery(process_dataset(DATASET_DIR))
+    except Exception as e:
+        models_error = e
+        return
+    models_ready.set()
+    profile.mark("models ready")
+
+def start_loading():
+    # Idempotent; every caller shares the one loader thread
+    global loader
+    with loader_lock:
+        if loader is None:
+            loader = threading.Thread(target=load_models, name="model-loader", daemon=True)
+            loader.start()
+
+# Recognition helper
+def recognize_face(face_emb, db, threshold=MATCH_THRESHOLD):
+    return recognize_faces(face_emb, db, threshold)[0]
+
+def recognize_faces(face_embs, db, threshold=MATCH_THRESHOLD):
+    # One vectorized lookup for a whole batch of faces; matched rows
+    # (templates or single captures) resolve to the person
+    return [(person_id(name) if name else None, dist) for name, dist in db.match_batch(face_embs, threshold)]
+
+# One analysed face: box in frame pixels, matched name (None if unknown),
+# distance to the closest enrolled face, the id of its track and whether
+# the face was embedded for this frame (False when the track's cached
+# identity is repeated)
+Recognition = namedtuple("Recognition", "box name dist track fresh", defaults=(None, True))
+
+class FaceAnalyzer:
+    """Per-frame recognition with tracking, called on the inference worker thread.
+
+    Detection runs every ``DETECT_EVERY`` frames while faces are being
+    tracked; in between the last result is reused. Tracked faces keep their
+    identity and are only re-embedded when new, uncertain or due for a
+    periodic re-check. MTCNN sees a downscaled frame or only the region
+    around known faces (see detection.AdaptiveDetector); faces are aligned
+    from the full frame, which is first resized to ``size`` if given.
+    Returns no faces until the models are loaded. Must not touch Tk.
+    """
+
+    def __init__(self, size=None):
+        self.size = size
+        self.tracker = FaceTracker(iou_threshold=config.TRACK_IOU,
+                                   max_misses=config.TRACK_MAX_MISSES,
+                                   reembed_every=config.REEMBED_EVERY,
+                                   confident_dist=MATCH_THRESHOLD * config.TRACK_CONFIDENCE)
+        self.detector = AdaptiveDetector(self.detect, width=config.DETECT_WIDTH, roi=bool(config.DETECT_ROI),
+                                         margin=config.DETECT_ROI_MARGIN, full_every=config.DETECT_FULL_EVERY,
+                                         face_size=config.DETECT_FACE_SIZE)
+        self.results = []
+        self.reused = []
+
+    @property
+    def stats(self):
+        return {**self.tracker.stats, **self.detector.stats}
+
+    @staticmethod
+    def detect(rgb):
+        return detect_boxes(Image.fromarray(rgb))
+
+    def __call__(self, frame):
+        if not models_ready.is_set():
+            return []
+        with metrics.stage("analyze"):
+            return self.analyze(frame)
+
+    def analyze(self, frame):
+        tracker = self.tracker
+        frame_no = tracker.step()
+        if tracker.tracks and frame_no % config.DETECT_EVERY:
+            tracker.stats["detections_skipped"] += 1
+            return self.reused
+
+        with metrics.stage("convert"):
+            if self.size is not None:
+                frame = cv2.resize(frame, self.size)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        with metrics.stage("detect"):
+            boxes, _ = self.detector(rgb)
+        tracker.stats["detections_run"] += 1
+        tracks = tracker.update(boxes)
+
+        stale = [t for t in tracks if tracker.needs_embedding(t)]
+        tracker.stats["embeddings_skipped"] += len(tracks) - len(stale)
+        if stale:
+            # Every face that needs it goes through the embedder as one batch
+            with metrics.stage("align"):
+                faces = align_faces(Image.fromarray(rgb), np.array([t.box for t in stale]))
+            with metrics.stage("embed"):
+                embs = embedder.embed(faces)
+            with metrics.stage("match"), gallery_lock:
+                matches = recognize_faces(embs, gallery)
+            for track, (name, dist) in zip(stale, matches):
+                tracker.assign(track, name, dist)
+            tracker.stats["embeddings_run"] += len(stale)
+
+        tracks.sort(key=lambda t: t.area, reverse=True)
+        fresh = {t.id for t in stale}
+        self.results = [Recognition(t.box, t.name, t.dist, t.id, t.id in fresh) for t in tracks]
+        # Returned again on frames without detection: no new evidence
+        self.reused = [r._replace(fresh=False) for r in self.results]
+        return self.results
+
+# Attendance logging; returns immediately, the outcome arrives on writer.results
+def mark_attendance(name, typ, source=None):
+    return writer.submit(name, typ, source=source)
+
+def last_event_today(name):
+    # Type of the person's latest committed event today, or None
+    today = datetime.date.today().strftime("%Y-%m-%d")
+    rows = store.query(today + " 00:00:00", today + " 23:59:59", name, limit=1, descending=True)
+    return rows[0][2] if rows else None
+
+def auto_attendance():
+    # Debounced hands-free logging for one camera, see auto_attendance.py
+    return AutoAttendance(window=config.AUTO_WINDOW, min_votes=config.AUTO_MIN_VOTES,
+                          cooldown=config.AUTO_COOLDOWN_S, mode=config.AUTO_MODE,
+                          last_event=last_event_today)
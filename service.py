@@ -0,0 +1,269 @@
+"""Headless recognition service: the ams.py pipeline behind a local HTTP API.
+
+    python service.py [--host 127.0.0.1] [--port 8765] [--unix /run/ams.sock]
+
+POST /recognize     body is an encoded image (JPEG/PNG), a raw BGR frame
+                    (application/octet-stream with ?width=&height=), or JSON
+                    {"path": "image file"}. Add ?record=Time%20In (and
+                    optionally &source=camera) to record attendance for
+                    the closest recognized face.
+POST /attendance    JSON {"name": ..., "type": "Time In" | "Time Out", "source": ...}
+GET  /health        model state, gallery size and batching stats
+GET  /metrics       per-stage latencies when AMS_METRICS=1 (see metrics.py)
+
+Responses are JSON. Connections are kept alive between requests.
+"""
+import io
+import os
+import json
+import asyncio
+import argparse
+import http
+import traceback
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+import config
+import recognition
+from metrics import metrics
+
+ATTENDANCE_TYPES = ("Time In", "Time Out")
+
+
+class BadRequest(Exception):
+    pass
+
+
+def decode_image(body, content_type, query):
+    # PIL RGB image from whatever the client sent
+    if content_type.startswith("application/json"):
+        path = json.loads(body or b"{}").get("path")
+        if not path:
+            raise BadRequest("JSON body needs a 'path'")
+        return Image.open(path).convert("RGB")
+    if content_type.startswith("application/octet-stream") and "width" in query:
+        w, h = int(query["width"][0]), int(query["height"][0])
+        frame = np.frombuffer(body, dtype=np.uint8)
+        if frame.size != w * h * 3:
+            raise BadRequest(f"expected {w * h * 3} bytes for a {w}x{h} BGR frame, got {frame.size}")
+        return Image.fromarray(frame.reshape(h, w, 3)[:, :, ::-1])
+    return Image.open(io.BytesIO(body)).convert("RGB")
+
+
+def detect(body, content_type, query):
+    # Detection thread: boxes (largest first) and aligned crops
+    with metrics.stage("decode"):
+        pil = decode_image(body, content_type, query)
+    with metrics.stage("detect"):
+        boxes, _, faces = recognition.detect_faces(pil)
+    return boxes, faces
+
+
+class EmbedBatcher:
+    """Embeds and matches face crops from concurrent requests together.
+
+    Requests queue their crops; one task drains the queue into batches of
+    up to ``max_batch`` faces and runs embedding plus gallery matching on a
+    single executor thread. While a batch is running the next one fills
+    up, so under load the model always sees the largest batch available;
+    ``max_wait`` adds a short wait for company when the queue is idle.
+    """
+
+    def __init__(self, max_batch=32, max_wait=0.002):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="embed")
+        self.stats = {"batches": 0, "faces": 0, "requests": 0, "largest": 0}
+
+    async def match(self, faces):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((faces, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            size = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                try:
+                    timeout = deadline - loop.time()
+                    item = self.queue.get_nowait() if timeout <= 0 else \
+                        await asyncio.wait_for(self.queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                items.append(item)
+                size += len(item[0])
+            try:
+                results = await loop.run_in_executor(self.executor, self.embed_match, [f for f, _ in items])
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), matches in zip(items, results):
+                if not future.done():
+                    future.set_result(matches)
+            self.stats["batches"] += 1
+            self.stats["faces"] += size
+            self.stats["requests"] += len(items)
+            self.stats["largest"] = max(self.stats["largest"], size)
+
+    def embed_match(self, face_lists):
+        import torch
+        with metrics.stage("embed"):
+            embs = recognition.embedder.embed(torch.cat(face_lists))
+        with metrics.stage("match"), recognition.gallery_lock:
+            matches = recognition.recognize_faces(embs, recognition.gallery)
+        out, start = [], 0
+        for faces in face_lists:
+            out.append(matches[start:start + len(faces)])
+            start += len(faces)
+        return out
+
+
+class RecognitionService:
+    def __init__(self, detect_workers=config.SERVICE_DETECT_WORKERS, max_batch=config.SERVICE_MAX_BATCH,
+                 max_wait_ms=config.SERVICE_MAX_WAIT_MS):
+        self.detector = ThreadPoolExecutor(detect_workers, thread_name_prefix="detect")
+        self.batcher = EmbedBatcher(max_batch, max_wait_ms / 1000.0)
+        self.dataset_mtime = None
+
+    async def recognize(self, body, content_type, query):
+        if not recognition.models_ready.is_set():
+            return 503, {"error": f"models not ready: {recognition.models_error or 'loading'}"}
+        loop = asyncio.get_running_loop()
+        boxes, faces = await loop.run_in_executor(self.detector, detect, body, content_type, query)
+        matches = await self.batcher.match(faces) if faces is not None else []
+        result = {"faces": [{"box": [round(float(v), 1) for v in box], "name": name,
+                             "distance": round(float(dist), 4)}
+                            for box, (name, dist) in zip(boxes if boxes is not None else [], matches)]}
+        typ = query.get("record", [None])[0]
+        if typ is not None:
+            if typ not in ATTENDANCE_TYPES:
+                raise BadRequest(f"record must be one of {ATTENDANCE_TYPES}")
+            # Faces are largest first: the closest recognized person is recorded
+            name = next((f["name"] for f in result["faces"] if f["name"]), None)
+            if name is not None:
+                source = query.get("source", [None])[0]
+                result["recorded"] = {"name": name, "type": typ, "source": source,
+                                      "ts": recognition.mark_attendance(name, typ, source)}
+        return 200, result
+
+    async def attendance(self, body):
+        event = json.loads(body or b"{}")
+        name, typ, source = event.get("name"), event.get("type"), event.get("source")
+        if not name or typ not in ATTENDANCE_TYPES:
+            raise BadRequest(f"need a name and a type in {ATTENDANCE_TYPES}")
+        return 200, {"name": name, "type": typ, "source": source,
+                     "ts": recognition.mark_attendance(name, typ, source)}
+
+    def health(self):
+        gallery = recognition.gallery
+        return 200, {"models_ready": recognition.models_ready.is_set(),
+                     "error": None if recognition.models_error is None else str(recognition.models_error),
+                     "backend": recognition.BACKEND,
+                     "gallery_size": len(gallery.names) if gallery is not None else 0,
+                     "batching": self.batcher.stats}
+
+    async def dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        try:
+            if url.path == "/recognize" and method == "POST":
+                return await self.recognize(body, headers.get("content-type", ""), query)
+            if url.path == "/attendance" and method == "POST":
+                return await self.attendance(body)
+            if url.path == "/health" and method == "GET":
+                return self.health()
+            if url.path == "/metrics" and method == "GET":
+                return 200, metrics.snapshot()
+            return 404, {"error": f"no route for {method} {url.path}"}
+        except (BadRequest, ValueError, OSError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            # A failure inside recognition: answer instead of dropping the connection
+            traceback.print_exc()
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    async def handle(self, reader, writer):
+        # Minimal HTTP/1.1 with keep-alive; one request at a time per connection
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, target, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = header.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload = await self.dispatch(method, target, headers, body)
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n"
+                             .encode("latin-1") + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def watch_dataset(self):
+        # Pick up faces saved by user.py, as the attendance screen does
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(config.GALLERY_REFRESH_MS / 1000.0)
+            path = recognition.DATASET_DIR
+            mtime = os.stat(path).st_mtime_ns if os.path.isdir(path) else None
+            if mtime != self.dataset_mtime and recognition.models_ready.is_set():
+                self.dataset_mtime = mtime
+                await loop.run_in_executor(self.detector, recognition.refresh_gallery,
+                                           recognition.gallery, path)
+
+    async def serve(self, host=config.SERVICE_HOST, port=config.SERVICE_PORT, unix=None):
+        recognition.start_loading()
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, unix)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        tasks = [asyncio.create_task(self.batcher.run()), asyncio.create_task(self.watch_dataset())]
+        print(f"recognition service listening on {unix or f'http://{host}:{port}'}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Headless face recognition service")
+    ap.add_argument("--host", default=config.SERVICE_HOST)
+    ap.add_argument("--port", type=int, default=config.SERVICE_PORT)
+    ap.add_argument("--unix", help="listen on a Unix socket instead of TCP")
+    args = ap.parse_args()
+    # Served on /metrics above; only the periodic log is started here
+    metrics.start(port=0)
+    try:
+        asyncio.run(RecognitionService().serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Commit whatever attendance is still queued
+        recognition.writer.stop()
+
+
+if __name__ == "__main__":
+    main()
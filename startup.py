@@ -0,0 +1,64 @@
+import time
+import contextlib
+import threading
+
+import config
+
+# Everything is timed from the first import of this module, which the
+# entry points do before any heavy import
+STARTED = time.perf_counter()
+
+
+class StartupProfile:
+    """Where a cold start spends its time.
+
+    ``stage(name)`` times a block (imports, weight loading, dataset
+    embedding, camera open, ...) on whichever thread runs it; ``mark(name)``
+    records a milestone such as the first visible frame. Once every mark in
+    ``report_after`` has been reached the breakdown is printed, once.
+    """
+
+    def __init__(self, started=STARTED, report_after=("first frame", "models ready"), enabled=True):
+        self.started = started
+        self.report_after = set(report_after)
+        self.enabled = enabled
+        self.stages = []
+        self.marks = {}
+        self.reported = False
+        self.lock = threading.Lock()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        begin = self.elapsed()
+        try:
+            yield
+        finally:
+            took = self.elapsed() - begin
+            with self.lock:
+                self.stages.append((name, begin, took, threading.current_thread().name))
+
+    def mark(self, name):
+        with self.lock:
+            if name in self.marks:
+                return
+            self.marks[name] = self.elapsed()
+            due = self.enabled and not self.reported and self.report_after <= self.marks.keys()
+            self.reported |= due
+        if due:
+            print(self.report(), flush=True)
+
+    def report(self):
+        lines = ["startup profile (seconds since launch):"]
+        for name, begin, took, thread in sorted(self.stages, key=lambda s: s[1]):
+            where = "" if thread == "MainThread" else f"  [{thread}]"
+            lines.append(f"  {name:<20} +{begin:6.3f}  {took:7.3f}{where}")
+        for name, at in sorted(self.marks.items(), key=lambda m: m[1]):
+            lines.append(f"  {name:<20} at {at:6.3f}")
+        return "\n".join(lines)
+
+
+# Shared by every screen in the process
+profile = StartupProfile(enabled=config.STARTUP_REPORT)
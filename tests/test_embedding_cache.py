@@ -0,0 +1,72 @@
+import os
+import sys
+import hashlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from embedding_cache import EmbeddingCache
+
+
+def write(folder, name, data):
+    with open(os.path.join(folder, name), "wb") as f:
+        f.write(data)
+
+
+def vector(data):
+    # A made-up embedding derived from the file bytes; b"noface" has no face
+    if data == b"noface":
+        return None
+    seed = int(hashlib.sha1(data).hexdigest()[:8], 16)
+    return np.random.default_rng(seed).normal(size=(1, 8)).astype(np.float32)
+
+
+def fake_embed(calls):
+    def embed(path):
+        calls.append(os.path.basename(path))
+        with open(path, "rb") as f:
+            return vector(f.read())
+    return embed
+
+
+def test_duplicates_on_cold_cache(tmp_path):
+    dataset, cache_dir = tmp_path / "dataset", tmp_path / "cache"
+    dataset.mkdir()
+    write(dataset, "Alice, Kagawad.jpg", b"alice")
+    write(dataset, "Bob, Kagawad.jpg", b"alice")
+    write(dataset, "Carol, Clerk.jpg", b"carol")
+    calls = []
+    out = EmbeddingCache(str(cache_dir)).sync(str(dataset), fake_embed(calls))
+    assert sorted(out) == ["Alice, Kagawad", "Bob, Kagawad", "Carol, Clerk"]
+    assert len(calls) == 2
+    np.testing.assert_array_equal(out["Bob, Kagawad"], vector(b"alice"))
+    np.testing.assert_array_equal(out["Carol, Clerk"], vector(b"carol"))
+
+    # Served from disk on the next launch, identically
+    calls = []
+    again = EmbeddingCache(str(cache_dir)).sync(str(dataset), fake_embed(calls))
+    assert calls == []
+    for name, emb in out.items():
+        np.testing.assert_array_equal(again[name], emb)
+
+
+def test_duplicates_added_to_warm_cache(tmp_path):
+    dataset, cache_dir = tmp_path / "dataset", tmp_path / "cache"
+    dataset.mkdir()
+    write(dataset, "Alice, Kagawad.jpg", b"alice")
+    write(dataset, "Carol, Clerk.jpg", b"carol")
+    EmbeddingCache(str(cache_dir)).sync(str(dataset), fake_embed([]))
+
+    write(dataset, "Dan, Clerk.jpg", b"dan")
+    write(dataset, "Erin, Clerk.jpg", b"dan")
+    write(dataset, "Faye, Clerk.jpg", b"noface")
+    write(dataset, "Gus, Clerk.jpg", b"noface")
+    calls = []
+    cache = EmbeddingCache(str(cache_dir))
+    out = cache.sync(str(dataset), fake_embed(calls))
+    assert sorted(calls) == ["Dan, Clerk.jpg", "Faye, Clerk.jpg"]
+    assert sorted(out) == ["Alice, Kagawad", "Carol, Clerk", "Dan, Clerk", "Erin, Clerk"]
+    for name, data in [("Alice, Kagawad", b"alice"), ("Carol, Clerk", b"carol"),
+                       ("Dan, Clerk", b"dan"), ("Erin, Clerk", b"dan")]:
+        np.testing.assert_array_equal(out[name], vector(data))
+    assert cache.stats["rehashed"] == 2
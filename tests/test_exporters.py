@@ -0,0 +1,24 @@
+import os
+import sys
+import datetime
+
+from openpyxl import load_workbook
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from attendance_store import COLUMNS
+from exporters import write_excel
+
+
+def test_excel_keeps_bad_timestamps_as_text(tmp_path):
+    path = str(tmp_path / "out.xlsx")
+    rows = [("Alice", "2024-01-02 08:00:00", "Time In"),
+            ("Bob", "02/01/2024 8:00 AM", "Time In"),
+            ("Carol", "2024-01-02 17:30:00", "Time Out")]
+    seen = []
+    write_excel(path, COLUMNS, [rows[:2], rows[2:]], seen.append)
+    assert seen == [2, 1]
+    values = list(load_workbook(path).worksheets[0].values)
+    assert values[0] == tuple(COLUMNS)
+    assert values[1][1] == datetime.datetime(2024, 1, 2, 8, 0)
+    assert values[2][1] == "02/01/2024 8:00 AM"
+    assert values[3][1] == datetime.datetime(2024, 1, 2, 17, 30)
@@ -0,0 +1,97 @@
+import itertools
+import numpy as np
+
+
+def iou_matrix(a, b):
+    # a: (n, 4), b: (m, 4) boxes as x1, y1, x2, y2
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+
+class Track:
+    def __init__(self, track_id, box, frame_no):
+        self.id = track_id
+        self.box = box
+        self.name = None
+        self.dist = None
+        self.last_seen = frame_no
+        self.last_embedded = None
+
+    @property
+    def area(self):
+        return (self.box[2] - self.box[0]) * (self.box[3] - self.box[1])
+
+
+class FaceTracker:
+    """Associates face boxes across frames by IoU and caches identity per track.
+
+    ``needs_embedding`` says whether a track's identity is stale: new tracks,
+    unknown or low-confidence matches, and tracks not re-checked for
+    ``reembed_every`` frames are embedded again; the rest reuse their name.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_misses=3, reembed_every=15, confident_dist=0.6):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.reembed_every = reembed_every
+        self.confident_dist = confident_dist
+        self.tracks = []
+        self.ids = itertools.count(1)
+        self.frame_no = 0
+        self.stats = dict(detections_run=0, detections_skipped=0, embeddings_run=0, embeddings_skipped=0)
+
+    def step(self):
+        self.frame_no += 1
+        return self.frame_no
+
+    def update(self, boxes):
+        # Greedy highest-IoU-first association of new boxes to live tracks
+        boxes = [] if boxes is None else list(boxes)
+        matched = {}
+        if self.tracks and boxes:
+            ious = iou_matrix([t.box for t in self.tracks], boxes)
+            for flat in np.argsort(-ious, axis=None):
+                ti, bi = np.unravel_index(flat, ious.shape)
+                if ious[ti, bi] < self.iou_threshold:
+                    break
+                if ti in matched.values() or bi in matched:
+                    continue
+                matched[bi] = ti
+        live = []
+        for bi, box in enumerate(boxes):
+            if bi in matched:
+                track = self.tracks[matched[bi]]
+                track.box = box
+                track.last_seen = self.frame_no
+            else:
+                track = Track(next(self.ids), box, self.frame_no)
+            live.append(track)
+        # Keep briefly-missed tracks so a dropped detection does not reset identity
+        seen = set(matched.values())
+        for ti, track in enumerate(self.tracks):
+            if ti not in seen and self.frame_no - track.last_seen <= self.max_misses:
+                live.append(track)
+        self.tracks = live
+        return [t for t in live if t.last_seen == self.frame_no]
+
+    def needs_embedding(self, track):
+        if track.last_embedded is None or track.name is None:
+            return True
+        if track.dist is not None and track.dist > self.confident_dist:
+            return True
+        return self.frame_no - track.last_embedded >= self.reembed_every
+
+    def assign(self, track, name, dist):
+        track.name, track.dist = name, dist
+        track.last_embedded = self.frame_no
+
+    def visible(self):
+        return [t for t in self.tracks if t.last_seen == self.frame_no]
@@ -1,11 +1,14 @@
 import os
-import sys
 import cv2
 import tkinter as tk
 from tkinter import messagebox
 from PIL import Image, ImageTk
 import datetime
-import subprocess
+
+import config
+from gallery import person_id
+from camera import Camera
+from app import open_screen
 
 # Color palette
 COLOR_HEADER_BG   = "#3498DB"
@@ -15,15 +18,14 @@ COLOR_BUTTON_TEXT = "#FFFFFF"
 COLOR_SAVE_BG     = "#2ECC71"
 
 class UserRegistration:
-    def __init__(self, root):
+    def __init__(self, root, shell=None):
         self.root = root
-        self.root.title("Attendance Monitoring System")
-        # Increase window height to accommodate bottom buttons
-        self.root.geometry("1000x700")
-        self.root.configure(bg=COLOR_BG)
+        self.shell = shell
+        self.frame = tk.Frame(root, bg=COLOR_BG)
+        self.jobs = {}
 
         # Header bar
-        header = tk.Frame(self.root, bg=COLOR_HEADER_BG, height=80)
+        header = tk.Frame(self.frame, bg=COLOR_HEADER_BG, height=80)
         # Fix header size to ensure buttons are fully visible
         header.pack(fill=tk.X)
         header.pack_propagate(False)
@@ -56,14 +58,14 @@ class UserRegistration:
         ).pack(side=tk.RIGHT, padx=10, pady=10)
 
         # Video preview frame
-        self.video_frame = tk.Frame(self.root, bg="#DDDDDD", width=800, height=300)
+        self.video_frame = tk.Frame(self.frame, bg="#DDDDDD", width=800, height=300)
         self.video_frame.pack(pady=20)
         self.video_frame.pack_propagate(False)
         self.video_label = tk.Label(self.video_frame)
         self.video_label.pack(fill=tk.BOTH, expand=True)
 
         # Capture / Retake buttons
-        btn_frame = tk.Frame(self.root, bg=COLOR_BG)
+        btn_frame = tk.Frame(self.frame, bg=COLOR_BG)
         btn_frame.pack(pady=10)
         tk.Button(
             btn_frame,
@@ -85,7 +87,7 @@ class UserRegistration:
         ).grid(row=0, column=1, padx=20)
 
         # Entry fields
-        entry_frame = tk.Frame(self.root, bg=COLOR_BG)
+        entry_frame = tk.Frame(self.frame, bg=COLOR_BG)
         entry_frame.pack(pady=20)
         tk.Label(
             entry_frame,
@@ -107,7 +109,7 @@ class UserRegistration:
 
         # Save button
         tk.Button(
-            self.root,
+            self.frame,
             text="Save",
             font=("Arial", 14),
             bg=COLOR_SAVE_BG,
@@ -118,7 +120,7 @@ class UserRegistration:
 
         # User List button at bottom
         tk.Button(
-            self.root,
+            self.frame,
             text="User List",
             font=("Arial", 14),
             bg=COLOR_BUTTON,
@@ -127,24 +129,48 @@ class UserRegistration:
             command=self.open_user_list
         ).pack(pady=5)
 
-        # Initialize webcam
-        self.video_capture = cv2.VideoCapture(0)
+        # Shared webcam; frames are read by a grabber thread, not the Tk thread
+        self.camera = shell.camera if shell is not None else Camera(config.CAMERA_SOURCES[0])
+        self.grabber = None
         self.current_frame = None
         self.captured_image = None
+        if shell is None:
+            self.frame.pack(fill=tk.BOTH, expand=True)
+            self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+            self.on_show()
+
+    def schedule(self, ms, fn):
+        self.jobs[fn.__name__] = self.root.after(ms, fn)
+
+    def on_show(self):
+        self.root.title("Attendance Monitoring System")
+        # Increase window height to accommodate bottom buttons
+        self.root.geometry("1000x700")
+        self.grabber = self.camera.acquire()
         self.update_video()
-        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_hide(self):
+        for job in self.jobs.values():
+            self.root.after_cancel(job)
+        self.jobs = {}
+        if self.grabber is not None:
+            self.grabber = None
+            self.camera.release()
+
+    def shutdown(self):
+        self.on_hide()
 
     def update_video(self):
         if self.captured_image is None:
-            ret, frame = self.video_capture.read()
-            if ret:
+            _, frame = self.grabber.frames.get()
+            if frame is not None and frame is not self.current_frame:
                 self.current_frame = frame
                 cv2image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 img = Image.fromarray(cv2image)
                 imgtk = ImageTk.PhotoImage(image=img)
                 self.video_label.imgtk = imgtk
                 self.video_label.configure(image=imgtk)
-        self.root.after(10, self.update_video)
+        self.schedule(10, self.update_video)
 
     def capture(self):
         if self.current_frame is not None:
@@ -174,28 +200,42 @@ class UserRegistration:
             return
         folder = "dataset"
         os.makedirs(folder, exist_ok=True)
-        filename = f"{name}, {pos}.jpg"
+        # Further captures of the same person are kept alongside the first
+        # ("Name, Position #2.jpg", ...) and matched together
+        person = f"{name}, {pos}"
+        taken = [f for f in os.listdir(folder) if person_id(os.path.splitext(f)[0]) == person]
+        filename = f"{person}.jpg" if not taken else f"{person} #{self.next_capture(folder, person)}.jpg"
         path = os.path.join(folder, filename)
         cv2.imwrite(path, self.captured_image)
-        messagebox.showinfo("Saved", f"Image saved to {path}")
+        messagebox.showinfo("Saved", f"Image saved to {path} ({len(taken) + 1} photo(s) of {name}).\n"
+                                     "Take and save again to add another photo of the same person.")
         self.captured_image = None
-        self.name_entry.delete(0, tk.END)
-        self.position_entry.delete(0, tk.END)
+
+    def next_capture(self, folder, person):
+        n = 2
+        while os.path.exists(os.path.join(folder, f"{person} #{n}.jpg")):
+            n += 1
+        return n
 
     def open_user_list(self):
-        script = os.path.join(os.path.dirname(__file__), "userlist.py")
-        subprocess.Popen([sys.executable, script])
+        open_screen(self.shell, "userlist", "userlist.py")
 
     def go_admin(self):
+        if self.shell is not None:
+            self.shell.show("admin")
+            return
         self.close()
-        subprocess.Popen([sys.executable, "admin.py"])
+        open_screen(None, "admin", "admin.py")
 
     def on_close(self):
+        if self.shell is not None:
+            self.shell.quit()
+            return
         self.close()
 
     def close(self):
-        if self.video_capture.isOpened():
-            self.video_capture.release()
+        self.shutdown()
+        self.camera.close()
         self.root.destroy()
 
 if __name__ == "__main__":
@@ -1,8 +1,9 @@
 import os
-import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
-import subprocess
+
+from app import open_screen
+from gallery import person_id
 
 # Folder where user images are stored
 dataset_folder = "dataset"
@@ -16,14 +17,13 @@ COLOR_BTN_BACK  = "#3498DB"
 COLOR_BTN_TEXT  = "#FFFFFF"
 
 class UserListApp:
-    def __init__(self, root):
+    def __init__(self, root, shell=None):
         self.root = root
-        self.root.title("User List")
-        self.root.geometry("800x600")
-        self.root.configure(bg=COLOR_BG)
+        self.shell = shell
+        self.frame = tk.Frame(root, bg=COLOR_BG)
 
         # Header bar
-        header = tk.Frame(self.root, bg=COLOR_HEADER_BG, height=50)
+        header = tk.Frame(self.frame, bg=COLOR_HEADER_BG, height=50)
         header.pack(fill=tk.X)
         tk.Label(header,
                  text="Registered Users",
@@ -38,15 +38,17 @@ class UserListApp:
                   command=self.go_back).pack(side=tk.RIGHT, padx=20, pady=10)
 
         # Treeview for listing
-        cols = ("Name", "Position")
-        self.tree = ttk.Treeview(self.root, columns=cols, show="headings")
+        cols = ("Name", "Position", "Photos")
+        self.tree = ttk.Treeview(self.frame, columns=cols, show="headings")
         for c in cols:
             self.tree.heading(c, text=c)
-            self.tree.column(c, width=350 if c == "Name" else 200, anchor=tk.W)
+            self.tree.column(c, width={"Name": 350, "Position": 200}.get(c, 80), anchor=tk.W)
+        # Person -> their capture files ("Name, Position.jpg", "Name, Position #2.jpg", ...)
+        self.captures = {}
         self.tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
 
         # Buttons
-        btn_frame = tk.Frame(self.root, bg=COLOR_BG)
+        btn_frame = tk.Frame(self.frame, bg=COLOR_BG)
         btn_frame.pack(pady=10)
         tk.Button(btn_frame,
                   text="Edit Selected",
@@ -62,17 +64,34 @@ class UserListApp:
                   fg=COLOR_BTN_TEXT,
                   command=self.delete_selected).pack(side=tk.LEFT, padx=10)
 
+        if shell is None:
+            self.frame.pack(fill=tk.BOTH, expand=True)
+            self.on_show()
+
+    def on_show(self):
+        self.root.title("User List")
+        self.root.geometry("800x600")
+        # Pick up users saved or renamed since the screen was last shown
         self.load_users()
 
+    def on_hide(self):
+        pass
+
+    def shutdown(self):
+        pass
+
     def load_users(self):
         # clear existing
         for i in self.tree.get_children():
             self.tree.delete(i)
         os.makedirs(dataset_folder, exist_ok=True)
+        self.captures = {}
         for fname in sorted(os.listdir(dataset_folder)):
             if fname.lower().endswith(('.png', '.jpg', '.jpeg')):
-                name, pos = os.path.splitext(fname)[0].split(',', 1) if ',' in fname else (fname, '')
-                self.tree.insert('', tk.END, iid=fname, values=(name.strip(), pos.strip()))
+                self.captures.setdefault(person_id(os.path.splitext(fname)[0]), []).append(fname)
+        for person, files in self.captures.items():
+            name, pos = person.split(',', 1) if ',' in person else (person, '')
+            self.tree.insert('', tk.END, iid=person, values=(name.strip(), pos.strip(), len(files)))
 
     def delete_selected(self):
         sel = self.tree.selection()
@@ -83,11 +102,11 @@ class UserListApp:
         if not confirm:
             return
         for iid in sel:
-            path = os.path.join(dataset_folder, iid)
-            try:
-                os.remove(path)
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not delete {iid}: {e}")
+            for fname in self.captures.get(iid, []):
+                try:
+                    os.remove(os.path.join(dataset_folder, fname))
+                except Exception as e:
+                    messagebox.showerror("Error", f"Could not delete {fname}: {e}")
         self.load_users()
 
     def edit_selected(self):
@@ -95,9 +114,8 @@ class UserListApp:
         if not sel:
             messagebox.showwarning("No Selection", "Please select a user to edit.")
             return
-        old_filename = sel[0]
-        old_name, old_position = self.tree.item(old_filename)['values']
-        extension = os.path.splitext(old_filename)[1]
+        old_person = sel[0]
+        old_name, old_position, _ = self.tree.item(old_person)['values']
 
         # Pop-up window for editing
         edit_win = tk.Toplevel(self.root)
@@ -119,11 +137,14 @@ class UserListApp:
             if not new_name:
                 messagebox.showerror("Invalid Input", "Name cannot be empty.")
                 return
-            new_filename = f"{new_name}, {new_position}{extension}" if new_position else f"{new_name}{extension}"
-            old_path = os.path.join(dataset_folder, old_filename)
-            new_path = os.path.join(dataset_folder, new_filename)
+            new_person = f"{new_name}, {new_position}" if new_position else new_name
             try:
-                os.rename(old_path, new_path)
+                # Every capture keeps its " #N" suffix and extension
+                for old_filename in self.captures.get(old_person, []):
+                    stem, extension = os.path.splitext(old_filename)
+                    new_filename = new_person + stem[len(old_person):] + extension
+                    os.rename(os.path.join(dataset_folder, old_filename),
+                              os.path.join(dataset_folder, new_filename))
                 edit_win.destroy()
                 self.load_users()
             except Exception as e:
@@ -132,9 +153,9 @@ class UserListApp:
         tk.Button(edit_win, text="Save", command=save_changes, bg="#2ECC71", fg="white", font=("Arial", 12)).pack(pady=15)
 
     def go_back(self):
-        script = os.path.join(os.path.dirname(__file__), "user.py")
-        subprocess.Popen([sys.executable, script])
-        self.root.destroy()
+        open_screen(self.shell, "user", "user.py")
+        if self.shell is None:
+            self.root.destroy()
 
 
 if __name__ == "__main__":